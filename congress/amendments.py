@@ -1,7 +1,7 @@
 import re, logging, datetime, time, json
 from lxml import etree
 
-from congress import bill_info, bill
+from congress import bill_info, bills, rules
 
 
 # TODO: I don't quite follow what's going on here -- as written, the behavior
@@ -30,9 +30,9 @@ def amends_bill_for(fdsys_data):
     Transform FDSYS data about the amended bill.
     """
     return {
-        'bill_id': bill.build_bill_id(fdsys_data['type'].lower(),
-                                     fdsys_data['number'],
-                                     fdsys_data['congress']),
+        'bill_id': bills.build_bill_id(fdsys_data['type'].lower(),
+                                      fdsys_data['number'],
+                                      fdsys_data['congress']),
         'bill_type': fdsys_data['type'].lower(),
         'congress': int(fdsys_data['congress']),
         'number': int(fdsys_data['number'])
@@ -66,6 +66,14 @@ def amends_amendment_for(fdsys_data):
     }
 
 
+# Amendment action patterns, matched at the start of the action text.
+AMENDMENT_ACTION_RULES = rules.RuleTable([
+    rules.Rule(r"On agreeing to the .* amendments? (\(.*\) )?(?:as (?:modified|amended) )?(Agreed to|Failed) (without objection|by [^\.:]+|by (?:recorded vote|the Yeas and Nays): (\d+) - (\d+)(, \d+ Present)? \(Roll [nN]o. (\d+)\))\.", "house-vote", flags=0, anchored=True),
+    rules.Rule(r"(Motion to table )?Amendment SA \d+(?:, .*?)? (as modified )?(agreed to|not agreed to) in Senate by ([^\.:\-]+|Yea-Nay( Vote)?. (\d+) - (\d+)(, \d+ Present)?. Record Vote Number: (\d+))\.", "senate-vote", flags=0, anchored=True),
+    rules.Rule(r"Proposed amendment SA \d+ withdrawn in Senate", "withdrawn", flags=0, anchored=True),
+])
+
+
 def parse_amendment_action(action):
     """
     Extends :func:`congress.bill_info.action_for` to further structure
@@ -81,9 +89,11 @@ def parse_amendment_action(action):
     """
     action = bill_info.action_for(action)
 
+    # The patterns are mutually exclusive, so only the first match matters.
+    kind, m = AMENDMENT_ACTION_RULES.first(action['text'])
+
     # House Vote
-    m = re.match(r"On agreeing to the .* amendments? (\(.*\) )?(?:as (?:modified|amended) )?(Agreed to|Failed) (without objection|by [^\.:]+|by (?:recorded vote|the Yeas and Nays): (\d+) - (\d+)(, \d+ Present)? \(Roll [nN]o. (\d+)\))\.", action['text'])
-    if m:
+    if kind == "house-vote":
         action["where"] = "h"
         action["type"] = "vote"
         action["vote_type"] = "vote"
@@ -99,8 +109,11 @@ def parse_amendment_action(action):
             action["roll"] = int(m.group(7))
 
     # Senate Vote
-    m = re.match(r"(Motion to table )?Amendment SA \d+(?:, .*?)? (as modified )?(agreed to|not agreed to) in Senate by ([^\.:\-]+|Yea-Nay( Vote)?. (\d+) - (\d+)(, \d+ Present)?. Record Vote Number: (\d+))\.", action['text'])
-    if m:
+    if kind == "senate-vote":
+        if m.group(3) != "agreed to" and m.group(1):
+            # is a failed motion to table, so this doesn't count as a vote on agreeing to the amendment
+            return action
+
         action["type"] = "vote"
         action["vote_type"] = "vote"
         action["where"] = "s"
@@ -110,8 +123,6 @@ def parse_amendment_action(action):
             if m.group(1):  # is a motion to table, so result is sort of reversed.... eeek
                 action["result"] = "fail"
         else:
-            if m.group(1):  # is a failed motion to table, so this doesn't count as a vote on agreeing to the amendment
-                continue
             action["result"] = "fail"
 
         action["how"] = m.group(4)
@@ -120,8 +131,7 @@ def parse_amendment_action(action):
             action["roll"] = int(m.group(9))
 
     # Withdrawn
-    m = re.match(r"Proposed amendment SA \d+ withdrawn in Senate", action['text'])
-    if m:
+    if kind == "withdrawn":
         action['type'] = 'withdrawn'
     return action
 
@@ -133,7 +143,7 @@ def parse_amendment_actions(actions):
 
 # TODO: this is redundant, but we'll keep it to support legacy tests.
 def actions_for(actions):
-    return parse_amendment_actions(actions))
+    return parse_amendment_actions(actions)
 
 
 def sponsor_for(sponsor, amendment_type):
@@ -1,22 +1,39 @@
+from __future__ import absolute_import
+
 import utils
 import logging
 import re
 import json
 from lxml import etree
 import copy
-import datetime
+import collections
 
+from congress import datetimes, rules
+from congress.text import strip_tags
 
 
-def sponsor_for(sponsor_dict):
-    if sponsor_dict is None:
-        # TODO: This can hopefully be removed. In testing s414-113
-        # was missing sponsor data. But all bills have a sponsor?
-        return None
+
+# A sponsor or cosponsor as parsed from their BILLSTATUS fullName, e.g.
+# "Rep. Smith, John [R-NY-3]". See parse_sponsor.
+Sponsor = collections.namedtuple("Sponsor", ["title", "name", "district", "state", "bioguide_id"])
+
+SPONSOR_NAME_PATTERN = re.compile(r'(?P<title>(Rep|Sen))\. (?P<name>.*?) +\[(?P<party>[DRI])-(?P<state>[A-Z][A-Z])(-(?P<district>\d{1,2}|At Large))?\]$')
+
+# The same few hundred Members sponsor and cosponsor thousands of bills, so
+# parsed names are memoized across bills.
+SPONSOR_PARSE_CACHE_SIZE = 5000
+sponsor_parse_cache = utils.LRUCache("Sponsor", SPONSOR_PARSE_CACHE_SIZE)
+
+
+def parse_sponsor(full_name, bioguide_id):
+    """Parse a sponsor's fullName. Returns a Sponsor, which is shared by every bill with the same sponsor."""
+
+    sponsor = sponsor_parse_cache.get((full_name, bioguide_id))
+    if sponsor is not None:
+        return sponsor
 
     # TODO: Don't do regex matching here. Find another way.
-    m = re.match(r'(?P<title>(Rep|Sen))\. (?P<name>.*?) +\[(?P<party>[DRI])-(?P<state>[A-Z][A-Z])(-(?P<district>\d{1,2}|At Large))?\]$',
-        sponsor_dict['fullName'])
+    m = SPONSOR_NAME_PATTERN.match(full_name)
 
     if m.group("district") is None:
         district = None # a senator
@@ -26,13 +43,32 @@ def sponsor_for(sponsor_dict):
         # TODO: For backwards compatibility, we're returning a string, but an int would be better.
         district = m.group('district')
 
+    sponsor = Sponsor(
+        title=m.group("title"),
+        name=m.group("name"), # the firstName, middleName, lastName fields have inconsistent capitalization - some are all uppercase
+        district=district,
+        state=m.group('state'),
+        #party=m.group('party'),
+        bioguide_id=bioguide_id,
+    )
+    sponsor_parse_cache.set((full_name, bioguide_id), sponsor)
+    return sponsor
+
+
+def sponsor_for(sponsor_dict):
+    if sponsor_dict is None:
+        # TODO: This can hopefully be removed. In testing s414-113
+        # was missing sponsor data. But all bills have a sponsor?
+        return None
+
+    sponsor = parse_sponsor(sponsor_dict['fullName'], sponsor_dict['bioguideId'])
+
     return {
-        'title': m.group("title"),
-        'name': m.group("name"), # the firstName, middleName, lastName fields have inconsistent capitalization - some are all uppercase
-        'district': district,
-        'state': m.group('state'),
-        #'party': m.group('party'),
-        'bioguide_id': sponsor_dict['bioguideId'],
+        'title': sponsor.title,
+        'name': sponsor.name,
+        'district': sponsor.district,
+        'state': sponsor.state,
+        'bioguide_id': sponsor.bioguide_id,
         'type': 'person'
     }
 
@@ -54,23 +90,6 @@ def summary_for(summaries):
     }
 
 
-def strip_tags(text):
-    # Preserve paragraph breaks. Convert closing p tags (and surrounding
-    #  whitespace) into two newlines. Strip trailing whitespace
-    text = re.sub("\s*</\s*p\s*>\s*", "\n\n", text).strip()
-
-    # naive stripping of tags, should work okay in this limited context
-    text = re.sub("<[^>]+>", "", text)
-
-    # compress and strip whitespace artifacts, except for the paragraph breaks
-    text = re.sub("[ \t\r\f\v]{2,}", " ", text).strip()
-
-    # Replace HTML entities with characters.
-    text = utils.unescape(text)
-
-    return text
-
-
 def committees_for(committee_list):
     if committee_list is None:
         return []
@@ -234,40 +253,51 @@ def current_title_for(titles, title_type):
     return current_title
 
 
-def actions_for(action_list, bill_id, title):
-    # The bulk XML data has action history information from multiple sources. For
-    # major actions, the Library of Congress (code 9) action item often duplicates
-    # the information of a House/Senate action item. We have to skip one so that we
-    # don't tag multiple history items with the same parsed action info, which
-    # would imply the action (like a vote) ocurred multiple times. THOMAS appears
-    # to have suppressed the Library of Congress action lines in certain cases
-    # to avoid duplication - they were not in our older data files.
-    #
-    # Also, there are some ghost action items with totally empty text. Remove those.
-    # TODO: When removed from upstream data, we can remove that check.
-    closure = {
-        "prev": None,
-    }
-    def keep_action(item, closure):
-        if item['text'] in (None, ""):
-            return False
-
-        keep = True
-        if closure['prev']:
-            if item['sourceSystem']['code'] == "9":
-                # Date must match previous action..
-                # If both this and previous have a time, the times must match.
-                # The text must approximately match. Sometimes the LOC text has a prefix
-                #   and different whitespace. And they may drop references -- so we'll
-                # use our action_for helper function to drop references from both
-                # prior to the string comparison.
-                if   item['actionDate'] == closure["prev"]["actionDate"] \
-                 and (item.get('actionTime') == closure["prev"].get("actionTime") or not item.get('actionTime') or not closure["prev"].get("actionTime")) \
-                 and action_for(item)['text'].replace(" ", "").endswith(action_for(closure["prev"])['text'].replace(" ", "")):
-
-                    keep = False
-        closure['prev'] = item
-        return keep
+# The bulk XML data has action history information from multiple sources. For
+# major actions, the Library of Congress (code 9) action item often duplicates
+# the information of a House/Senate action item. We have to skip one so that we
+# don't tag multiple history items with the same parsed action info, which
+# would imply the action (like a vote) ocurred multiple times. THOMAS appears
+# to have suppressed the Library of Congress action lines in certain cases
+# to avoid duplication - they were not in our older data files.
+#
+# Also, there are some ghost action items with totally empty text. Remove those.
+# TODO: When removed from upstream data, we can remove that check.
+#
+# The items are checked in the order they appear in the bulk data (most recent
+# first) and closure['prev'] holds the item checked before this one.
+def keep_action(item, closure):
+    if item['text'] in (None, ""):
+        return False
+
+    keep = True
+    if closure['prev']:
+        if item['sourceSystem']['code'] == "9":
+            # Date must match previous action..
+            # If both this and previous have a time, the times must match.
+            # The text must approximately match. Sometimes the LOC text has a prefix
+            #   and different whitespace. And they may drop references -- so we'll
+            # use our action_for helper function to drop references from both
+            # prior to the string comparison.
+            if   item['actionDate'] == closure["prev"]["actionDate"] \
+             and (item.get('actionTime') == closure["prev"].get("actionTime") or not item.get('actionTime') or not closure["prev"].get("actionTime")) \
+             and action_for(item)['text'].replace(" ", "").endswith(action_for(closure["prev"])['text'].replace(" ", "")):
+
+                keep = False
+    closure['prev'] = item
+    return keep
+
+
+def actions_for(action_list, bill_id, title, closure=None):
+    # closure carries the state of the parse between calls, so that actions
+    # appended to a bill can be parsed on their own: "prev_status" is the bill
+    # status before the first of these actions, and afterwards it is the
+    # status after the last. "prev" is left holding the earliest action item
+    # seen by keep_action.
+    if closure is None:
+        closure = {}
+    closure["prev"] = None
+    closure.setdefault("prev_status", "INTRODUCED")
 
     action_list = [item for item in action_list
         if keep_action(item, closure)]
@@ -292,9 +322,6 @@ def actions_for(action_list, bill_id, title):
 
         return action_dict
 
-    closure = {
-        "prev_status": "INTRODUCED",
-    }
     return [build_dict(action, closure) for action in reversed(action_list)]
 
 
@@ -309,8 +336,8 @@ def action_for(item):
         # across two fields), and although we know it's in local time at the
         # U.S. Capitol (i.e. U.S. Eastern), we don't know the UTC offset which
         # is a part of how we used to serialize the time. So parse and then
-        # use pytz (via format_datetime) to re-serialize.
-        acted_at = utils.format_datetime(datetime.datetime.strptime(item.get('actionDate', '') + " " + item['actionTime'], "%Y-%m-%d %H:%M:%S"))
+        # re-serialize with the offset.
+        acted_at = datetimes.format_datetime(datetimes.parse_datetime(item.get('actionDate', '') + " " + item['actionTime']))
 
     # text & references
     # (amendment actions don't always have text?)
@@ -372,14 +399,18 @@ def cosponsors_for(cosponsors_list):
     cosponsors_list = cosponsors_list['item']
 
     def build_dict(item):
-        cosponsor_dict = sponsor_for(item)
-        del cosponsor_dict["type"] # always 'person'
-        cosponsor_dict.update({
+        cosponsor = parse_sponsor(item['fullName'], item['bioguideId'])
+        return {
+            # no 'type', it's always 'person'
+            'title': cosponsor.title,
+            'name': cosponsor.name,
+            'district': cosponsor.district,
+            'state': cosponsor.state,
+            'bioguide_id': cosponsor.bioguide_id,
             'sponsored_at': item['sponsorshipDate'],
             'withdrawn_at': item['sponsorshipWithdrawnDate'],
             'original_cosponsor': item['isOriginalCosponsor'] == 'True'
-        })
-        return cosponsor_dict
+        }
 
     cosponsors = [build_dict(cosponsor) for cosponsor in cosponsors_list]
 
@@ -425,110 +456,143 @@ def related_bills_for(related_bills_list):
 
     return [build_dict(related_bill) for related_bill in related_bills_list]
 
+# The history, status and slip law of a bill are all computed in one pass over
+# its processed actions. fold_actions folds actions into a plain dict (so it can
+# be saved alongside the bill's data) and can be called again with that state and
+# any newly appended actions to bring it up to date without rescanning.
+
+# first action types that don't make a bill active (see activation_from)
+INACTIVE_FIRST_ACTION_TYPES = ("referral", "calendar", "action")
+
+
+def fold_actions(actions, state=None):
+    # Returns the state after the actions. If a state from a previous call is
+    # given, it is updated in place with actions that came after the ones
+    # already folded into it.
+    if state is None:
+        state = {
+            'action_count': 0,
+            'first_action_type': None,
+            'active': False,
+            'active_at': None,
+            'vetoed_at': None,
+            'enacted': False,
+            'topresident': False,
+            'last_acted_at': None,
+            'status': None,
+            'status_at': None,
+            'slip_law': None,
+        }
+
+    for action in actions:
+        action_type = action['type']
+
+        # activation (see activation_from)
+        if state['action_count'] == 0:
+            state['first_action_type'] = action_type
+            if action_type not in INACTIVE_FIRST_ACTION_TYPES:
+                state['active'] = True
+                state['active_at'] = action['acted_at']
+        elif not state['active']:
+            if (action_type != "referral") and (action_type != "calendar") and ("Sponsor introductory remarks" not in action['text']):
+                state['active'] = True
+                state['active_at'] = action['acted_at']
+        state['action_count'] += 1
+
+        # the last vote of each kind wins
+        if action_type == 'vote':
+            if action['where'] == 'h':
+                chamber = 'house'
+            elif action['where'] == 's':
+                chamber = 'senate'
+            else:
+                chamber = None
+            if chamber:
+                if action['vote_type'] != "override":
+                    vote = chamber + '_passage'
+                else:
+                    vote = chamber + '_override'
+                state[vote + '_result'] = action['result']
+                state[vote + '_result_at'] = action['acted_at']
+        elif (action_type == 'vote-aux') and (action['vote_type'] == 'cloture') and (action['where'] == 's'):
+            state['senate_cloture_result'] = action['result']
+            state['senate_cloture_result_at'] = action['acted_at']
+        elif action_type == 'vetoed':
+            state['vetoed_at'] = action['acted_at']
+        elif action_type == 'enacted':
+            state['enacted'] = True
+            # the first enacted action gives the law number
+            if state['slip_law'] is None:
+                state['slip_law'] = {
+                    'law_type': action["law"],
+                    'congress': action["congress"],
+                    'number': action["number"]
+                }
+        elif action_type == 'topresident':
+            state['topresident'] = True
+
+        # find the latest status change
+        if action.get('status', None):
+            state['status'] = action['status']
+            state['status_at'] = action['acted_at']
+
+        state['last_acted_at'] = action['acted_at']
+
+    return state
+
 # get the public or private law number from any enacted action
 
 
-def slip_law_from(actions):
-    for action in actions:
-        if action["type"] == "enacted":
-            return {
-                'law_type': action["law"],
-                'congress': action["congress"],
-                'number': action["number"]
-            }
+def slip_law_from(actions, state=None):
+    if state is None:
+        state = fold_actions(actions)
+    return state['slip_law']
 
 # find the latest status change in a set of processed actions
 
 
-def latest_status(actions, introduced_at):
-    status, status_date = "INTRODUCED", introduced_at
-    for action in actions:
-        if action.get('status', None):
-            status = action['status']
-            status_date = action['acted_at']
-    return status, status_date
+def latest_status(actions, introduced_at, state=None):
+    if state is None:
+        state = fold_actions(actions)
+    if state['status'] is None:
+        return "INTRODUCED", introduced_at
+    return state['status'], state['status_at']
 
 # look at the final set of processed actions and pull out the major historical events
 
 
-def history_from_actions(actions):
+def history_from_actions(actions, state=None):
+    if state is None:
+        state = fold_actions(actions)
 
     history = {}
 
-    activation = activation_from(actions)
-    if activation:
-        history['active'] = True
-        history['active_at'] = activation['acted_at']
-    else:
-        history['active'] = False
-
-    house_vote = None
-    for action in actions:
-        if (action['type'] == 'vote') and (action['where'] == 'h') and (action['vote_type'] != "override"):
-            house_vote = action
-    if house_vote:
-        history['house_passage_result'] = house_vote['result']
-        history['house_passage_result_at'] = house_vote['acted_at']
+    history['active'] = state['active']
+    if state['active']:
+        history['active_at'] = state['active_at']
 
-    senate_vote = None
-    for action in actions:
-        if (action['type'] == 'vote') and (action['where'] == 's') and (action['vote_type'] != "override"):
-            senate_vote = action
-    if senate_vote:
-        history['senate_passage_result'] = senate_vote['result']
-        history['senate_passage_result_at'] = senate_vote['acted_at']
+    for vote in ('house_passage', 'senate_passage', 'senate_cloture', 'house_override', 'senate_override'):
+        if (vote + '_result') in state:
+            history[vote + '_result'] = state[vote + '_result']
+            history[vote + '_result_at'] = state[vote + '_result_at']
 
-    senate_vote = None
-    for action in actions:
-        if (action['type'] == 'vote-aux') and (action['vote_type'] == 'cloture') and (action['where'] == 's') and (action['vote_type'] != "override"):
-            senate_vote = action
-    if senate_vote:
-        history['senate_cloture_result'] = senate_vote['result']
-        history['senate_cloture_result_at'] = senate_vote['acted_at']
-
-    vetoed = None
-    for action in actions:
-        if action['type'] == 'vetoed':
-            vetoed = action
-    if vetoed:
+    if state['vetoed_at'] is not None:
         history['vetoed'] = True
-        history['vetoed_at'] = vetoed['acted_at']
+        history['vetoed_at'] = state['vetoed_at']
     else:
         history['vetoed'] = False
 
-    house_override_vote = None
-    for action in actions:
-        if (action['type'] == 'vote') and (action['where'] == 'h') and (action['vote_type'] == "override"):
-            house_override_vote = action
-    if house_override_vote:
-        history['house_override_result'] = house_override_vote['result']
-        history['house_override_result_at'] = house_override_vote['acted_at']
-
-    senate_override_vote = None
-    for action in actions:
-        if (action['type'] == 'vote') and (action['where'] == 's') and (action['vote_type'] == "override"):
-            senate_override_vote = action
-    if senate_override_vote:
-        history['senate_override_result'] = senate_override_vote['result']
-        history['senate_override_result_at'] = senate_override_vote['acted_at']
-
-    enacted = None
-    for action in actions:
-        if action['type'] == 'enacted':
-            enacted = action
-    if enacted:
+    # NOTE: enacted_at and awaiting_signature_since have always been the date of the
+    # bill's last action, not of the enacted or topresident action.
+    if state['enacted']:
         history['enacted'] = True
-        history['enacted_at'] = action['acted_at']
+        history['enacted_at'] = state['last_acted_at']
     else:
         history['enacted'] = False
 
-    topresident = None
-    for action in actions:
-        if action['type'] == 'topresident':
-            topresident = action
-    if topresident and (not history['vetoed']) and (not history['enacted']):
+    if state['topresident'] and (not history['vetoed']) and (not history['enacted']):
         history['awaiting_signature'] = True
-        history['awaiting_signature_since'] = action['acted_at']
+        history['awaiting_signature_since'] = state['last_acted_at']
     else:
         history['awaiting_signature'] = False
 
@@ -562,6 +626,89 @@ def activation_from(actions):
         return first
 
 
+# The patterns parse_bill_action_text tries against every action line. They are
+# compiled once and scanned in one pass (see congress/rules.py), and then applied
+# in the order they appear in parse_bill_action_text.
+BILL_ACTION_RULES = rules.RuleTable([
+    rules.Rule(r"^(H|S)\.Amdt\.(\d+)", "amendment"),
+    rules.Rule("("
+        + "|".join([
+            "On passage",
+            "Passed House",
+            "Two-thirds of the Members present having voted in the affirmative the bill is passed,?",
+            "On motion to suspend the rules and pass the (?:bill|resolution)",
+            "On agreeing to the (?:resolution|conference report)",
+            "On motion to suspend the rules and agree to the (?:resolution|conference report)",
+            "House Agreed to Senate Amendments.*?",
+            "On motion that the House (?:suspend the rules and )?(?:agree(?: with an amendment)? to|concur in) the Senate amendments?(?: to the House amendments?| to the Senate amendments?)*",
+        ])
+        + ")"
+        + "(, the objections of the President to the contrary notwithstanding.?)?"
+        + "(, as amended| \(Amended\))?"
+        + " (Passed|Failed|Agreed to|Rejected)?"
+        + " ?(by voice vote|without objection|by (the Yeas and Nays|Yea-Nay Vote|recorded vote)"
+        + "(:? \(2/3 required\))?: (\d+ - \d+(, \d+ Present)? [ \)]*)?\((Roll no\.|Record Vote No:) \d+\))", "house-vote"),
+    rules.Rule(r"Passed House pursuant to|House agreed to Senate amendment (with amendment )?pursuant to", "house-deemed"),
+    rules.Rule(r"Measure passed (House|Senate)(, amended(?: \(.*?\)|, with an amendment to the title)?)?(?:,? in lieu[^,]*)?(?:, roll call #(\d+) \(\d+-\d+\))?", "measure-passed"),
+    rules.Rule(r"(House|Senate) agreed to (?:House|Senate) amendments?( with an amendment)?( under Suspension of the Rules)?(?:, roll call #(\d+) \(\d+-\d+\))?\.", "agreed-to-amendment"),
+    rules.Rule(r"Placed on (the )?([\w ]+) Calendar( under ([\w ]+))?[,\.] Calendar No\. (\d+)\.|Committee Agreed to Seek Consideration Under Suspension of the Rules|Ordered to be Reported", "calendar"),
+    rules.Rule(r"Committee on (.*)\. Reported by", "reported"),
+    rules.Rule(r"Reported to Senate from the (.*?)( \(without written report\))?\.", "reported-to-senate"),
+    rules.Rule(r"(Committee on .*?)\. Hearings held", "hearings"),
+    rules.Rule(r"Committee on (.*)\. Discharged (by Unanimous Consent)?", "discharged"),
+    rules.Rule("Cleared for White House|Presented to President", "topresident"),
+    rules.Rule("Signed by President", "signed"),
+    rules.Rule("Pocket Vetoed by President", "pocket-vetoed"),
+    rules.Rule("Vetoed by President", "vetoed"),
+    rules.Rule("Sent to Archivist of the United States unsigned", "archivist"),
+    rules.Rule("^(?:Became )?(Public|Private) Law(?: No:)? ([\d\-]+)\.", "law"),
+    rules.Rule(r"Referred to (?:the )?(House|Senate)?\s?(?:Committee|Subcommittee)?", "referral"),
+])
+
+# Patterns applied to other text than the whole line, or to parts of a matched vote line.
+BILL_ACTION_PATTERNS = dict((name, rules.Rule(pattern)) for name, pattern in (
+    # (There are some annoying weird cases of double spaces in Senate votes which are
+    # taken care of by the caller.)
+    ("senate-vote", "("
+        + "|".join([
+            "Passed Senate",
+            "Failed of passage in Senate",
+            "Disagreed to in Senate",
+            "Resolution agreed to in Senate",
+            "Senate (?:agreed to|concurred in) (?:the )?(?:conference report|House amendment(?: to the Senate amendments?| to the House amendments?)*)",
+            r"Cloture \S*\s?on the motion to proceed .*?not invoked in Senate",
+            r"Cloture(?: motion)? on the motion to proceed to the (?:bill|measure) invoked in Senate",
+            "Cloture invoked in Senate",
+            "Cloture on (?:the motion to proceed to )?the bill (?:not )?invoked in Senate",
+            "(?:Introduced|Received|Submitted) in the Senate, (?:read twice, |considered, |read the third time, )+and (?:passed|agreed to)",
+        ])
+        + ")"
+        + "(,?.*,?) "
+        + "(without objection|by Unanimous Consent|by Voice Vote|(?:by )?Yea-Nay( Vote)?\. \d+\s*-\s*\d+\. Record Vote (No|Number): \d+)"),
+    ("house-passed", r"Passed House|House Agreed to"),
+    ("prevailed", "(ayes|yeas) had prevailed"),
+    ("pass-or-agreed", r"Pass|Agreed"),
+    ("house-pingpong", r"(agree (with an amendment )?to|concur in) the Senate amendment"),
+    ("conference-report", "conference report"),
+    ("house-roll", r"\((Roll no\.|Record Vote No:) (\d+)\)"),
+    ("disagreed", "disagreed"),
+    ("senate-passed", "passed|agreed|concurred|bill invoked|measure invoked|cloture invoked"),
+    ("over-veto", "over veto"),
+    ("cloture", "cloture"),
+    ("senate-pingpong", "Senate agreed to (the )?House amendment|Senate concurred in (the )?House amendment"),
+    ("senate-roll", r"Record Vote (No|Number): (\d+)"),
+    ("with-amendment", r"with amendments|with an amendment"),
+))
+
+
+# The same action texts ("Referred to the House Committee on ...", "Introduced in House")
+# recur across thousands of bills, so the part of the parse that depends only on the
+# text and the bill type is memoized across bills. The text is used verbatim as the
+# key because several of the patterns below are whitespace-sensitive.
+ACTION_PARSE_CACHE_SIZE = 50000
+action_parse_cache = utils.LRUCache("Bill action", ACTION_PARSE_CACHE_SIZE)
+
+
 def parse_bill_action(action_dict, prev_status, bill_id, title):
     """Parse a THOMAS bill action line. Returns attributes to be set in the XML file on the action line."""
 
@@ -569,16 +716,52 @@ def parse_bill_action(action_dict, prev_status, bill_id, title):
 
     line = action_dict['text']
 
-    status = None
+    parsed = action_parse_cache.get((line, bill_type))
+    if parsed is None:
+        parsed = parse_bill_action_text(line, bill_type)
+        action_parse_cache.set((line, bill_type), parsed)
+
+    action, transitions = parsed
+    if action is None:
+        # Process actions specific to amendments separately.
+        return None, None
+
+    # The cached dict is shared by every bill with this action text.
+    action = dict(action)
+
+    status = status_after_action(transitions, prev_status, line, bill_id, bill_type, title)
+
+    # sweep the action line for bill IDs of related bills
+    bill_ids = utils.extract_bills(line, congress)
+    bill_ids = filter(lambda b: b != bill_id, bill_ids)
+    if bill_ids and (len(bill_ids) > 0):
+        action['bill_ids'] = bill_ids
+
+    return action, status
+
+
+def parse_bill_action_text(line, bill_type):
+    """
+    Parse the part of an action line that does not depend on the bill's prior
+    status. Returns the action attributes and the list of status transitions
+    the line implies, which status_after_action resolves against prev_status.
+    """
+
     action = {
         "type": "action"
     }
+    transitions = []
+
+    line = line.replace(", the Passed", ", Passed")
+    # 106 h4733 and others
+
+    # Try all of the patterns at once. Where several match, they are applied below
+    # in the same order as before, so later ones override earlier ones.
+    matches = BILL_ACTION_RULES.scan(line)
 
     # If a line starts with an amendment number, this action is on the amendment and cannot
     # be parsed yet.
-    m = re.search(r"^(H|S)\.Amdt\.(\d+)", line, re.I)
-    if m != None:
-        # Process actions specific to amendments separately.
+    if "amendment" in matches:
         return None, None
 
     # Otherwise, parse the action line for key actions.
@@ -586,38 +769,18 @@ def parse_bill_action(action_dict, prev_status, bill_id, title):
     # VOTES
 
     # A House Vote.
-    line = re.sub(", the Passed", ", Passed", line)
-    # 106 h4733 and others
-
-    m = re.search("("
-        + "|".join([
-            "On passage",
-            "Passed House",
-            "Two-thirds of the Members present having voted in the affirmative the bill is passed,?",
-            "On motion to suspend the rules and pass the (?:bill|resolution)",
-            "On agreeing to the (?:resolution|conference report)",
-            "On motion to suspend the rules and agree to the (?:resolution|conference report)",
-            "House Agreed to Senate Amendments.*?",
-            "On motion that the House (?:suspend the rules and )?(?:agree(?: with an amendment)? to|concur in) the Senate amendments?(?: to the House amendments?| to the Senate amendments?)*",
-        ])
-        + ")"
-        + "(, the objections of the President to the contrary notwithstanding.?)?"
-        + "(, as amended| \(Amended\))?"
-        + " (Passed|Failed|Agreed to|Rejected)?"
-        + " ?(by voice vote|without objection|by (the Yeas and Nays|Yea-Nay Vote|recorded vote)"
-        + "(:? \(2/3 required\))?: (\d+ - \d+(, \d+ Present)? [ \)]*)?\((Roll no\.|Record Vote No:) \d+\))",
-        line, re.I)
+    m = matches.get("house-vote")
     if m != None:
         motion, is_override, as_amended, pass_fail, how = m.group(1), m.group(2), m.group(3), m.group(4), m.group(5)
 
         # print line
         # print m.groups()
 
-        if re.search(r"Passed House|House Agreed to", motion, re.I):
+        if BILL_ACTION_PATTERNS["house-passed"].search(motion):
             pass_fail = 'pass'
-        elif re.search("(ayes|yeas) had prevailed", line, re.I):
+        elif BILL_ACTION_PATTERNS["prevailed"].search(line):
             pass_fail = 'pass'
-        elif re.search(r"Pass|Agreed", pass_fail, re.I):
+        elif BILL_ACTION_PATTERNS["pass-or-agreed"].search(pass_fail):
             pass_fail = 'pass'
         else:
             pass_fail = 'fail'
@@ -627,9 +790,9 @@ def parse_bill_action(action_dict, prev_status, bill_id, title):
 
         if is_override:
             vote_type = "override"
-        elif re.search(r"(agree (with an amendment )?to|concur in) the Senate amendment", line, re.I):
+        elif BILL_ACTION_PATTERNS["house-pingpong"].search(line):
             vote_type = "pingpong"
-        elif re.search("conference report", line, re.I):
+        elif BILL_ACTION_PATTERNS["conference-report"].search(line):
             vote_type = "conference"
         elif bill_type[0] == "h":
             vote_type = "vote"
@@ -637,7 +800,7 @@ def parse_bill_action(action_dict, prev_status, bill_id, title):
             vote_type = "vote2"
 
         roll = None
-        m = re.search(r"\((Roll no\.|Record Vote No:) (\d+)\)", how, re.I)
+        m = BILL_ACTION_PATTERNS["house-roll"].search(how)
         if m != None:
             how = "roll"  # normalize the ugly how
             roll = m.group(2)
@@ -659,17 +822,12 @@ def parse_bill_action(action_dict, prev_status, bill_id, title):
             action["roll"] = roll
         action["suspension"] = suspension
 
-        # correct upstream data error
-        if bill_id == "s2012-114" and "Roll no. 250" in line: as_amended = True
-        if bill_id == "s2943-114" and "On passage Passed without objection" in line: as_amended = True
-
-        # get the new status of the bill after this vote
-        new_status = new_status_after_vote(vote_type, pass_fail == "pass", "h", bill_type, suspension, as_amended, title, prev_status)
-        if new_status:
-            status = new_status
+        # get the new status of the bill after this vote (upstream data errors
+        # are corrected per bill in status_after_action)
+        transitions.append(("house-vote", vote_type, pass_fail == "pass", "h", suspension, as_amended))
 
     # Passed House, not necessarily by an actual vote (think "deem")
-    m = re.search(r"Passed House pursuant to|House agreed to Senate amendment (with amendment )?pursuant to", line, re.I)
+    m = matches.get("house-deemed")
     if m != None:
         vote_type = "vote" if (bill_type[0] == "h") else "vote2"
         if "agreed to Senate amendment" in line: vote_type = "pingpong"
@@ -683,65 +841,46 @@ def parse_bill_action(action_dict, prev_status, bill_id, title):
         action["result"] = pass_fail
 
         # get the new status of the bill after this vote
-        new_status = new_status_after_vote(vote_type, pass_fail == "pass", "h", bill_type, False, as_amended, title, prev_status)
-
-        if new_status:
-            status = new_status
+        transitions.append(("vote", vote_type, pass_fail == "pass", "h", False, as_amended))
 
     # A Senate Vote
     # (There are some annoying weird cases of double spaces which are taken care of
     # at the end.)
-    m = re.search("("
-        + "|".join([
-        "Passed Senate",
-        "Failed of passage in Senate",
-        "Disagreed to in Senate",
-        "Resolution agreed to in Senate",
-        "Senate (?:agreed to|concurred in) (?:the )?(?:conference report|House amendment(?: to the Senate amendments?| to the House amendments?)*)",
-        r"Cloture \S*\s?on the motion to proceed .*?not invoked in Senate",
-        r"Cloture(?: motion)? on the motion to proceed to the (?:bill|measure) invoked in Senate",
-        "Cloture invoked in Senate",
-        "Cloture on (?:the motion to proceed to )?the bill (?:not )?invoked in Senate",
-        "(?:Introduced|Received|Submitted) in the Senate, (?:read twice, |considered, |read the third time, )+and (?:passed|agreed to)",
-        ])
-        + ")"
-        + "(,?.*,?) "
-        + "(without objection|by Unanimous Consent|by Voice Vote|(?:by )?Yea-Nay( Vote)?\. \d+\s*-\s*\d+\. Record Vote (No|Number): \d+)",
-        line.replace("  ", " "), re.I)
+    m = BILL_ACTION_PATTERNS["senate-vote"].search(line.replace("  ", " "))
     if m != None:
         motion, extra, how = m.group(1), m.group(2), m.group(3)
         roll = None
 
         # put disagreed check first, cause "agreed" is contained inside it
-        if re.search("disagreed", motion, re.I):
+        if BILL_ACTION_PATTERNS["disagreed"].search(motion):
             pass_fail = "fail"
-        elif re.search("passed|agreed|concurred|bill invoked|measure invoked|cloture invoked", motion, re.I):
+        elif BILL_ACTION_PATTERNS["senate-passed"].search(motion):
             pass_fail = "pass"
         else:
             pass_fail = "fail"
 
         voteaction_type = "vote"
-        if re.search("over veto", extra, re.I):
+        if BILL_ACTION_PATTERNS["over-veto"].search(extra):
             vote_type = "override"
-        elif re.search("conference report", motion, re.I):
+        elif BILL_ACTION_PATTERNS["conference-report"].search(motion):
             vote_type = "conference"
-        elif re.search("cloture", motion, re.I):
+        elif BILL_ACTION_PATTERNS["cloture"].search(motion):
             vote_type = "cloture"
             voteaction_type = "vote-aux"  # because it is not a vote on passage
-        elif re.search("Senate agreed to (the )?House amendment|Senate concurred in (the )?House amendment", motion, re.I):
+        elif BILL_ACTION_PATTERNS["senate-pingpong"].search(motion):
             vote_type = "pingpong"
         elif bill_type[0] == "s":
             vote_type = "vote"
         else:
             vote_type = "vote2"
 
-        m = re.search(r"Record Vote (No|Number): (\d+)", how, re.I)
+        m = BILL_ACTION_PATTERNS["senate-roll"].search(how)
         if m != None:
             roll = m.group(2)
             how = "roll"
 
         as_amended = False
-        if re.search(r"with amendments|with an amendment", extra, re.I):
+        if BILL_ACTION_PATTERNS["with-amendment"].search(extra):
             as_amended = True
 
         action["type"] = voteaction_type
@@ -753,14 +892,11 @@ def parse_bill_action(action_dict, prev_status, bill_id, title):
             action["roll"] = roll
 
         # get the new status of the bill after this vote
-        new_status = new_status_after_vote(vote_type, pass_fail == "pass", "s", bill_type, False, as_amended, title, prev_status)
-
-        if new_status:
-            status = new_status
+        transitions.append(("vote", vote_type, pass_fail == "pass", "s", False, as_amended))
 
     # OLD-STYLE VOTES (93rd Congress-ish)
 
-    m = re.search(r"Measure passed (House|Senate)(, amended(?: \(.*?\)|, with an amendment to the title)?)?(?:,? in lieu[^,]*)?(?:, roll call #(\d+) \(\d+-\d+\))?", line, re.I)
+    m = matches.get("measure-passed")
     if m != None:
         chamber = m.group(1)[0].lower()  # 'h' or 's'
         as_amended = m.group(2)
@@ -775,11 +911,9 @@ def parse_bill_action(action_dict, prev_status, bill_id, title):
             action["roll"] = roll_num
         action["result"] = pass_fail
         action["where"] = chamber
-        new_status = new_status_after_vote(vote_type, pass_fail == "pass", chamber, bill_type, False, as_amended, title, prev_status)
-        if new_status:
-            status = new_status
+        transitions.append(("vote", vote_type, pass_fail == "pass", chamber, False, as_amended))
 
-    m = re.search(r"(House|Senate) agreed to (?:House|Senate) amendments?( with an amendment)?( under Suspension of the Rules)?(?:, roll call #(\d+) \(\d+-\d+\))?\.", line, re.I)
+    m = matches.get("agreed-to-amendment")
     if m != None:
         chamber = m.group(1)[0].lower()  # 'h' or 's'
         as_amended = m.group(2)
@@ -796,18 +930,15 @@ def parse_bill_action(action_dict, prev_status, bill_id, title):
         action["result"] = pass_fail
         action["where"] = chamber
         action["suspension"] = (suspension != None)
-        new_status = new_status_after_vote(vote_type, pass_fail == "pass", chamber, bill_type, False, as_amended, title, prev_status)
-        if new_status:
-            status = new_status
+        transitions.append(("vote", vote_type, pass_fail == "pass", chamber, False, as_amended))
 
     # PSUDO-REPORTING (because GovTrack did this, but should be changed)
 
     # TODO: Make a new status for this as pre-reported.
-    m = re.search(r"Placed on (the )?([\w ]+) Calendar( under ([\w ]+))?[,\.] Calendar No\. (\d+)\.|Committee Agreed to Seek Consideration Under Suspension of the Rules|Ordered to be Reported", line, re.I)
+    m = matches.get("calendar")
     if m != None:
         # TODO: This makes no sense.
-        if prev_status in ("INTRODUCED", "REFERRED"):
-            status = "REPORTED"
+        transitions.append(("reported",))
 
         action["type"] = "calendar"
 
@@ -820,89 +951,122 @@ def parse_bill_action(action_dict, prev_status, bill_id, title):
     # COMMITTEE ACTIONS
 
     # reported
-    m = re.search(r"Committee on (.*)\. Reported by", line, re.I)
+    m = matches.get("reported")
     if m != None:
         action["type"] = "reported"
         action["committee"] = m.group(1)
-        if prev_status in ("INTRODUCED", "REFERRED"):
-            status = "REPORTED"
-    m = re.search(r"Reported to Senate from the (.*?)( \(without written report\))?\.", line, re.I)
+        transitions.append(("reported",))
+    m = matches.get("reported-to-senate")
     if m != None:  # 93rd Congress
         action["type"] = "reported"
         action["committee"] = m.group(1)
-        if prev_status in ("INTRODUCED", "REFERRED"):
-            status = "REPORTED"
+        transitions.append(("reported",))
 
     # hearings held by a committee
-    m = re.search(r"(Committee on .*?)\. Hearings held", line, re.I)
+    m = matches.get("hearings")
     if m != None:
         action["committee"] = m.group(1)
         action["type"] = "hearings"
 
-    m = re.search(r"Committee on (.*)\. Discharged (by Unanimous Consent)?", line, re.I)
+    m = matches.get("discharged")
     if m != None:
         action["committee"] = m.group(1)
         action["type"] = "discharged"
-        if prev_status in ("INTRODUCED", "REFERRED"):
-            status = "REPORTED"
+        transitions.append(("reported",))
 
-    m = re.search("Cleared for White House|Presented to President", line, re.I)
+    m = matches.get("topresident")
     if m != None:
         action["type"] = "topresident"
 
-    m = re.search("Signed by President", line, re.I)
+    m = matches.get("signed")
     if m != None:
         action["type"] = "signed"
-        status = "ENACTED:SIGNED"
+        transitions.append(("status", "ENACTED:SIGNED"))
 
-    m = re.search("Pocket Vetoed by President", line, re.I)
+    m = matches.get("pocket-vetoed")
     if m != None:
         action["type"] = "vetoed"
         action["pocket"] = "1"
-        status = "VETOED:POCKET"
+        transitions.append(("status", "VETOED:POCKET"))
 
     # need to put this in an else, or this regex will match the pocket veto and override it
     else:
-        m = re.search("Vetoed by President", line, re.I)
+        m = matches.get("vetoed")
         if m != None:
             action["type"] = "vetoed"
-            status = "PROV_KILL:VETO"
+            transitions.append(("status", "PROV_KILL:VETO"))
 
-    m = re.search("Sent to Archivist of the United States unsigned", line, re.I)
+    m = matches.get("archivist")
     if m != None:
-        status = "ENACTED:TENDAYRULE"
+        transitions.append(("status", "ENACTED:TENDAYRULE"))
 
-    m = re.search("^(?:Became )?(Public|Private) Law(?: No:)? ([\d\-]+)\.", line, re.I)
+    m = matches.get("law")
     if m != None:
         action["law"] = m.group(1).lower()
         pieces = m.group(2).split("-")
         action["congress"] = pieces[0]
         action["number"] = pieces[1]
         action["type"] = "enacted"
-        if prev_status in ("ENACTED:SIGNED", "ENACTED:VETO_OVERRIDE", "ENACTED:TENDAYRULE"):
-            pass  # this is a final administrative step
-        elif prev_status == "PROV_KILL:VETO" or prev_status.startswith("VETOED:"):
-            # somehow missed the override steps
-            status = "ENACTED:VETO_OVERRIDE"
-        elif bill_id in ("s2641-93", "hr1589-94", "s2527-100", "hr1677-101", "hr2978-101", "hr2126-104", "s1322-104"):
-            status = "ENACTED:TENDAYRULE"
-        else:
-            raise Exception("Missing Signed by President action? If this is a case of the 10-day rule, hard code the bill id %s here." % bill_id)
+        transitions.append(("enacted",))
 
     # Check for referral type
-    m = re.search(r"Referred to (?:the )?(House|Senate)?\s?(?:Committee|Subcommittee)?", line, re.I)
+    m = matches.get("referral")
     if m != None:
         action["type"] = "referral"
-        if prev_status == "INTRODUCED":
-            status = "REFERRED"
+        transitions.append(("referral",))
 
-    # sweep the action line for bill IDs of related bills
-    bill_ids = utils.extract_bills(line, congress)
-    bill_ids = filter(lambda b: b != bill_id, bill_ids)
-    if bill_ids and (len(bill_ids) > 0):
-        action['bill_ids'] = bill_ids
+    return action, transitions
 
-    return action, status
+
+def status_after_action(transitions, prev_status, line, bill_id, bill_type, title):
+    """
+    Resolve the status transitions found by parse_bill_action_text against the
+    bill's previous status. As in a single top-to-bottom parse of the line, a
+    later transition that yields a status overrides an earlier one.
+    """
+
+    status = None
+
+    for transition in transitions:
+        kind = transition[0]
+        new_status = None
+
+        if kind in ("vote", "house-vote"):
+            vote_type, passed, chamber, suspension, as_amended = transition[1:]
+
+            if kind == "house-vote":
+                # correct upstream data error
+                if bill_id == "s2012-114" and "Roll no. 250" in line: as_amended = True
+                if bill_id == "s2943-114" and "On passage Passed without objection" in line: as_amended = True
+
+            new_status = new_status_after_vote(vote_type, passed, chamber, bill_type, suspension, as_amended, title, prev_status)
+
+        elif kind == "reported":
+            if prev_status in ("INTRODUCED", "REFERRED"):
+                new_status = "REPORTED"
+
+        elif kind == "referral":
+            if prev_status == "INTRODUCED":
+                new_status = "REFERRED"
+
+        elif kind == "status":
+            new_status = transition[1]
+
+        elif kind == "enacted":
+            if prev_status in ("ENACTED:SIGNED", "ENACTED:VETO_OVERRIDE", "ENACTED:TENDAYRULE"):
+                pass  # this is a final administrative step
+            elif prev_status == "PROV_KILL:VETO" or prev_status.startswith("VETOED:"):
+                # somehow missed the override steps
+                new_status = "ENACTED:VETO_OVERRIDE"
+            elif bill_id in ("s2641-93", "hr1589-94", "s2527-100", "hr1677-101", "hr2978-101", "hr2126-104", "s1322-104"):
+                new_status = "ENACTED:TENDAYRULE"
+            else:
+                raise Exception("Missing Signed by President action? If this is a case of the 10-day rule, hard code the bill id %s here." % bill_id)
+
+        if new_status:
+            status = new_status
+
+    return status
 
 
 def new_status_after_vote(vote_type, passed, chamber, bill_type, suspension, amended, title, prev_status):
@@ -46,7 +46,8 @@ def form_bill_json_dict(xml_as_dict):
                                     bill_info.current_title_for(titles,
                                                                 'official'))
     _introduced = bill_dict.get('introducedDate', '')
-    status, status_date = bill_info.latest_status(actions, _introduced)
+    action_state = bill_info.fold_actions(actions)
+    status, status_date = bill_info.latest_status(actions, _introduced, action_state)
 
     bill_data = {
         'bill_id': bill_id,
@@ -62,10 +63,10 @@ def form_bill_json_dict(xml_as_dict):
         'cosponsors': bill_info.cosponsors_for(bill_dict['cosponsors']),
 
         'actions': actions,
-        'history': bill_info.history_from_actions(actions),
+        'history': bill_info.history_from_actions(actions, action_state),
         'status': status,
         'status_at': status_date,
-        'enacted_as': bill_info.slip_law_from(actions),
+        'enacted_as': bill_info.slip_law_from(actions, action_state),
 
         'titles': titles,
         'official_title': bill_info.current_title_for(titles, 'official'),
@@ -93,3 +94,129 @@ def form_bill_json_dict(xml_as_dict):
     }
 
     return bill_data
+
+
+# Incremental updates.
+#
+# BILLSTATUS updates usually only add actions to the front of the (reverse-
+# chronological) action list. parse_state_for records enough about a parsed
+# bill to bring its data up to date later by parsing only the new actions. The
+# state is a plain dict so that it can be saved next to the bill's data.
+
+# bill fields that don't affect the formed bill data, or that are handled
+# separately by update_bill_json_dict
+_UNTRACKED_BILL_FIELDS = ('actions', 'latestAction', 'updateDate')
+
+
+def _fingerprint(data):
+    import hashlib
+    import json
+    return hashlib.sha1(json.dumps(data, sort_keys=True)).hexdigest()
+
+
+def _fields_fingerprint(bill_dict):
+    return _fingerprint([(k, v) for k, v in bill_dict.items() if k not in _UNTRACKED_BILL_FIELDS])
+
+
+def _action_items(bill_dict):
+    if not bill_dict.get('actions'):
+        return []
+    return bill_dict['actions']['item']
+
+
+def _record_actions(parse_state, items, action_state):
+    parse_state.update({
+        'action_count': len(items),
+        'actions_fingerprint': _fingerprint(items),
+
+        # for the LOC duplicate check against actions added later: the most
+        # recent item with text, which keep_action compares with the item
+        # before it (items without text are dropped without being compared)
+        'last_text_action': next((item for item in items if item['text'] not in (None, "")), None),
+
+        'prev_status': action_state['status'] or "INTRODUCED",
+        'action_state': action_state,
+    })
+    return parse_state
+
+
+def parse_state_for(xml_as_dict, bill_data):
+    """
+    Record the state of a bill parsed by :func:`form_bill_json_dict` for a
+    later incremental update.
+
+    Parameters
+    ----------
+    xml_as_dict : dict
+    bill_data : dict
+
+    Returns
+    -------
+    dict
+    """
+    bill_dict = xml_as_dict['billStatus']['bill']
+    parse_state = {
+        'fields_fingerprint': _fields_fingerprint(bill_dict),
+    }
+    return _record_actions(parse_state, _action_items(bill_dict), bill_info.fold_actions(bill_data['actions']))
+
+
+def update_bill_json_dict(xml_as_dict, bill_data, parse_state):
+    """
+    Bring bill data formed from an earlier version of the bill's XML up to
+    date by parsing only the actions that were added since.
+
+    Returns None if anything else changed and the bill must be parsed again
+    in full with :func:`form_bill_json_dict`. Otherwise bill_data and
+    parse_state are updated in place to the new version and bill_data is
+    returned.
+
+    Parameters
+    ----------
+    xml_as_dict : dict
+    bill_data : dict
+        The output of :func:`form_bill_json_dict` for the earlier version.
+    parse_state : dict
+        The output of :func:`parse_state_for` for the earlier version.
+
+    Returns
+    -------
+    dict
+    """
+    bill_dict = xml_as_dict['billStatus']['bill']
+    if parse_state['fields_fingerprint'] != _fields_fingerprint(bill_dict):
+        return None
+
+    # The earlier items must be unchanged at the end of the list.
+    items = _action_items(bill_dict)
+    new_count = len(items) - parse_state['action_count']
+    if new_count < 0:
+        return None
+    if _fingerprint(items[new_count:]) != parse_state['actions_fingerprint']:
+        return None
+
+    closure = {"prev_status": parse_state['prev_status']}
+    new_actions = bill_info.actions_for(items[:new_count],
+                                        bill_data['bill_id'],
+                                        bill_data['official_title'],
+                                        closure)
+
+    # The most recent of the earlier actions with text may now be a
+    # duplicate of a new action, which would change the earlier actions.
+    if 'last_text_action' not in parse_state:
+        return None  # saved by an older version
+    if parse_state['last_text_action'] is not None and not bill_info.keep_action(parse_state['last_text_action'], closure):
+        return None
+
+    action_state = bill_info.fold_actions(new_actions, parse_state['action_state'])
+    status, status_date = bill_info.latest_status(None, bill_data['introduced_at'], action_state)
+
+    bill_data['actions'] = bill_data['actions'] + new_actions
+    bill_data['history'] = bill_info.history_from_actions(None, action_state)
+    bill_data['status'] = status
+    bill_data['status_at'] = status_date
+    bill_data['enacted_as'] = bill_info.slip_law_from(None, action_state)
+    bill_data['updated_at'] = bill_dict.get('updateDate', '')
+
+    _record_actions(parse_state, items, action_state)
+    return bill_data
@@ -0,0 +1,354 @@
+"""
+Column-oriented tables of parsed bills and their actions.
+
+Answering a question across a whole Congress from data.json files (or from
+the record store) means loading every bill. :func:`export` instead writes
+two tables, one row per bill and one row per action, as NumPy arrays: one
+array per column, saved together in ``bills.npz`` and ``actions.npz``, so
+that e.g. counting the enacted bills, or the actions of each type by month,
+is a vectorized operation over arrays that load in milliseconds. When
+pyarrow is installed the same tables are also written as ``bills.parquet``
+and ``actions.parquet``.
+
+Columns of strings that take few distinct values (bill types, statuses,
+action types, sponsors...) are dictionary encoded: the column holds an
+integer code per row, and a ``<column>.categories`` array holds the
+(sorted) values the codes index, so that ``status == "ENACTED:SIGNED"`` is
+a comparison of integers (see :func:`code`). Dates are ``datetime64[D]``,
+with NaT where there's no date. The actions table's ``bill`` column is the
+row of the action's bill in the bills table.
+
+The bills table also keeps the file each row was read from and that file's
+modification time and size, so that exporting again only reads the records
+that were added or changed since.
+"""
+
+import errno
+import os
+
+# Column types, besides NumPy dtypes.
+STRING = "string"
+CATEGORY = "category"
+DATE = "date"
+
+BILL_COLUMNS = (
+    ("bill_id", STRING),
+    ("bill_type", CATEGORY),
+    ("number", "int32"),
+    ("congress", "int16"),
+    ("introduced_at", DATE),
+    ("status", CATEGORY),
+    ("status_at", DATE),
+    ("sponsor", CATEGORY),
+    ("sponsor_state", CATEGORY),
+    ("subjects_top_term", CATEGORY),
+    ("cosponsors", "int32"),
+    ("actions", "int32"),
+    ("active", "bool"),
+    ("vetoed", "bool"),
+    ("enacted", "bool"),
+)
+
+ACTION_COLUMNS = (
+    ("bill", "int32"),
+    ("position", "int32"),
+    ("acted_at", DATE),
+    ("type", CATEGORY),
+    ("action_code", CATEGORY),
+    ("status", CATEGORY),
+)
+
+# where each bill row came from, to export only what changed
+SOURCE_COLUMNS = (
+    ("source", STRING),
+    ("source_mtime", "float64"),
+    ("source_size", "int64"),
+)
+
+def date_string(value):
+    # a date or a time as written in the records => the date
+    if not value:
+        return "NaT"
+    return value[:10]
+
+
+def bill_row(bill):
+    """A bill record's row in the bills table."""
+    sponsor = bill.get("sponsor") or {}
+    history = bill.get("history") or {}
+    return (
+        bill["bill_id"],
+        bill.get("bill_type") or u"",
+        int(bill.get("number") or 0),
+        int(bill.get("congress") or 0),
+        date_string(bill.get("introduced_at")),
+        bill.get("status") or u"",
+        date_string(bill.get("status_at")),
+        sponsor.get("bioguide_id") or sponsor.get("thomas_id") or u"",
+        sponsor.get("state") or u"",
+        bill.get("subjects_top_term") or u"",
+        sum(1 for cosponsor in bill.get("cosponsors") or [] if not cosponsor.get("withdrawn_at")),
+        len(bill.get("actions") or []),
+        bool(history.get("active")),
+        bool(history.get("vetoed")),
+        bool(history.get("enacted")),
+    )
+
+
+def action_rows(bill, row):
+    """The rows of a bill record's actions in the actions table."""
+    return [
+        (row, position, date_string(action.get("acted_at")), action.get("type") or u"",
+         action.get("action_code") or u"", action.get("status") or u"")
+        for position, action in enumerate(bill.get("actions") or [])]
+
+
+def code_type(count):
+    # the smallest signed integer type for codes of this many categories
+    for dtype, limit in (("int8", 2 ** 7), ("int16", 2 ** 15)):
+        if count <= limit:
+            return dtype
+    return "int32"
+
+
+def encode(name, values):
+    """
+    Dictionary encode a column of strings.
+
+    Returns
+    -------
+    dict
+        The column's codes (name) and categories (name + ".categories").
+    """
+    import numpy
+
+    categories, codes = numpy.unique(numpy.asarray(values, dtype=unicode), return_inverse=True)
+    return {name: codes.astype(code_type(len(categories))), name + ".categories": categories}
+
+
+def decode(table, name):
+    """The values of a dictionary encoded column."""
+    return table[name + ".categories"][table[name]]
+
+
+def code(table, name, value):
+    """
+    The code of a value in a dictionary encoded column, or -1 if no row has
+    that value (which then matches no code).
+    """
+    import numpy
+
+    categories = table[name + ".categories"]
+    i = numpy.searchsorted(categories, value)
+    if i < len(categories) and categories[i] == value:
+        return i
+    return -1
+
+
+def columns(rows, spec):
+    """
+    Build the arrays of a table from rows of plain values (decoded, dates as
+    strings), one array per column (and one more per dictionary encoded
+    column) by name.
+    """
+    import numpy
+
+    table = {}
+    values = zip(*rows) if rows else [()] * len(spec)
+    for (name, kind), column in zip(spec, values):
+        if kind == CATEGORY:
+            table.update(encode(name, column))
+        elif kind == STRING:
+            table[name] = numpy.asarray(column, dtype=unicode)
+        elif kind == DATE:
+            table[name] = numpy.asarray(column, dtype="datetime64[D]")
+        else:
+            table[name] = numpy.asarray(column, dtype=kind)
+    return table
+
+
+def take(table, spec, rows):
+    """
+    A table's columns for some of its rows, by index, with dictionary
+    encoded columns decoded so they can be joined with other rows.
+    """
+    taken = {}
+    for name, kind in spec:
+        if kind == CATEGORY:
+            taken[name] = decode(table, name)[rows]
+        else:
+            taken[name] = table[name][rows]
+    return taken
+
+
+def concatenate(parts, spec, order=None):
+    """
+    Join decoded columns (see :func:`take`) into the arrays of a table,
+    optionally putting the rows in another order.
+    """
+    import numpy
+
+    table = {}
+    for name, kind in spec:
+        column = numpy.concatenate([part[name] for part in parts])
+        if order is not None:
+            column = column[order]
+        if kind == CATEGORY:
+            table.update(encode(name, column))
+        elif kind == STRING:
+            table[name] = column.astype(unicode)
+        elif kind == DATE:
+            table[name] = column.astype("datetime64[D]")
+        else:
+            table[name] = column.astype(kind)
+    return table
+
+
+def load_table(directory, name):
+    """
+    Load one of the tables ("bills" or "actions") written by :func:`export`
+    in a directory, as a dict of arrays by column name. Returns None if it
+    hasn't been written.
+    """
+    import numpy
+
+    try:
+        with numpy.load(os.path.join(directory, name + ".npz")) as saved:
+            return dict(saved.items())
+    except IOError as e:
+        if e.errno == errno.ENOENT:
+            return None
+        raise
+
+
+def save_table(directory, name, table):
+    # replaced only once the whole file has been written
+    import numpy
+
+    path = os.path.join(directory, name + ".npz")
+    f = open(path + ".new", "wb")
+    try:
+        with f:
+            numpy.savez(f, **table)
+    except:
+        os.unlink(path + ".new")
+        raise
+    os.rename(path + ".new", path)
+
+
+def save_parquet(directory, name, table, spec):
+    import pyarrow
+    from pyarrow import parquet
+
+    arrays, names = [], []
+    for column, kind in spec:
+        if kind == CATEGORY:
+            arrays.append(pyarrow.DictionaryArray.from_arrays(
+                table[column].astype("int32"), table[column + ".categories"]))
+        else:
+            arrays.append(pyarrow.array(table[column]))
+        names.append(column)
+    parquet.write_table(pyarrow.Table.from_arrays(arrays, names), os.path.join(directory, name + ".parquet"))
+
+
+def export(paths, load, directory, force=False, parquet=None):
+    """
+    Write (or update) the bills and actions tables of a set of bill records.
+
+    Parameters
+    ----------
+    paths : list of str
+        The files the records are read from, e.g. the record store's files
+        for a Congress (see :meth:`congress.recordstore.RecordStore.paths`).
+    load : function(path) => dict
+        Reads the bill record in a file, or returns None to leave it out.
+    directory : str
+        Where the tables are written.
+    force : bool
+        Read every record, not just those whose files changed since the
+        tables were last written.
+    parquet : bool
+        Also write Parquet files. By default, if pyarrow is installed.
+
+    Returns
+    -------
+    (int, int)
+        The number of bills in the tables and the number that were read.
+    """
+    import numpy
+
+    previous = None if force else load_table(directory, "bills")
+    previous_actions = None if previous is None else load_table(directory, "actions")
+    if previous_actions is None or previous_actions.get("generation") != previous.get("generation"):
+        previous = None
+
+    stamps = {}
+    for path in paths:
+        stat = os.stat(path)
+        stamps[path] = (stat.st_mtime, stat.st_size)
+
+    # the rows of bills whose files haven't changed, and the new rows of
+    # those whose files are new or have
+    kept = numpy.zeros(0, dtype="int64")
+    if previous is not None:
+        kept = numpy.array([
+            i for i, (source, mtime, size)
+            in enumerate(zip(previous["source"], previous["source_mtime"], previous["source_size"]))
+            if stamps.get(source) == (mtime, size)], dtype="int64")
+    kept_sources = set(previous["source"][kept]) if previous is not None else set()
+    changed = [path for path in paths if path not in kept_sources]
+
+    bill_spec = BILL_COLUMNS + SOURCE_COLUMNS
+    bill_rows, new_action_rows = [], []
+    for path in changed:
+        bill = load(path)
+        if bill is None:
+            continue
+        row = len(kept) + len(bill_rows)
+        bill_rows.append(bill_row(bill) + (path,) + stamps[path])
+        new_action_rows.extend(action_rows(bill, row))
+
+    bills = [take(columns(bill_rows, bill_spec), bill_spec, slice(None))]
+    actions = [take(columns(new_action_rows, ACTION_COLUMNS), ACTION_COLUMNS, slice(None))]
+    if len(kept):
+        bills.insert(0, take(previous, bill_spec, kept))
+
+        # the kept bills' actions, pointing to their new rows
+        new_row = numpy.full(len(previous["source"]), -1, dtype="int32")
+        new_row[kept] = numpy.arange(len(kept), dtype="int32")
+        part = take(previous_actions, ACTION_COLUMNS, numpy.flatnonzero(new_row[previous_actions["bill"]] >= 0))
+        part["bill"] = new_row[part["bill"]]
+        actions.insert(0, part)
+
+    # in the order of the files, as if every record had just been read
+    order = numpy.argsort(numpy.concatenate([decoded["source"] for decoded in bills]), kind="mergesort")
+    bills = concatenate(bills, bill_spec, order)
+    new_row = numpy.empty(len(order), dtype="int32")
+    new_row[order] = numpy.arange(len(order), dtype="int32")
+    for decoded in actions:
+        decoded["bill"] = new_row[decoded["bill"]]
+    order = numpy.lexsort((numpy.concatenate([decoded["position"] for decoded in actions]),
+                           numpy.concatenate([decoded["bill"] for decoded in actions])))
+    actions = concatenate(actions, ACTION_COLUMNS, order)
+
+    # the two files are written separately: mark them as written together
+    bills["generation"] = actions["generation"] = numpy.array(os.urandom(8).encode("hex"))
+
+    try:
+        os.makedirs(directory)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    save_table(directory, "actions", actions)
+    save_table(directory, "bills", bills)
+
+    if parquet is not False:
+        try:
+            save_parquet(directory, "bills", bills, BILL_COLUMNS)
+            save_parquet(directory, "actions", actions, ACTION_COLUMNS)
+        except ImportError:
+            # pyarrow isn't installed
+            if parquet:
+                raise
+
+    return len(bills["source"]), len(bill_rows)
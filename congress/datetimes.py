@@ -0,0 +1,99 @@
+"""
+Fast parsing and serialization of the timestamps in the bulk data.
+
+Most timestamps come in one of a few fixed ISO-like formats, which are parsed
+by slicing instead of with ``strptime``. Every other format falls back to
+``strptime``, so :func:`parse_datetime` accepts and rejects exactly what
+``strptime`` does.
+
+Times are local to the U.S. Capitol and are serialized with their Eastern
+UTC offset. Looking the offset up in pytz is most of the cost of serializing
+a time, but the offset only changes on the two days a year when daylight
+saving time starts or ends, so :func:`format_datetime` looks it up once per
+day. On the days it changes, each time is looked up in pytz as before.
+"""
+
+import datetime
+
+from pytz import timezone
+
+eastern_time_zone = timezone('US/Eastern')
+
+# formats parsed by slicing => the character between the date and the time
+FIXED_FORMATS = {
+    "%Y-%m-%d %H:%M:%S": " ",
+    "%Y-%m-%dT%H:%M:%S": "T",
+}
+
+# date => the UTC offset as isoformat() writes it (e.g. "-05:00"), or None
+# on days when it changes
+eastern_offsets = {}
+
+
+def parse_datetime(value, format="%Y-%m-%d %H:%M:%S"):
+    """
+    Parse a timestamp, like ``datetime.datetime.strptime(value, format)``.
+
+    Parameters
+    ----------
+    value : str
+    format : str
+
+    Returns
+    -------
+    :class:`datetime.datetime`
+    """
+    sep = FIXED_FORMATS.get(format)
+    if sep is not None and len(value) == 19 and value[10] == sep \
+            and value[4] == value[7] == "-" and value[13] == value[16] == ":" \
+            and (value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19]).isdigit():
+        return datetime.datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                                 int(value[11:13]), int(value[14:16]), int(value[17:19]))
+    return datetime.datetime.strptime(value, format)
+
+
+def parse_date(value):
+    """
+    Parse a date in YYYY-MM-DD format.
+
+    Returns
+    -------
+    :class:`datetime.date`
+    """
+    if len(value) == 10 and value[4] == value[7] == "-" and (value[0:4] + value[5:7] + value[8:10]).isdigit():
+        return datetime.date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def eastern_offset(date):
+    """
+    The UTC offset in U.S. Eastern time throughout the given day, as it
+    appears at the end of ``isoformat()``, or None if it changes that day.
+    """
+    try:
+        return eastern_offsets[date]
+    except KeyError:
+        pass
+    first = eastern_time_zone.localize(datetime.datetime.combine(date, datetime.time(0, 0, 0))).isoformat()[19:]
+    last = eastern_time_zone.localize(datetime.datetime.combine(date, datetime.time(23, 59, 59))).isoformat()[19:]
+    offset = eastern_offsets[date] = (first if first == last else None)
+    return offset
+
+
+def format_datetime(obj):
+    """
+    Serialize a time in Eastern time as ISO 8601 with its UTC offset, dropping
+    microseconds. Dates are serialized without a time, strings are returned
+    as is, and anything else is None.
+    """
+    if isinstance(obj, datetime.datetime):
+        offset = eastern_offset(obj.date())
+        if offset is None or obj.tzinfo is not None:
+            return eastern_time_zone.localize(obj.replace(microsecond=0)).isoformat()
+        return obj.replace(microsecond=0).isoformat() + offset
+    elif isinstance(obj, datetime.date):
+        return obj.isoformat()
+    elif isinstance(obj, (str, unicode)):
+        return obj
+    else:
+        return None
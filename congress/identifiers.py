@@ -0,0 +1,162 @@
+"""
+Parsed bill, bill version, amendment, vote and nomination IDs.
+
+IDs are parsed from strings like "hr1234-113" or "h12-113.2013" over and
+over, e.g. each time the path of an output file is needed. :meth:`parse`
+remembers the parsed ID, and each ID computes its canonical string and its
+path (relative to the data directory) once, when it's created.
+
+IDs are immutable. Their parts are strings, as they appear in the ID.
+"""
+
+import re
+
+
+class Identifier(object):
+    """
+    Base class for the ID types.
+
+    Subclasses define ``PATTERN``, whose groups are the parts named in
+    ``__slots__``, and ``format`` and ``path_for``, which build the
+    canonical string and the path from the parts.
+    """
+
+    __slots__ = ("string", "path")
+
+    PATTERN = None
+    PARTS = ()
+
+    # The parse cache, per class, is cleared when it gets this big. Looking an
+    # ID up has to be much cheaper than parsing it, which rules out keeping it
+    # in least-recently-used order.
+    CACHE_SIZE = 100000
+
+    def __init__(self, *parts):
+        if len(parts) != len(self.PARTS):
+            raise TypeError("%s takes %d parts" % (type(self).__name__, len(self.PARTS)))
+        for name, value in zip(self.PARTS, parts):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "string", self.format())
+        object.__setattr__(self, "path", self.path_for())
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Parse an ID string. Raises ValueError if it isn't a valid ID of this type.
+        """
+        cache = cls.__dict__.get("_cache")
+        if cache is None:
+            cache = cls._cache = {}
+        try:
+            return cache[value]
+        except KeyError:
+            pass
+
+        m = cls.PATTERN.match(value)
+        if m is None:
+            raise ValueError("Not a valid %s: %r" % (cls.__name__, value))
+
+        if len(cache) >= cls.CACHE_SIZE:
+            cache.clear()
+        id = cache[value] = cls(*m.groups())
+        return id
+
+    def split(self):
+        """The parts of the ID as a tuple."""
+        return tuple(getattr(self, name) for name in self.PARTS)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s is immutable" % type(self).__name__)
+
+    def __str__(self):
+        return self.string
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.string)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.string == other.string
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.string)
+
+
+class BillId(Identifier):
+    """A bill ID, e.g. "hr1234-113"."""
+
+    __slots__ = ("bill_type", "number", "congress")
+    PARTS = __slots__
+    PATTERN = re.compile("^([a-z]+)(\d+)-(\d+)$")
+
+    def format(self):
+        return "%s%s-%s" % (self.bill_type, self.number, self.congress)
+
+    def path_for(self):
+        return "%s/bills/%s/%s%s" % (self.congress, self.bill_type, self.bill_type, self.number)
+
+
+class AmendmentId(Identifier):
+    """An amendment ID, e.g. "samdt5-113"."""
+
+    __slots__ = ("amendment_type", "number", "congress")
+    PARTS = __slots__
+    PATTERN = BillId.PATTERN
+
+    def format(self):
+        return "%s%s-%s" % (self.amendment_type, self.number, self.congress)
+
+    def path_for(self):
+        return "%s/amendments/%s/%s%s" % (self.congress, self.amendment_type, self.amendment_type, self.number)
+
+
+class BillVersionId(Identifier):
+    """A bill text version ID, e.g. "hr1234-113-ih"."""
+
+    __slots__ = ("bill_type", "number", "congress", "version_code")
+    PARTS = __slots__
+    PATTERN = re.compile("^([a-z]+)(\d+)-(\d+)-([a-z\d]+)$")
+
+    def format(self):
+        return "%s%s-%s-%s" % (self.bill_type, self.number, self.congress, self.version_code)
+
+    def path_for(self):
+        return "%s/bills/%s/%s%s/text-versions/%s" % (self.congress, self.bill_type, self.bill_type, self.number, self.version_code)
+
+    def bill_id(self):
+        return BillId(self.bill_type, self.number, self.congress)
+
+
+class VoteId(Identifier):
+    """A roll call vote ID, e.g. "h12-113.2013"."""
+
+    __slots__ = ("chamber", "number", "congress", "session")
+    PARTS = __slots__
+    # Sessions are either four-digit years for modern day votes or a digit or letter
+    # for historical votes before sessions were basically calendar years.
+    PATTERN = re.compile("^(h|s)(\d+)-(\d+).(\d\d\d\d|[0-9A-Z])$")
+
+    def format(self):
+        return "%s%s-%s.%s" % (self.chamber, self.number, self.congress, self.session)
+
+    def path_for(self):
+        return "%s/votes/%s/%s%s" % (self.congress, self.session, self.chamber, self.number)
+
+
+class NominationId(Identifier):
+    """
+    A nomination ID, e.g. "PN64-113". The number can be hyphenated, e.g.
+    "PN64-01-111" has the number "64-01".
+    """
+
+    __slots__ = ("nomination_type", "number", "congress")
+    PARTS = __slots__
+    PATTERN = re.compile("^([A-z]{2})([\d-]+)-(\d+)$")
+
+    def format(self):
+        return "%s%s-%s" % (self.nomination_type, self.number, self.congress)
+
+    def path_for(self):
+        return "%s/nominations/%s" % (self.congress, self.number)
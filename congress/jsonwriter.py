@@ -0,0 +1,198 @@
+"""
+Serializing the JSON output files.
+
+Every data.json is written like ``json.dumps(data, sort_keys=True,
+indent=2, default=...)``. With ``indent`` or ``sort_keys``, Python 2's json
+module can't use its C encoder and falls back to a pure-Python encoder made
+of nested generators, one per level of the document, which every chunk of
+output passes through. That's most of the time it takes to write a bill or
+a vote.
+
+:func:`dumps` writes the same bytes with a pluggable backend. The default
+backend, "fast", walks the document with plain recursive calls that append
+to one list, checks the common types by identity before falling back to the
+same ``isinstance`` checks as the json module, escapes strings with the
+json module's own (C) string encoder, and remembers how each key is written. The "json" backend is the json module
+itself, which the output must match byte for byte. Other backends can be
+added with :func:`register_backend`.
+
+Unlike the json module, the "fast" backend doesn't check for circular
+references (the documents are trees).
+"""
+
+import json
+from json import encoder as json_encoder
+from operator import itemgetter
+
+# the C version when the json module's speedups are available
+encode_string = json_encoder.encode_basestring_ascii
+
+INFINITY = float("inf")
+
+INDENT = "  "
+
+
+def float_string(value):
+    # as the json module writes floats
+    if value != value:
+        return "NaN"
+    if value == INFINITY:
+        return "Infinity"
+    if value == -INFINITY:
+        return "-Infinity"
+    return json_encoder.FLOAT_REPR(value)
+
+
+def not_serializable(value):
+    raise TypeError(repr(value) + " is not JSON serializable")
+
+
+def key_string(key):
+    # keys that aren't strings, as the json module converts them
+    if isinstance(key, basestring):
+        return key
+    if isinstance(key, float):
+        return float_string(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, (int, long)):
+        return str(key)
+    raise TypeError("key " + repr(key) + " is not a string")
+
+
+# string key => how it's written, with the separator after it, up to a limit
+ENCODED_KEYS_SIZE = 10000
+encoded_keys = {}
+
+
+def encode_key(key):
+    if type(key) is str or type(key) is unicode:
+        encoded = encoded_keys[key] = encode_string(key) + ": "
+        if len(encoded_keys) > ENCODED_KEYS_SIZE:
+            encoded_keys.clear()
+        return encoded
+    return encode_string(key_string(key)) + ": "
+
+
+def fast_dumps(obj, default=None):
+    """Serialize obj as ``json.dumps(obj, sort_keys=True, indent=2, default=default)`` does."""
+    parts = []
+    append = parts.append
+    default = default or not_serializable
+    first_item = itemgetter(0)
+
+    def encode(value, newline):
+        # newline is a line break and the indentation of the current level
+        t = type(value)
+        if t is str or t is unicode:
+            append(encode_string(value))
+        elif value is None:
+            append("null")
+        elif value is True:
+            append("true")
+        elif value is False:
+            append("false")
+        elif t is int or t is long:
+            append(str(value))
+        elif t is dict:
+            encode_dict(value, newline)
+        elif t is list or t is tuple:
+            encode_list(value, newline)
+        elif t is float:
+            append(float_string(value))
+        # subclasses, in the order the json module checks for them
+        elif isinstance(value, basestring):
+            append(encode_string(value))
+        elif isinstance(value, (int, long)):
+            append(str(value))
+        elif isinstance(value, float):
+            append(float_string(value))
+        elif isinstance(value, (list, tuple)):
+            encode_list(value, newline)
+        elif isinstance(value, dict):
+            encode_dict(value, newline)
+        else:
+            encode(default(value), newline)
+
+    def encode_list(value, newline):
+        if not value:
+            append("[]")
+            return
+        inner = newline + INDENT
+        separator = "[" + inner
+        for item in value:
+            t = type(item)
+            if t is str or t is unicode:
+                append(separator + encode_string(item))
+            else:
+                append(separator)
+                encode(item, inner)
+            separator = ", " + inner
+        append(newline + "]")
+
+    def encode_dict(value, newline):
+        if not value:
+            append("{}")
+            return
+        inner = newline + INDENT
+        separator = "{" + inner
+        for key, item in sorted(value.items(), key=first_item):
+            try:
+                key = encoded_keys[key]
+            except KeyError:
+                key = encode_key(key)
+
+            # strings, the most common values, without another call
+            t = type(item)
+            if t is str or t is unicode:
+                append(separator + key + encode_string(item))
+            else:
+                append(separator + key)
+                encode(item, inner)
+            separator = ", " + inner
+        append(newline + "}")
+
+    encode(obj, "\n")
+    return "".join(parts)
+
+
+def json_dumps(obj, default=None):
+    return json.dumps(obj, sort_keys=True, indent=2, default=default)
+
+
+# name => function(obj, default) that returns the JSON
+backends = {
+    "fast": fast_dumps,
+    "json": json_dumps,
+}
+
+backend = "fast"
+
+
+def register_backend(name, function):
+    """
+    Add a backend. function(obj, default) must return exactly what
+    ``json.dumps(obj, sort_keys=True, indent=2, default=default)`` does.
+    """
+    backends[name] = function
+
+
+def use_backend(name):
+    """Serialize with the named backend from now on."""
+    global backend
+    if name not in backends:
+        raise ValueError("Unknown JSON backend: %s (choose from %s)" % (name, ", ".join(sorted(backends))))
+    backend = name
+
+
+def dumps(obj, default=None):
+    """
+    Serialize an output document: keys sorted, indented two spaces, and
+    values that JSON doesn't have converted with default (e.g.
+    ``utils.format_datetime``). Without default they raise TypeError.
+    """
+    return backends[backend](obj, default)
@@ -0,0 +1,344 @@
+"""
+Compact records for bill and vote data held in memory in bulk.
+
+Parsed bills and votes are nested dicts, which is fine for one at a time
+but adds up when a whole Congress is held at once (e.g. voteview building
+all of a Congress's votes, or an analysis loading every bill). The record
+types here have ``__slots__`` instead of a dict per object, and the string
+values that repeat across records (states, parties, statuses, action types,
+committee names, names of legislators, ...) are interned so that each
+distinct value is stored once. Values that are mostly unique (dates, action
+texts, titles) aren't interned, since that would only keep them alive.
+
+Records stand in for the dicts they replace: they support the dict
+operations the code uses on them (``record[key]``, ``get``, ``in``,
+assignment and ``del``), compare equal to the same data as dicts, and
+:meth:`Record.to_dict` gives back the dict (with nested records left as
+records), so they serialize to exactly the same JSON with
+``default=json_default`` (``utils.json_default`` in the tasks). Keys that
+aren't fields of the record type are kept in a dict on the side, and fields
+that were never set are left out of the dict, as they were absent from the
+original.
+"""
+
+import glob
+import json
+import keyword
+import os.path
+
+# type => value => the one copy of the value
+strings = {str: {}, unicode: {}}
+
+# Each table is cleared when it gets this big, so that a long-running process
+# doesn't keep every string it has seen. Strings interned before are still
+# shared by the records that hold them; only later copies aren't.
+STRINGS_SIZE = 100000
+
+
+def intern_string(value):
+    """
+    The one copy of a string equal to value (of the same type). Anything
+    that isn't a string is returned as is.
+    """
+    table = strings.get(type(value))
+    if table is None:
+        return value
+    if len(table) >= STRINGS_SIZE and value not in table:
+        table.clear()
+    return table.setdefault(value, value)
+
+
+def intern_strings(values):
+    """Intern the strings in a list. None is returned as is."""
+    if values is None:
+        return None
+    return [intern_string(value) for value in values]
+
+
+class RecordType(type):
+    """
+    Turns the ``FIELDS`` of a record type into its ``__slots__``. Fields that
+    are Python keywords (e.g. "as") are stored in an attribute with a
+    trailing underscore.
+    """
+
+    def __new__(meta, name, bases, namespace):
+        if "FIELDS" in namespace:
+            fields = namespace["FIELDS"]
+            attributes = tuple(field + "_" if keyword.iskeyword(field) else field for field in fields)
+            namespace["__slots__"] = tuple(namespace.get("__slots__", ())) + attributes
+            namespace["ATTRIBUTES"] = dict(zip(fields, attributes))
+            namespace["ATTRIBUTE_ITEMS"] = tuple(zip(fields, attributes))
+
+            converters = {}
+            for base in reversed(bases):
+                converters.update(getattr(base, "CONVERTERS", {}))
+            converters.update(namespace.get("CONVERTERS", {}))
+            for field in namespace.get("INTERNED", ()):
+                converters[field] = intern_string
+            namespace["CONVERTERS"] = converters
+        return type.__new__(meta, name, bases, namespace)
+
+
+class Record(object):
+    """
+    Base class for the record types.
+
+    Subclasses list their keys in ``FIELDS``, the keys whose string values
+    are interned in ``INTERNED``, and functions that convert the values of
+    other keys (e.g. to nested records) in ``CONVERTERS``.
+    """
+
+    __metaclass__ = RecordType
+    __slots__ = ("_extra",)
+
+    FIELDS = ()
+    INTERNED = ()
+    CONVERTERS = {}
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Make a record from a dict as it would be serialized to JSON. None is
+        returned as is.
+        """
+        if data is None:
+            return None
+        record = cls()
+        for key, value in data.items():
+            record[key] = value
+        return record
+
+    @classmethod
+    def from_dicts(cls, data):
+        """Make records from a list of dicts. None is returned as is."""
+        if data is None:
+            return None
+        return [cls.from_dict(item) for item in data]
+
+    def to_dict(self):
+        """The record as a dict. Nested records are not converted."""
+        data = {}
+        for key, attribute in self.ATTRIBUTE_ITEMS:
+            try:
+                data[key] = getattr(self, attribute)
+            except AttributeError:
+                pass
+        extra = self._extra_fields()
+        if extra:
+            data.update(extra)
+        return data
+
+    def _extra_fields(self):
+        try:
+            return self._extra
+        except AttributeError:
+            return None
+
+    # dict operations
+
+    def __getitem__(self, key):
+        attribute = self.ATTRIBUTES.get(key)
+        if attribute is None:
+            extra = self._extra_fields()
+            if extra is None:
+                raise KeyError(key)
+            return extra[key]
+        try:
+            return getattr(self, attribute)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        convert = self.CONVERTERS.get(key)
+        if convert is not None:
+            value = convert(value)
+        attribute = self.ATTRIBUTES.get(key)
+        if attribute is None:
+            extra = self._extra_fields()
+            if extra is None:
+                extra = self._extra = {}
+            extra[key] = value
+        else:
+            setattr(self, attribute, value)
+
+    def __delitem__(self, key):
+        attribute = self.ATTRIBUTES.get(key)
+        if attribute is None:
+            extra = self._extra_fields()
+            if extra is None:
+                raise KeyError(key)
+            del extra[key]
+        else:
+            try:
+                delattr(self, attribute)
+            except AttributeError:
+                raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.to_dict())
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        if not isinstance(other, dict):
+            return NotImplemented
+        return self.to_dict() == other
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.to_dict())
+
+    # Classes with __slots__ need these to be pickled.
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            self[key] = value
+
+
+def json_default(obj):
+    """
+    Serialize records to JSON as the dicts they stand for. Anything else
+    raises TypeError, as the default ``default`` does.
+    """
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError("%r is not JSON serializable" % (obj,))
+
+
+# bills
+
+class Reference(Record):
+    """A reference (e.g. to the Congressional Record) at the end of an action's text."""
+    FIELDS = ("type", "reference")
+    INTERNED = ("type",)
+
+
+class Action(Record):
+    """An action on a bill or amendment, as formed by bill_info.actions_for."""
+    FIELDS = ("acted_at", "action_code", "committees", "references", "type", "text", "status",
+              "bill_ids", "how", "where", "result", "roll", "suspension", "vote_type",
+              "calendar", "under", "number", "law", "congress", "pocket", "committee")
+    INTERNED = ("action_code", "type", "status", "how", "where", "result",
+                "vote_type", "calendar", "under", "law", "congress", "committee")
+    CONVERTERS = {
+        "committees": intern_strings,
+        "references": Reference.from_dicts,
+    }
+
+
+class Title(Record):
+    FIELDS = ("title", "is_for_portion", "as", "type")
+    INTERNED = ("as", "type")
+
+
+class Sponsor(Record):
+    FIELDS = ("title", "name", "district", "state", "bioguide_id", "type")
+    INTERNED = FIELDS
+
+
+class Cosponsor(Record):
+    FIELDS = ("title", "name", "district", "state", "bioguide_id", "sponsored_at", "withdrawn_at", "original_cosponsor")
+    INTERNED = ("title", "name", "district", "state", "bioguide_id")
+
+
+class Committee(Record):
+    """A committee or subcommittee's activity on a bill."""
+    FIELDS = ("committee", "committee_id", "subcommittee", "subcommittee_id", "activity")
+    INTERNED = ("committee", "committee_id", "subcommittee", "subcommittee_id")
+    CONVERTERS = {
+        "activity": intern_strings,
+    }
+
+
+class RelatedBill(Record):
+    FIELDS = ("reason", "bill_id", "type", "identified_by")
+    INTERNED = ("reason", "type", "identified_by")
+
+
+class Summary(Record):
+    FIELDS = ("date", "as", "text")
+    INTERNED = ("as",)
+
+
+class Bill(Record):
+    """A bill, as formed by congress.bills.form_bill_json_dict."""
+    FIELDS = ("bill_id", "bill_type", "number", "congress", "url", "introduced_at", "by_request",
+              "sponsor", "cosponsors", "actions", "history", "status", "status_at", "enacted_as",
+              "titles", "official_title", "short_title", "popular_title", "summary",
+              "subjects_top_term", "subjects", "related_bills", "committees", "amendments",
+              "committee_reports", "updated_at")
+    INTERNED = ("bill_type", "congress", "status", "subjects_top_term")
+    CONVERTERS = {
+        "sponsor": Sponsor.from_dict,
+        "cosponsors": Cosponsor.from_dicts,
+        "actions": Action.from_dicts,
+        "titles": Title.from_dicts,
+        "summary": Summary.from_dict,
+        "subjects": intern_strings,
+        "related_bills": RelatedBill.from_dicts,
+        "committees": Committee.from_dicts,
+    }
+
+
+def load_bill(path):
+    """Load a bill's data.json as a :class:`Bill`."""
+    with open(path) as f:
+        return Bill.from_dict(json.load(f))
+
+
+def load_bills(congress, data_dir="data"):
+    """
+    Load the data.json of every bill of a Congress as :class:`Bill` records,
+    in order of path.
+    """
+    for path in sorted(glob.glob(os.path.join(data_dir, str(congress), "bills", "*", "*", "data.json"))):
+        yield load_bill(path)
+
+
+# votes
+
+class Voter(Record):
+    """
+    How one legislator voted in a roll call vote, as formed by vote_info and
+    voteview.
+    """
+    FIELDS = ("id", "display_name", "party", "state", "first_name", "last_name", "vote", "voteview_votecode_extra")
+    # Each legislator votes hundreds of times a session.
+    INTERNED = FIELDS
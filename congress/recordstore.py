@@ -0,0 +1,137 @@
+"""
+The intermediate store of parsed bills, amendments and votes.
+
+Processing a bill or a vote has two stages. The first parses the source
+(the FDSys bill status XML, the House or Senate vote XML) into a record, the
+dict that data.json is written from, and saves it here. The second renders
+the record into the output files (JSON, GovTrack XML). The renderers only
+ever read records, so after a renderer is added or fixed the outputs can be
+rendered again from the store (``./run render``) without parsing anything.
+
+Each record is saved with the hash of the source it was parsed from and a
+fingerprint of the parsing code, so the first stage can tell whether a
+stored record is still what parsing the source would give. Records are
+pickled (in the binary pickle format) to one file per ID, at the ID's path
+(see :mod:`congress.identifiers`) under the store's directory.
+"""
+
+import cPickle as pickle
+import errno
+import glob
+import hashlib
+import os
+
+# changes when what's saved in the files changes
+FORMAT = 1
+
+EXTENSION = ".pickle"
+
+
+def source_hash(source):
+    """The hash a record is stored with for the source it was parsed from."""
+    if isinstance(source, unicode):
+        source = source.encode("utf8")
+    return hashlib.sha1(source).hexdigest()
+
+
+class StoredRecord(object):
+    """
+    A record, what it was parsed from, and any state the parser keeps to
+    update the record when the source changes.
+    """
+
+    __slots__ = ("id", "data", "source_hash", "fingerprint", "state")
+
+    def __init__(self, id, data, source_hash, fingerprint, state):
+        self.id = id
+        self.data = data
+        self.source_hash = source_hash
+        self.fingerprint = fingerprint
+        self.state = state
+
+
+class RecordStore(object):
+    """
+    Parsed records saved in a directory.
+
+    Parameters
+    ----------
+    root : str
+        The directory, which is created as needed.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, id):
+        """The file a record is saved to, for an :class:`congress.identifiers.Identifier`."""
+        return os.path.join(self.root, id.path + EXTENSION)
+
+    def get(self, id, source_hash=None, fingerprint=None):
+        """
+        Load the record saved for an ID. If source_hash or fingerprint is
+        given, the record must have been parsed from that source or by that
+        code. Returns a :class:`StoredRecord`, or None if there's no such
+        record.
+        """
+        stored = self.load(self.path(id))
+        if stored is None:
+            return None
+        if source_hash is not None and stored.source_hash != source_hash:
+            return None
+        if fingerprint is not None and stored.fingerprint != fingerprint:
+            return None
+        return stored
+
+    def put(self, id, data, source_hash=None, fingerprint=None, state=None):
+        """
+        Save the record for an ID, replacing any saved before. The file is
+        replaced only once the whole record has been written.
+        """
+        path = self.path(id)
+        try:
+            os.makedirs(os.path.dirname(path))
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        f = open(path + ".new", "wb")
+        try:
+            with f:
+                pickle.dump((FORMAT, id.string, data, source_hash, fingerprint, state), f, pickle.HIGHEST_PROTOCOL)
+        except:
+            os.unlink(path + ".new")
+            raise
+        os.rename(path + ".new", path)
+
+    def delete(self, id):
+        """Remove the record saved for an ID, if there is one."""
+        try:
+            os.unlink(self.path(id))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+    def load(self, path):
+        """
+        Load the record saved in a file, as a :class:`StoredRecord`. Returns
+        None if the file doesn't exist or was saved in another format.
+        """
+        try:
+            with open(path, "rb") as f:
+                saved = pickle.load(f)
+        except IOError as e:
+            if e.errno == errno.ENOENT:
+                return None
+            raise
+        if saved[0] != FORMAT:
+            return None
+        return StoredRecord(*saved[1:])
+
+    def paths(self, congress, kind):
+        """
+        The files of the saved records of a kind ("bills", "amendments" or
+        "votes") in a Congress, in order.
+        """
+        # by bill or amendment type, or by vote session
+        return sorted(glob.glob(os.path.join(self.root, str(congress), kind, "*", "*" + EXTENSION)))
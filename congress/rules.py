@@ -0,0 +1,180 @@
+"""
+Precompiled, prefiltered regular expression rule tables.
+
+Parsing action lines and vote questions means trying many patterns against
+each line, most of which cannot possibly match. A :class:`Rule` compiles its
+pattern once and works out from the pattern itself which literal text any
+match must contain (and, for anchored rules, start with). Checking for that
+text with a plain substring test is far cheaper than running the regex, so
+rules whose keywords are absent are skipped without running the regex at
+all. Because the keywords are derived from the pattern, the prefilter never
+changes which rules match.
+"""
+
+import re
+import sre_parse
+from sre_constants import LITERAL, SUBPATTERN, BRANCH, MAX_REPEAT, MIN_REPEAT, AT, AT_BEGINNING
+
+
+class Rule(object):
+    """
+    A compiled pattern with a cheap prefilter.
+
+    Parameters
+    ----------
+    pattern : str
+    value : object
+        Whatever the caller wants back when this rule matches in a
+        :class:`RuleTable` (a category, a replacement string, a name...).
+    flags : int
+        Regex flags; case-insensitive by default, like most patterns here.
+    anchored : bool
+        If True, the pattern must match at the start of the text (``re.match``
+        semantics), otherwise anywhere in it (``re.search`` semantics).
+    """
+
+    __slots__ = ('pattern', 'value', 'regex', 'anchored', 'ignorecase', 'prefix', 'keywords')
+
+    def __init__(self, pattern, value=None, flags=re.I, anchored=False):
+        self.pattern = pattern
+        self.value = value
+        self.regex = re.compile(pattern, flags)
+        self.anchored = anchored
+        self.ignorecase = bool(flags & re.I)
+
+        parsed = list(sre_parse.parse(pattern, flags))
+        if parsed and parsed[0] == (AT, AT_BEGINNING):
+            parsed = parsed[1:]
+            self.anchored = anchored = True
+        self.prefix = _leading_literal(parsed) if anchored else ""
+        self.keywords = _required_literals(parsed)
+
+        if self.ignorecase:
+            self.prefix = self.prefix.lower()
+            if self.keywords:
+                self.keywords = tuple(k.lower() for k in self.keywords)
+
+    def could_match(self, text, lowered=None):
+        """Return False if the rule certainly does not match the text."""
+        if self.ignorecase:
+            if lowered is None:
+                lowered = text.lower()
+            text = lowered
+        if self.prefix and not text.startswith(self.prefix):
+            return False
+        if self.keywords:
+            for keyword in self.keywords:
+                if keyword in text:
+                    return True
+            return False
+        return True
+
+    def search(self, text, lowered=None):
+        """Like ``re.search`` (or ``re.match`` for anchored rules), returning a match or None."""
+        if not self.could_match(text, lowered):
+            return None
+        if self.anchored:
+            return self.regex.match(text)
+        return self.regex.search(text)
+
+
+class RuleTable(object):
+    """
+    An ordered list of :class:`Rule` objects tried against the same text.
+
+    The text is lowercased once per call and shared by every rule's
+    prefilter.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.by_value = dict((rule.value, rule) for rule in reversed(self.rules))
+
+    def first(self, text):
+        """
+        Return ``(value, match)`` for the first rule, in table order, that
+        matches the text, or ``(None, None)``.
+        """
+        lowered = text.lower()
+        for rule in self.rules:
+            m = rule.search(text, lowered)
+            if m:
+                return rule.value, m
+        return None, None
+
+    def scan(self, text):
+        """
+        Try every rule against the text. Returns a dict from each matching
+        rule's value to its match object, so the values should be unique.
+        """
+        lowered = text.lower()
+        matches = {}
+        for rule in self.rules:
+            m = rule.search(text, lowered)
+            if m:
+                matches[rule.value] = m
+        return matches
+
+    def __getitem__(self, value):
+        # the first rule with the value
+        return self.by_value[value]
+
+
+# Keyword derivation. These walk the parse tree that the re module builds
+# for a pattern. Only ASCII literals are used so that keywords can be
+# compared against both byte and unicode strings.
+
+def _literal_char(av):
+    if av < 128:
+        return chr(av)
+    return None
+
+
+def _leading_literal(items):
+    # The literal text every match must begin with.
+    prefix = []
+    for op, av in items:
+        if op != LITERAL or _literal_char(av) is None:
+            break
+        prefix.append(_literal_char(av))
+    return "".join(prefix)
+
+
+def _required_literals(items):
+    # Returns a tuple of strings at least one of which occurs in any match
+    # of the sequence of pattern items, or None if we can't tell. Among the
+    # candidates found in the sequence, the one whose shortest alternative is
+    # longest is the most selective.
+    candidates = []
+    run = []
+
+    def end_run():
+        if run:
+            candidates.append(("".join(run),))
+            del run[:]
+
+    for op, av in items:
+        if op == LITERAL and _literal_char(av) is not None:
+            run.append(_literal_char(av))
+            continue
+        end_run()
+
+        if op == SUBPATTERN:
+            inner = _required_literals(list(av[-1]))
+            if inner:
+                candidates.append(inner)
+        elif op == BRANCH:
+            alternatives = [_required_literals(list(branch)) for branch in av[1]]
+            if alternatives and all(alternatives):
+                candidates.append(tuple(sum((list(a) for a in alternatives), [])))
+        elif op in (MAX_REPEAT, MIN_REPEAT):
+            min_count, max_count, body = av
+            if min_count >= 1:
+                inner = _required_literals(list(body))
+                if inner:
+                    candidates.append(inner)
+    end_run()
+
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: (min(len(k) for k in c), -len(c)))
@@ -0,0 +1,107 @@
+"""
+The sessions of Congress, as listed in GovTrack's sessions.tsv (columns
+congress, session, start and end, one row per session), for finding which
+Congress and session a date falls in and the sessions and dates of each
+Congress.
+
+The table is parsed once into lists of the sessions' start and end dates,
+sorted by start date, so that finding the session of a date is a binary
+search (see :meth:`Sessions.session_from_date`) rather than a comparison
+with every session.
+"""
+
+import bisect
+import csv
+import datetime
+import StringIO
+
+
+def parse_date(value):
+    """A datetime.date from a date, a datetime or a YYYY-MM-DD string."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date(*[int(part) for part in value.split("-")])
+
+
+def parse(tsv):
+    """A :class:`Sessions` from the contents of sessions.tsv."""
+    if isinstance(tsv, unicode):
+        tsv = tsv.encode("utf8")
+    rows = csv.DictReader(StringIO.StringIO(tsv), delimiter="\t")
+    return Sessions([(row["congress"], row["session"], row["start"], row["end"]) for row in rows])
+
+
+class Sessions(object):
+    """
+    The sessions of Congress.
+
+    Parameters
+    ----------
+    sessions : list
+        (congress, session, start, end) tuples, where session is the session's
+        name (e.g. "1" or "2013") and start and end are its first and last days.
+    """
+
+    def __init__(self, sessions):
+        # sorted by start date, then by the order given, which decides
+        # between sessions that overlap
+        rows = sorted((parse_date(start), i, parse_date(end), int(congress), session)
+                      for i, (congress, session, start, end) in enumerate(sessions))
+        self.starts = [row[0] for row in rows]
+        self.order = [row[1] for row in rows]
+        self.ends = [row[2] for row in rows]
+        self.congresses = [row[3] for row in rows]
+        self.sessions = [row[4] for row in rows]
+
+        # the latest end date of each session and those that start before
+        # it, so that a lookup knows how far back a session that's still
+        # going on could have started
+        self.latest_ends = []
+        for end in self.ends:
+            self.latest_ends.append(max(end, self.latest_ends[-1]) if self.latest_ends else end)
+
+        # congress => its sessions' positions in the lists, in order
+        self.congress_rows = {}
+        for i, congress in enumerate(self.congresses):
+            self.congress_rows.setdefault(congress, []).append(i)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def session_from_date(self, date):
+        """
+        The (congress, session) of the session a date falls in (between its
+        first and last days, inclusive), or (None, None) if it isn't in one.
+        """
+        date = parse_date(date)
+        found = None
+        i = bisect.bisect_right(self.starts, date) - 1
+        while i >= 0 and self.latest_ends[i] >= date:
+            if self.ends[i] >= date and (found is None or self.order[i] < self.order[found]):
+                found = i
+            i -= 1
+        if found is None:
+            return None, None
+        return self.congresses[found], self.sessions[found]
+
+    def congress_sessions(self, congress):
+        """The names of the sessions of a Congress, in order. Raises KeyError for an unknown Congress."""
+        return [self.sessions[i] for i in self.congress_rows[int(congress)]]
+
+    def session_number(self, congress, session):
+        """
+        The number (1 for the first) of a session of a Congress, e.g. of
+        session "2014" of the 113th, as the Senate numbers its roll call
+        votes by. Raises KeyError for an unknown Congress or session.
+        """
+        sessions = self.congress_sessions(congress)
+        if str(session) not in sessions:
+            raise KeyError((congress, session))
+        return sessions.index(str(session)) + 1
+
+    def congress_dates(self, congress):
+        """The first and last days of the sessions of a Congress. Raises KeyError for an unknown Congress."""
+        rows = self.congress_rows[int(congress)]
+        return self.starts[rows[0]], max(self.ends[i] for i in rows)
@@ -0,0 +1,207 @@
+"""
+An SQLite database of parsed bills, amendments and votes.
+
+This is an output format like data.json and data.xml (``--outputs=sqlite``),
+for loading the data into a database without walking the tree of JSON files.
+The records are written to normalized tables:
+
+* bills, and their actions, cosponsors and subjects
+* amendments, whose actions are in the same table as bills' actions
+* votes, and the position of each voter in vote_positions
+
+Each bill, amendment and vote row is replaced (with the rows in the other
+tables that belong to it) in one prepared statement per table, keyed by its
+ID. The rows keep a digest of the record they were written from, and a
+record whose digest hasn't changed isn't written at all, so a run that
+re-renders unchanged records doesn't touch the database. Each record's rows
+are written and committed in a transaction of their own, so that processes
+writing at the same time (e.g. ./run render --workers) only wait for each
+other's records, not for whatever they do in between. The database is in
+WAL mode, so those commits are cheap and readers don't wait for writers.
+"""
+
+import datetime
+import hashlib
+import sqlite3
+
+from congress import datetimes, jsonwriter, records
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bills (
+  bill_id TEXT PRIMARY KEY, bill_type TEXT, number INTEGER, congress INTEGER,
+  introduced_at TEXT, official_title TEXT, short_title TEXT, popular_title TEXT,
+  sponsor_bioguide_id TEXT, sponsor_name TEXT, by_request INTEGER,
+  status TEXT, status_at TEXT, subjects_top_term TEXT, updated_at TEXT, digest TEXT);
+CREATE TABLE IF NOT EXISTS actions (
+  id TEXT, position INTEGER, acted_at TEXT, type TEXT, action_code TEXT, status TEXT, text TEXT,
+  PRIMARY KEY (id, position));
+CREATE TABLE IF NOT EXISTS cosponsors (
+  bill_id TEXT, position INTEGER, bioguide_id TEXT, name TEXT, state TEXT, district TEXT,
+  sponsored_at TEXT, withdrawn_at TEXT, original_cosponsor INTEGER,
+  PRIMARY KEY (bill_id, position));
+CREATE INDEX IF NOT EXISTS cosponsors_bioguide_id ON cosponsors (bioguide_id);
+CREATE TABLE IF NOT EXISTS subjects (
+  bill_id TEXT, subject TEXT,
+  PRIMARY KEY (bill_id, subject));
+CREATE INDEX IF NOT EXISTS subjects_subject ON subjects (subject);
+CREATE TABLE IF NOT EXISTS amendments (
+  amendment_id TEXT PRIMARY KEY, amendment_type TEXT, number INTEGER, congress INTEGER, chamber TEXT,
+  amends_bill_id TEXT, amends_amendment_id TEXT, sponsor_bioguide_id TEXT, sponsor_name TEXT,
+  purpose TEXT, description TEXT, introduced_at TEXT, status TEXT, status_at TEXT,
+  updated_at TEXT, digest TEXT);
+CREATE TABLE IF NOT EXISTS votes (
+  vote_id TEXT PRIMARY KEY, chamber TEXT, congress INTEGER, session TEXT, number INTEGER,
+  date TEXT, question TEXT, type TEXT, category TEXT, requires TEXT, result TEXT,
+  bill_id TEXT, source_url TEXT, updated_at TEXT, digest TEXT);
+CREATE TABLE IF NOT EXISTS vote_positions (
+  vote_id TEXT, position INTEGER, vote TEXT, voter_id TEXT, display_name TEXT, party TEXT, state TEXT,
+  PRIMARY KEY (vote_id, position));
+CREATE INDEX IF NOT EXISTS vote_positions_voter_id ON vote_positions (voter_id);
+"""
+
+def json_default(obj):
+    # as the records are serialized to data.json
+    if isinstance(obj, records.Record):
+        return obj.to_dict()
+    return datetimes.format_datetime(obj)
+
+
+def digest(data):
+    return hashlib.sha1(jsonwriter.dumps(data, json_default)).hexdigest()
+
+
+def value(obj):
+    # a column value: times as they are written in data.json, and byte
+    # strings (which sqlite3 only takes if they're ASCII) as unicode
+    if isinstance(obj, str):
+        return obj.decode("utf8")
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return datetimes.format_datetime(obj)
+    if isinstance(obj, bool):
+        return int(obj)
+    return obj
+
+
+def row(*values):
+    return tuple(value(obj) for obj in values)
+
+
+def integer(obj):
+    try:
+        return int(obj)
+    except (TypeError, ValueError):
+        return None
+
+
+class SQLiteSink(object):
+    """
+    Writes records to an SQLite database, creating the tables if needed.
+
+    Parameters
+    ----------
+    filename : str
+    """
+
+    def __init__(self, filename):
+        # other processes (e.g. ./run render --workers) may be writing too
+        self.db = sqlite3.connect(filename, timeout=60)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        with self.db:
+            self.db.executescript(SCHEMA)
+
+    def write_bill(self, bill):
+        """Write a bill, as formed by congress.bills.form_bill_json_dict."""
+        bill_id = bill["bill_id"]
+        bill_digest = self._changed("bills", "bill_id", bill_id, bill)
+        if bill_digest is None:
+            return
+
+        with self.db:
+            sponsor = bill.get("sponsor") or {}
+            self.db.execute("INSERT OR REPLACE INTO bills VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row(
+                bill_id, bill.get("bill_type"), integer(bill.get("number")), integer(bill.get("congress")),
+                bill.get("introduced_at"), bill.get("official_title"), bill.get("short_title"), bill.get("popular_title"),
+                sponsor.get("bioguide_id"), sponsor.get("name"), bill.get("by_request"),
+                bill.get("status"), bill.get("status_at"), bill.get("subjects_top_term"),
+                bill.get("updated_at"), bill_digest))
+
+            self._write_actions(bill_id, bill.get("actions"))
+
+            self.db.execute("DELETE FROM cosponsors WHERE bill_id = ?", (bill_id,))
+            self.db.executemany("INSERT INTO cosponsors VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+                row(bill_id, position, cosponsor.get("bioguide_id"), cosponsor.get("name"), cosponsor.get("state"),
+                    cosponsor.get("district"), cosponsor.get("sponsored_at"), cosponsor.get("withdrawn_at"),
+                    cosponsor.get("original_cosponsor"))
+                for position, cosponsor in enumerate(bill.get("cosponsors") or [])])
+
+            self.db.execute("DELETE FROM subjects WHERE bill_id = ?", (bill_id,))
+            self.db.executemany("INSERT OR IGNORE INTO subjects VALUES (?, ?)", [
+                row(bill_id, subject) for subject in bill.get("subjects") or []])
+
+    def write_amendment(self, amendment):
+        """Write an amendment, as formed by congress.amendments.parse_fdsys_amendment_data."""
+        amendment_id = amendment["amendment_id"]
+        amendment_digest = self._changed("amendments", "amendment_id", amendment_id, amendment)
+        if amendment_digest is None:
+            return
+
+        with self.db:
+            sponsor = amendment.get("sponsor") or {}
+            self.db.execute("INSERT OR REPLACE INTO amendments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row(
+                amendment_id, amendment.get("amendment_type"), integer(amendment.get("number")),
+                integer(amendment.get("congress")), amendment.get("chamber"),
+                (amendment.get("amends_bill") or {}).get("bill_id"),
+                (amendment.get("amends_amendment") or {}).get("amendment_id"),
+                sponsor.get("bioguide_id"), sponsor.get("name"),
+                amendment.get("purpose"), amendment.get("description"), amendment.get("introduced_at"),
+                amendment.get("status"), amendment.get("status_at"), amendment.get("updated_at"),
+                amendment_digest))
+
+            self._write_actions(amendment_id, amendment.get("actions"))
+
+    def write_vote(self, vote):
+        """Write a roll call vote, as formed by vote_info or voteview."""
+        vote_id = vote["vote_id"]
+        vote_digest = self._changed("votes", "vote_id", vote_id, vote)
+        if vote_digest is None:
+            return
+
+        with self.db:
+            bill = vote.get("bill")
+            bill_id = "%s%s-%s" % (bill["type"], bill["number"], bill["congress"]) if bill else None
+            self.db.execute("INSERT OR REPLACE INTO votes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row(
+                vote_id, vote.get("chamber"), integer(vote.get("congress")), vote.get("session"),
+                integer(vote.get("number")), vote.get("date"), vote.get("question"), vote.get("type"),
+                vote.get("category"), vote.get("requires"), vote.get("result"), bill_id,
+                vote.get("source_url"), vote.get("updated_at"), vote_digest))
+
+            positions = []
+            for option in sorted(vote.get("votes") or {}):
+                for voter in vote["votes"][option]:
+                    if isinstance(voter, basestring):
+                        # the Vice President
+                        positions.append(row(vote_id, len(positions), option, voter, None, None, None))
+                    else:
+                        positions.append(row(vote_id, len(positions), option, voter.get("id"),
+                                             voter.get("display_name"), voter.get("party"), voter.get("state")))
+            self.db.execute("DELETE FROM vote_positions WHERE vote_id = ?", (vote_id,))
+            self.db.executemany("INSERT INTO vote_positions VALUES (?, ?, ?, ?, ?, ?, ?)", positions)
+
+    def _write_actions(self, id, actions):
+        self.db.execute("DELETE FROM actions WHERE id = ?", (id,))
+        self.db.executemany("INSERT INTO actions VALUES (?, ?, ?, ?, ?, ?, ?)", [
+            row(id, position, action.get("acted_at"), action.get("type"), action.get("action_code"),
+                action.get("status"), action.get("text"))
+            for position, action in enumerate(actions or [])])
+
+    def _changed(self, table, key, id, data):
+        # The record's digest, or None if the row is already up to date.
+        data_digest = digest(data)
+        existing = self.db.execute("SELECT digest FROM %s WHERE %s = ?" % (table, key), (id,)).fetchone()
+        if existing is not None and existing[0] == data_digest:
+            return None
+        return data_digest
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,100 @@
+"""
+Cleaning up HTML text from the bulk data and downloaded pages.
+
+These run on every bill summary, every action and every downloaded HTML
+page, many of which have no tags or entities at all, so each step checks for
+the characters it needs (``<`` or ``&``) before running its regular
+expression. Entities are decoded in a single pass, and the replacement for
+each distinct entity is remembered. Control characters are deleted from
+byte strings with ``str.translate`` rather than a regular expression, which
+is much faster on a whole page.
+"""
+
+import htmlentitydefs
+import re
+
+# strip_tags
+PARAGRAPH_END = re.compile("\s*</\s*p\s*>\s*")
+TAG = re.compile("<[^>]+>")
+REPEATED_WHITESPACE = re.compile("[ \t\r\f\v]{2,}")
+
+# unescape
+ENTITY = re.compile("&#?\w+;")
+CONTROL_CHARACTERS = re.compile(u'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]')
+CONTROL_BYTES = "".join(chr(c) for c in range(0x00, 0x09) + [0x0B, 0x0C] + range(0x0E, 0x20) + [0x7F])
+
+# entity => its replacement, up to a limit in case a page is full of
+# things that only look like entities
+ENTITY_REPLACEMENTS_SIZE = 10000
+entity_replacements = {}
+
+
+def strip_tags(text):
+    """Convert a bit of HTML, like a bill summary, to plain text."""
+
+    if "<" in text:
+        # Preserve paragraph breaks. Convert closing p tags (and surrounding
+        #  whitespace) into two newlines. Strip trailing whitespace
+        text = PARAGRAPH_END.sub("\n\n", text).strip()
+
+        # naive stripping of tags, should work okay in this limited context
+        text = TAG.sub("", text)
+    else:
+        text = text.strip()
+
+    # compress and strip whitespace artifacts, except for the paragraph breaks
+    text = REPEATED_WHITESPACE.sub(" ", text).strip()
+
+    # Replace HTML entities with characters.
+    text = unescape(text)
+
+    return text
+
+
+# taken from http://effbot.org/zone/re-sub.htm#unescape-html
+def unescape(text):
+    """Replace HTML entities with characters and remove control characters."""
+    if isinstance(text, str):
+        without_control = text.translate(None, CONTROL_BYTES)
+        if "&" not in text:
+            return without_control
+        if len(without_control) == len(text):
+            # There are no control characters to remove, and the entity
+            # replacements never have any.
+            return ENTITY.sub(entity_replacement, text)
+
+    if "&" in text:
+        text = ENTITY.sub(entity_replacement, text)
+    return CONTROL_CHARACTERS.sub('', text)
+
+
+def entity_replacement(m):
+    text = m.group(0)
+    try:
+        return entity_replacements[text]
+    except KeyError:
+        pass
+
+    replacement = text  # leave as is
+    if text[:2] == "&#":
+        # character reference
+        try:
+            if text[:3] == "&#x":
+                replacement = unichr(int(text[3:-1], 16))
+            else:
+                replacement = unichr(int(text[2:-1]))
+        except ValueError:
+            pass
+    else:
+        # named entity
+        try:
+            replacement = unichr(htmlentitydefs.name2codepoint[text[1:-1]])
+        except KeyError:
+            pass
+
+    # which unescape would remove if it were a control character
+    replacement = CONTROL_CHARACTERS.sub('', replacement)
+
+    if len(entity_replacements) < ENTITY_REPLACEMENTS_SIZE:
+        entity_replacements[text] = replacement
+    return replacement
@@ -1,2 +1,5 @@
+from congress import identifiers
+
+
 def split_bill_id(bill_id):
-    return re.match("^([a-z]+)(\d+)-(\d+)$", bill_id).groups()
+    return identifiers.BillId.parse(bill_id).split()
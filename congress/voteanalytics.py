@@ -0,0 +1,192 @@
+"""
+Member agreement, party unity and participation in roll call votes.
+
+The statistics are computed from a :class:`congress.votematrix.VoteMatrix`
+(or, with :func:`matrix_from_votes`, from votes as formed by vote_info or
+voteview, whose Yea/Aye and Nay/No options count alike):
+
+* agreement, for each pair of members: of the votes on which both voted yea
+  or nay, the share on which they voted the same way
+* party unity, for each member of the two largest parties: of the party
+  unity votes (on which most of one of those parties voted against most of
+  the other) on which the member voted yea or nay, the share on which the
+  member voted with most of their party
+* participation, for each member: of the votes taken while the member was
+  serving, the share on which the member voted (including Present)
+
+Each is a ratio of counts that are sums over the votes. The counts are
+computed a block of votes at a time, the pairwise ones as products of 0/1
+matrices of who voted yea and who voted nay (so memory is bounded by the
+block size rather than the number of votes). :class:`VoteStatistics` keeps
+the counts, and when it's updated with a newer matrix it subtracts the
+counts of the votes that changed or were removed and adds those of the new
+and changed votes, rather than counting every vote again.
+"""
+
+import numpy
+
+from congress import votematrix
+
+# votes counted per matrix product
+BLOCK_SIZE = 512
+
+COUNTS = ("agree", "both", "with_party", "party_votes", "voted", "serving")
+
+
+def matrix_from_votes(votes):
+    """A :class:`congress.votematrix.VoteMatrix` of votes as formed by vote_info or voteview."""
+    return votematrix.merge(None, dict((vote["vote_id"], votematrix.vote_positions(vote)) for vote in votes))
+
+
+def major_parties(parties):
+    """The two parties with the most members, most first."""
+    names, sizes = numpy.unique(parties[parties != u""], return_counts=True)
+    return list(names[numpy.argsort(-sizes, kind="mergesort")][:2])
+
+
+def counts(positions, parties, block_size=BLOCK_SIZE):
+    """
+    The counts the statistics are computed from, summed over the votes that
+    are the columns of positions (a row per member), as a dict of arrays:
+
+    * agree, both: members x members, the votes on which both voted yea or
+      nay, and the votes on which they voted the same way
+    * with_party, party_votes: per member, the party unity votes on which
+      the member voted yea or nay, and those on which the member voted with
+      most of their party
+    * voted, serving: per member, the votes on which the member voted and
+      the votes the member could vote on
+    """
+    members = len(parties)
+    total = {
+        "agree": numpy.zeros((members, members), dtype=numpy.int64),
+        "both": numpy.zeros((members, members), dtype=numpy.int64),
+    }
+    for name in COUNTS[2:]:
+        total[name] = numpy.zeros(members, dtype=numpy.int64)
+
+    # a row per major party, with a 1 for each of its members
+    majors = major_parties(parties)
+    membership = numpy.array([parties == party for party in majors], dtype=numpy.float32).reshape(len(majors), members)
+    party_rows = numpy.array([majors.index(party) if party in majors else -1 for party in parties.tolist()], dtype=numpy.int64)
+    in_major = party_rows >= 0
+
+    for start in range(0, positions.shape[1], block_size):
+        block = numpy.asarray(positions[:, start:start + block_size])
+        yea = (block == votematrix.YEA).astype(numpy.float32)
+        nay = (block == votematrix.NAY).astype(numpy.float32)
+        voted_yea_or_nay = yea + nay
+
+        # Products of 0/1 float32 matrices are exact up to 2**24 votes.
+        total["agree"] += numpy.rint(yea.dot(yea.T) + nay.dot(nay.T)).astype(numpy.int64)
+        total["both"] += numpy.rint(voted_yea_or_nay.dot(voted_yea_or_nay.T)).astype(numpy.int64)
+
+        if len(majors) == 2:
+            # each party's majority position on each vote
+            yeas, nays = membership.dot(yea), membership.dot(nay)
+            majority_yea, majority_nay = yeas > nays, nays > yeas
+            unity = (majority_yea[0] & majority_nay[1]) | (majority_nay[0] & majority_yea[1])
+
+            rows = party_rows[in_major]
+            counted = voted_yea_or_nay[in_major].astype(bool) & unity
+            with_party = ((yea[in_major] > 0) & majority_yea[rows]) | ((nay[in_major] > 0) & majority_nay[rows])
+            total["party_votes"][in_major] += counted.sum(axis=1)
+            total["with_party"][in_major] += (counted & with_party).sum(axis=1)
+
+        serving = block != votematrix.NO_POSITION
+        total["serving"] += serving.sum(axis=1)
+        total["voted"] += (serving & (block != votematrix.NOT_VOTING)).sum(axis=1)
+
+    return total
+
+
+def ratio(numerator, denominator):
+    # NaN where there's nothing to divide
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return numerator / denominator.astype(numpy.float64)
+
+
+class VoteStatistics(object):
+    """
+    The agreement, party unity and participation of the members of a
+    chamber, kept up to date with :meth:`update`.
+
+    Parameters
+    ----------
+    block_size : int
+        Votes counted per matrix product.
+    """
+
+    def __init__(self, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.members = numpy.zeros(0, dtype=unicode)
+        self.parties = numpy.zeros(0, dtype=unicode)
+        self.votes = numpy.zeros(0, dtype=unicode)
+        self.positions = numpy.zeros((0, 0), dtype=numpy.int8)
+        self.counts = counts(self.positions, self.parties)
+
+    def update(self, matrix):
+        """
+        Update the statistics to a :class:`congress.votematrix.VoteMatrix`,
+        counting only the votes that were added or changed since the last
+        update. Returns the number of votes counted.
+        """
+        positions = numpy.asarray(matrix.positions)
+        rows = numpy.searchsorted(matrix.members, self.members)
+        if len(self.members) and (
+                rows.max() >= len(matrix.members)
+                or not numpy.array_equal(matrix.members[rows], self.members)
+                or not numpy.array_equal(matrix.parties[rows], self.parties)
+                or major_parties(matrix.parties) != major_parties(self.parties)):
+            # members were removed or changed party: count everything again
+            self.__init__(self.block_size)
+            rows = numpy.zeros(0, dtype=numpy.int64)
+
+        # the counts so far and the votes counted, in the matrix's rows
+        members = len(matrix.members)
+        previous = numpy.zeros((members, len(self.votes)), dtype=numpy.int8)
+        previous[rows] = self.positions
+        total = {}
+        for name, count in self.counts.items():
+            if count.ndim == 2:
+                total[name] = numpy.zeros((members, members), dtype=numpy.int64)
+                total[name][numpy.ix_(rows, rows)] = count
+            else:
+                total[name] = numpy.zeros(members, dtype=numpy.int64)
+                total[name][rows] = count
+
+        # the votes that are new or whose columns changed, and those that
+        # were removed or changed
+        columns = dict((id, i) for i, id in enumerate(matrix.votes.tolist()))
+        previous_columns = dict((id, i) for i, id in enumerate(self.votes.tolist()))
+        kept = [id for id in self.votes.tolist() if id in columns]
+        differs = (positions[:, [columns[id] for id in kept]] != previous[:, [previous_columns[id] for id in kept]]).any(axis=0)
+        differing = set(numpy.array(kept, dtype=object)[differs]) if kept else set()
+        removed = [id for id in self.votes.tolist() if id not in columns or id in differing]
+        changed = [id for id in matrix.votes.tolist() if id not in previous_columns or id in differing]
+
+        if removed:
+            for name, count in counts(previous[:, [previous_columns[id] for id in removed]], matrix.parties, self.block_size).items():
+                total[name] -= count
+        if changed:
+            for name, count in counts(positions[:, [columns[id] for id in changed]], matrix.parties, self.block_size).items():
+                total[name] += count
+
+        self.members = matrix.members.copy()
+        self.parties = matrix.parties.copy()
+        self.votes = matrix.votes.copy()
+        self.positions = positions.copy()
+        self.counts = total
+        return len(changed)
+
+    def agreement(self):
+        """Members x members: the share of votes both voted yea or nay on on which they agreed."""
+        return ratio(self.counts["agree"], self.counts["both"])
+
+    def party_unity(self):
+        """Per member: the share of party unity votes on which the member voted with their party."""
+        return ratio(self.counts["with_party"], self.counts["party_votes"])
+
+    def participation(self):
+        """Per member: the share of votes taken while serving on which the member voted."""
+        return ratio(self.counts["voted"], self.counts["serving"])
@@ -0,0 +1,240 @@
+"""
+Roll call votes as a matrix of how each member voted on each vote.
+
+Each Congress and chamber has a :class:`VoteMatrix`: an int8 array of
+positions with a row per member and a column per roll call vote, and arrays
+of the members' IDs (sorted, with the party each was last recorded with)
+and of the vote IDs (in order of session and number). They're saved
+as ``positions.npy``, ``members.npy``, ``parties.npy`` and ``votes.npy`` in
+a directory per Congress and chamber, so that the positions can be memory
+mapped (see :meth:`VoteMatrixStore.load`) rather than read in full.
+
+The positions are coded as :data:`YEA`, :data:`NAY`, :data:`PRESENT`,
+:data:`NOT_VOTING` and :data:`OTHER` (the options of e.g. the election of
+the Speaker), and :data:`NO_POSITION` where the member wasn't one of the
+voters, e.g. before they took office.
+
+:meth:`VoteMatrixStore.update` takes votes as they are saved (as formed by
+vote_info or voteview) and :meth:`VoteMatrixStore.save` merges them into
+the saved matrices, replacing the columns of votes that were there.
+"""
+
+import errno
+import fcntl
+import os
+
+import numpy
+
+from congress import identifiers
+
+NO_POSITION = 0
+YEA = 1
+NAY = 2
+PRESENT = 3
+NOT_VOTING = 4
+OTHER = 5
+
+# vote option => position
+OPTION_POSITIONS = {
+    "Yea": YEA,
+    "Aye": YEA,
+    "Guilty": YEA,
+    "Nay": NAY,
+    "No": NAY,
+    "Not Guilty": NAY,
+    "Present": PRESENT,
+    "Not Voting": NOT_VOTING,
+}
+
+ARRAYS = ("members", "parties", "votes", "positions")
+
+
+def vote_key(vote_id):
+    # votes in order of session and number
+    id = identifiers.VoteId.parse(vote_id)
+    return (id.session, int(id.number))
+
+
+def vote_positions(vote):
+    """
+    A vote's column: a dict from member ID to (position, party). The Vice
+    President, who is recorded without a record, has the ID "VP".
+    """
+    positions = {}
+    for option, voters in (vote.get("votes") or {}).items():
+        position = OPTION_POSITIONS.get(option, OTHER)
+        for voter in voters:
+            if isinstance(voter, basestring):
+                positions[voter] = (position, None)
+            else:
+                positions[voter["id"]] = (position, voter.get("party"))
+    return positions
+
+
+class VoteMatrix(object):
+    """
+    The positions of the members of a chamber on its votes in a Congress.
+
+    Parameters
+    ----------
+    members : numpy.ndarray
+        Member IDs, sorted.
+    parties : numpy.ndarray
+        The party of each member.
+    votes : numpy.ndarray
+        Vote IDs, in order.
+    positions : numpy.ndarray
+        A row per member and a column per vote.
+    """
+
+    def __init__(self, members, parties, votes, positions):
+        self.members = members
+        self.parties = parties
+        self.votes = votes
+        self.positions = positions
+        self._vote_columns = None
+
+    def member_index(self, member_id):
+        """A member's row. Raises KeyError if the member has no row."""
+        i = numpy.searchsorted(self.members, member_id)
+        if i == len(self.members) or self.members[i] != member_id:
+            raise KeyError(member_id)
+        return i
+
+    def vote_index(self, vote_id):
+        """A vote's column. Raises KeyError if the vote has no column."""
+        if self._vote_columns is None:
+            self._vote_columns = dict((id, i) for i, id in enumerate(self.votes.tolist()))
+        return self._vote_columns[vote_id]
+
+    def member(self, member_id):
+        """A member's positions on each vote."""
+        return self.positions[self.member_index(member_id)]
+
+    def vote(self, vote_id):
+        """Each member's position on a vote."""
+        return self.positions[:, self.vote_index(vote_id)]
+
+    def position(self, member_id, vote_id):
+        """A member's position on a vote."""
+        return self.positions[self.member_index(member_id), self.vote_index(vote_id)]
+
+
+class VoteMatrixStore(object):
+    """
+    Vote matrices saved in a directory, by Congress and chamber.
+
+    Parameters
+    ----------
+    root : str
+        The directory, under which each matrix is saved in
+        <congress>/vote_matrix/<chamber>.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        # (congress, chamber) => {vote ID: column, or None to remove it}
+        self.pending = {}
+
+    def directory(self, congress, chamber):
+        return os.path.join(self.root, str(congress), "vote_matrix", chamber)
+
+    def load(self, congress, chamber, mmap_mode="r"):
+        """
+        Load the matrix of a Congress and chamber, as a :class:`VoteMatrix`
+        whose positions are memory mapped (unless mmap_mode is None). Returns
+        None if there isn't one.
+        """
+        directory = self.directory(congress, chamber)
+        try:
+            arrays = dict(
+                (name, numpy.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode if name == "positions" else None))
+                for name in ARRAYS)
+        except IOError as e:
+            if e.errno == errno.ENOENT:
+                return None
+            raise
+        if arrays["positions"].shape != (len(arrays["members"]), len(arrays["votes"])):
+            # caught between the files being saved
+            return None
+        return VoteMatrix(**arrays)
+
+    def update(self, vote):
+        """Set a vote's column the next time the matrices are saved."""
+        key = (int(vote["congress"]), vote["chamber"])
+        self.pending.setdefault(key, {})[vote["vote_id"]] = vote_positions(vote)
+
+    def remove(self, vote_id):
+        """Remove a vote's column (e.g. a vacated vote) the next time the matrices are saved."""
+        id = identifiers.VoteId.parse(vote_id)
+        self.pending.setdefault((int(id.congress), id.chamber), {})[vote_id] = None
+
+    def save(self):
+        """Merge the votes given to update and remove into the saved matrices."""
+        for (congress, chamber), columns in sorted(self.pending.items()):
+            directory = self.directory(congress, chamber)
+            try:
+                os.makedirs(directory)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+            # other processes may be saving votes of the same chamber
+            with open(os.path.join(directory, "lock"), "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                matrix = merge(self.load(congress, chamber, mmap_mode=None), columns)
+                for name in ARRAYS:
+                    save_array(directory, name, getattr(matrix, name))
+        self.pending.clear()
+
+
+def merge(matrix, columns):
+    """
+    A new :class:`VoteMatrix` from a matrix (or None) and vote columns (see
+    :meth:`VoteMatrixStore.update`) to set or, where None, to remove.
+    """
+    old_members = matrix.members.tolist() if matrix is not None else []
+    old_votes = matrix.votes.tolist() if matrix is not None else []
+
+    parties = dict(zip(old_members, matrix.parties.tolist())) if matrix is not None else {}
+    for vote_id in sorted(columns, key=vote_key):
+        for member_id, (position, party) in (columns[vote_id] or {}).items():
+            if party is not None or member_id not in parties:
+                parties[member_id] = party
+    members = sorted(parties)
+    votes = sorted(set(id for id in old_votes if id not in columns) | set(id for id, column in columns.items() if column is not None),
+                   key=vote_key)
+
+    positions = numpy.zeros((len(members), len(votes)), dtype=numpy.int8)
+    member_rows = dict((id, i) for i, id in enumerate(members))
+    vote_columns = dict((id, i) for i, id in enumerate(votes))
+
+    # the columns of the votes that are kept, in the rows the members are now in
+    kept = [i for i, id in enumerate(old_votes) if id not in columns]
+    if kept and old_members:
+        rows = numpy.array([member_rows[id] for id in old_members])
+        positions[numpy.ix_(rows, [vote_columns[old_votes[i]] for i in kept])] = matrix.positions[:, kept]
+
+    for vote_id, column in columns.items():
+        if column:
+            rows = [member_rows[id] for id in column]
+            positions[rows, vote_columns[vote_id]] = [position for position, party in column.values()]
+
+    return VoteMatrix(
+        numpy.array(members, dtype=unicode),
+        numpy.array([parties[id] or u"" for id in members], dtype=unicode),
+        numpy.array(votes, dtype=unicode),
+        positions)
+
+
+def save_array(directory, name, array):
+    # replaced only once the whole file has been written
+    path = os.path.join(directory, name + ".npy")
+    f = open(path + ".new", "wb")
+    try:
+        with f:
+            numpy.save(f, array)
+    except:
+        os.unlink(path + ".new")
+        raise
+    os.rename(path + ".new", path)
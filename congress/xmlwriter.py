@@ -0,0 +1,135 @@
+"""
+A streaming writer for the GovTrack XML documents.
+
+The documents used to be built as lxml trees and then serialized with
+``etree.tostring(root, pretty_print=True)``. :class:`XMLWriter` writes the
+same bytes straight to a file as the document is generated, without a tree
+or a copy of the whole document in memory. lxml's own incremental writer
+(``etree.xmlfile``) can't be used for this because it doesn't serialize the
+same way: empty elements come out as ``<a></a>`` rather than ``<a/>``, and
+non-ASCII characters in attributes as hexadecimal character references.
+
+The output follows libxml2's pretty printing: each element is on its own
+line, indented two spaces per level, and an element either has text or has
+child elements but not both.
+"""
+
+import re
+
+# what lxml refuses to put in a document
+INVALID_CHARACTERS = re.compile(u"[\x00-\x08\x0B\x0C\x0E-\x1F\ud800-\udfff\ufffe\uffff]")
+
+# byte strings that can be written as is
+PLAIN_TEXT = re.compile(r"[^&<>\r\x00-\x08\x0B\x0C\x0E-\x1F\x80-\xff]*\Z")
+PLAIN_ATTRIBUTE = re.compile(r"[^&<>\"\n\r\t\x00-\x08\x0B\x0C\x0E-\x1F\x80-\xff]*\Z")
+
+
+class XMLWriter(object):
+    """
+    Writes an XML document to a file object, one element at a time.
+
+    Parameters
+    ----------
+    f : file
+    encoding : str
+        None to write ASCII with character references for other characters,
+        as ``etree.tostring`` does by default, or "utf8".
+    """
+
+    def __init__(self, f, encoding=None):
+        self.f = f
+        self.encoding = encoding or "ascii"
+        self.errors = "strict" if encoding else "xmlcharrefreplace"
+
+        # the open elements, and whether each has child elements yet
+        self.stack = []
+        self.has_children = []
+
+    def start(self, tag, attrs=(), break_after=()):
+        """
+        Open an element.
+
+        Parameters
+        ----------
+        tag : str
+        attrs : list
+            (name, value) pairs, in order. Values must be strings.
+        break_after : tuple
+            Names of attributes after which to break the line in the start
+            tag (GovTrack's legacy vote files do this).
+        """
+        tag = self._name(tag)
+        self._open(tag, attrs, break_after)
+        self.stack.append(tag)
+        self.has_children.append(False)
+
+    def end(self):
+        """Close the innermost open element."""
+        tag = self.stack.pop()
+        if self.has_children.pop():
+            self.f.write("\n" + "  " * len(self.stack) + "</" + tag + ">")
+        else:
+            self.f.write("/>")
+        if not self.stack:
+            self.f.write("\n")
+
+    def leaf(self, tag, text=None, attrs=()):
+        """
+        Write an element with no child elements. It has text unless text is
+        None (an empty string gives an element with an end tag).
+        """
+        tag = self._name(tag)
+        self._open(tag, attrs, ())
+        if text is None:
+            self.f.write("/>")
+        else:
+            self.f.write(">" + self.escape_text(text) + "</" + tag + ">")
+        if not self.stack:
+            self.f.write("\n")
+
+    def _open(self, tag, attrs, break_after):
+        if self.stack:
+            if not self.has_children[-1]:
+                self.f.write(">")
+                self.has_children[-1] = True
+            self.f.write("\n" + "  " * len(self.stack))
+
+        self.f.write("<" + tag)
+        separator = " "
+        for name, value in attrs:
+            self.f.write(separator + self._name(name) + "=\"" + self.escape_attribute(value) + "\"")
+            separator = "\n" + "  " * (len(self.stack) + 1) if name in break_after else " "
+
+    def _name(self, name):
+        # tag and attribute names, which may come from JSON
+        if isinstance(name, unicode):
+            return name.encode(self.encoding)
+        return name
+
+    def escape_text(self, value):
+        if isinstance(value, str) and PLAIN_TEXT.match(value):
+            return value
+        value = self._check(value)
+        value = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\r", "&#13;")
+        return value.encode(self.encoding, self.errors)
+
+    def escape_attribute(self, value):
+        if isinstance(value, str) and PLAIN_ATTRIBUTE.match(value):
+            return value
+        value = self._check(value)
+        value = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\"", "&quot;") \
+            .replace("\n", "&#10;").replace("\r", "&#13;").replace("\t", "&#9;")
+        return value.encode(self.encoding, self.errors)
+
+    def _check(self, value):
+        # Accept the same values lxml does.
+        if isinstance(value, str):
+            try:
+                value = value.decode("ascii")
+            except UnicodeDecodeError:
+                raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+        elif not isinstance(value, unicode):
+            raise TypeError("Argument must be bytes or unicode, got '%s'" % type(value).__name__)
+        if INVALID_CHARACTERS.search(value):
+            raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+        return value
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """
-A module that monkey-patches the output_bill method to push the bill identifier
-onto a task queue after the data file has been written to disk. To use this
+A module that monkey-patches the bill renderer (bills.render) to push the bill
+identifier onto a task queue after the data files have been written to disk. To use this
 module, invoke the bills scraper with the --patch option like so:
 
   ./run bills --patch=contrib.beanstalkd
@@ -34,7 +34,7 @@ import beanstalkc
 
 # The patch module is loaded after the task module is loaded, so all task
 # modules are on the import path.
-import bill_info
+import bills
 
 
 __all__ = ['patch', 'output_bill_wrapper']
@@ -93,7 +93,7 @@ def output_bill_wrapper(output_bill):
 
 
 def patch(task_name):
-    bill_info.output_bill = output_bill_wrapper(bill_info.output_bill)
+    bills.render = output_bill_wrapper(bills.render)
 
 
 # Avoid scraping if the beanstalk config is invalid.
@@ -1,5 +1,11 @@
+import io
+import logging
+import os
+
 from govtrack import govtrack_type_codes
-from . import utils
+from congress import amendments, identifiers
+from congress.xmlwriter import XMLWriter
+import utils
 
 
 def create_govtrack_xml(amendment_data, options):
@@ -18,80 +24,131 @@ def create_govtrack_xml(amendment_data, options):
     str
         Full XML document.
     """
-    root = etree.Element("amendment")
-    root.set("session", amendment_data['congress'])
-    root.set("chamber", amendment_data['amendment_type'][0])
-    root.set("number", str(amendment_data['number']))
-    root.set("updated", utils.format_datetime(amendment_data['updated_at']))
+    f = io.BytesIO()
+    write_govtrack_xml(amendment_data, options, XMLWriter(f))
+    return f.getvalue()
+
 
+def write_govtrack_xml(amendment_data, options, xml):
+    """
+    Write a GovTrack XML document for amendment data.
 
+    Parameters
+    ----------
+    amendment_data : dict
+    options : dict
+    xml : :class:`congress.xmlwriter.XMLWriter`
+    """
+    xml.start("amendment", [
+        ("session", amendment_data['congress']),
+        ("chamber", amendment_data['amendment_type'][0]),
+        ("number", str(amendment_data['number'])),
+        ("updated", utils.format_datetime(amendment_data['updated_at'])),
+    ])
 
     if amendment_data.get("amends_bill", None):
-        utils.make_node(root, "amends", None,
+        xml.leaf("amends", None, utils.xml_attrs(
                   type=govtrack_type_codes[amendment_data["amends_bill"]["bill_type"]],
                   number=str(amendment_data["amends_bill"]["number"]),
-                  sequence=str(amendment_data["house_number"]) if amendment_data.get("house_number", None) else "")
+                  sequence=str(amendment_data["house_number"]) if amendment_data.get("house_number", None) else ""))
     elif amendment_data.get("amends_treaty", None):
-        utils.make_node(root, "amends", None,
+        xml.leaf("amends", None, utils.xml_attrs(
                   type="treaty",
-                  number=str(amendment_data["amends_treaty"]["number"]))
+                  number=str(amendment_data["amends_treaty"]["number"])))
 
-    utils.make_node(root, "status", amendment_data['status'], datetime=amendment_data['status_at'])
+    xml.leaf("status", amendment_data['status'], utils.xml_attrs(datetime=amendment_data['status_at']))
 
     if amendment_data['sponsor'] and amendment_data['sponsor']['type'] == 'person':
         v = amendment_data['sponsor']['bioguide_id']
         if not options.get("govtrack", False):
-            utils.make_node(root, "sponsor", None, bioguide_id=v)
+            xml.leaf("sponsor", None, utils.xml_attrs(bioguide_id=v))
         else:
             v = str(utils.translate_legislator_id('bioguide', v, 'govtrack'))
-            utils.make_node(root, "sponsor", None, id=v)
+            xml.leaf("sponsor", None, utils.xml_attrs(id=v))
     elif amendment_data['sponsor'] and amendment_data['sponsor']['type'] == 'committee':
-        utils.make_node(root, "sponsor", None, committee=amendment_data['sponsor']['name'])
+        xml.leaf("sponsor", None, utils.xml_attrs(committee=amendment_data['sponsor']['name']))
     else:
-        utils.make_node(root, "sponsor", None)
+        xml.leaf("sponsor", None)
 
-    utils.make_node(root, "offered", None, datetime=amendment_data['introduced_at'])
+    xml.leaf("offered", None, utils.xml_attrs(datetime=amendment_data['introduced_at']))
 
-    utils.make_node(root, "description", amendment_data["description"] if amendment_data["description"] else amendment_data["purpose"])
+    xml.leaf("description", amendment_data["description"] if amendment_data["description"] else amendment_data["purpose"])
     if amendment_data["description"]:
-        utils.make_node(root, "purpose", amendment_data["purpose"])
+        xml.leaf("purpose", amendment_data["purpose"])
 
-    actions = utils.make_node(root, "actions", None)
+    xml.start("actions")
     for action in amendment_data['actions']:
-        a = utils.make_node(actions,
-                      action['type'] if action['type'] in ("vote",) else "action",
-                      None,
-                      datetime=action['acted_at'])
+        attrs = utils.xml_attrs(datetime=action['acted_at'])
         if action['type'] == 'vote':
-            a.set("how", action["how"])
-            a.set("result", action["result"])
+            attrs.append(("how", action["how"]))
+            attrs.append(("result", action["result"]))
             if action.get("roll") != None:
-                a.set("roll", str(action["roll"]))
+                attrs.append(("roll", str(action["roll"])))
+        xml.start(action['type'] if action['type'] in ("vote",) else "action", attrs)
         if action.get('text'):
-            utils.make_node(a, "text", action['text'])
+            xml.leaf("text", action['text'])
         if action.get('in_committee'):
-            utils.make_node(a, "committee", None, name=action['in_committee'])
+            xml.leaf("committee", None, utils.xml_attrs(name=action['in_committee']))
         for cr in action['references']:
-            utils.make_node(a, "reference", None, ref=cr['reference'], label=cr['type'])
+            xml.leaf("reference", None, utils.xml_attrs(ref=cr['reference'], label=cr['type']))
+        xml.end()
+    xml.end()
 
-    return etree.tostring(root, pretty_print=True)
+    xml.end()
 
 
-def process_amendment(fdsys_data, bill_id, options):
+def process_amendment(fdsys_data, bill_id, options, fingerprint=None):
     """
     Rewrite FDSYS amendment data (parsed from XML) as JSON and GovTrack XML
     documents.
+
+    If a parser fingerprint is given, it is saved next to the documents.
     """
+    render(parse(fdsys_data, bill_id, options), options, fingerprint)
+
+
+def parse(fdsys_data, bill_id, options):
+    """Parse FDSYS amendment data into the amendment's record."""
     data = amendments.parse_fdsys_amendment_data(fdsys_data, options)
-    path = amendment_output_path(data['amendment_id'], "json")
+    logging.info("[%s] Parsed %s." % (bill_id, data['amendment_id']))
+    return data
 
-    logging.info("[%s] Saving %s to %s..." % (bill_id, data['amendment_id'], path))
 
+def write_json(data, options):
     # output JSON - so easy!
-    utils.write(json.dumps(data, sort_keys=True, indent=2, default=utils.format_datetime), path)
+    utils.write(utils.json_dumps(data, default=utils.format_datetime), output_path(data['amendment_id'], "json"))
+
+
+def write_xml(data, options):
+    path = output_path(data['amendment_id'], "xml")
+    utils.record_legislator_ids()
+    with utils.xml_output(path, options) as xml:
+        write_govtrack_xml(data, options, xml)
+    utils.index_legislator_ids(path, "amendment", options)
+
+
+def write_sqlite(data, options):
+    if not options.get("diff"):
+        utils.sqlite_sink().write_amendment(data)
 
-    with open(output_path(data['amendment_id'], "xml"), 'wb') as xml_file:
-        xml_file.write(create_govtrack_xml(data, options))
+
+# output format => function(data, options) that writes it
+RENDERERS = {
+    "json": write_json,
+    "xml": write_xml,
+    "sqlite": write_sqlite,
+}
+
+
+def render(data, options, fingerprint=None):
+    """
+    Write the outputs selected with --outputs for an amendment's record. If a
+    parser fingerprint is given, it is saved next to them.
+    """
+    logging.info("[%s] Saving to %s..." % (data['amendment_id'], os.path.dirname(output_path(data['amendment_id'], "json"))))
+    utils.render(RENDERERS, data, options)
+    if fingerprint:
+        utils.write_parser_fingerprint(fingerprint, os.path.dirname(output_path(data['amendment_id'], "json")), options)
 
 
 def output_path(amendment_id, file_extension):
@@ -109,5 +166,4 @@ def output_path(amendment_id, file_extension):
     str
         Full path to file (which may not yet exist).
     """
-    amendment_type, number, congress = utils.split_bill_id(amendment_id)
-    return "%s/%s/amendments/%s/%s%s/%s" % (utils.data_dir(), congress, amendment_type, amendment_type, number, "data.%s" % file_extension)
+    return "%s/%s/%s" % (utils.data_dir(), identifiers.AmendmentId.parse(amendment_id).path, "data.%s" % file_extension)
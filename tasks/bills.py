@@ -1,14 +1,27 @@
-import json
+import io
 import logging
 import os
 import re
+import sys
 import xmltodict
 
-from congress import bill_info, amendments
+from govtrack import govtrack_type_codes
+from congress import identifiers, recordstore
+from congress import amendments as congress_amendments
+from congress import bills as congress_bills
+from congress import rules
 from congress import utils as congress_utils
+from congress.xmlwriter import XMLWriter
+import amendments
 import fdsys
+import utils
 
-from . import bill_info, utils
+
+def parser_fingerprint(options):
+    # The code that writes bill and amendment data (see --stale-only).
+    return utils.parser_fingerprint(
+        (congress_bills.bill_info, congress_bills, congress_amendments, congress_utils, rules, amendments, sys.modules[__name__]),
+        options)
 
 
 def run(options):
@@ -90,7 +103,8 @@ def get_bills_to_process(options):
                     # file need to be updated?
                     bulkfile_lastmod = utils.read(fn.replace(".xml", "-lastmod.txt"))
                     parse_lastmod = utils.read(get_data_path(congress, bill_type, bill_type_and_number, "data-fromfdsys-lastmod.txt"))
-                    if bulkfile_lastmod != parse_lastmod or options.get("force"):
+                    if bulkfile_lastmod != parse_lastmod or options.get("force") \
+                     or (options.get("stale_only") and utils.is_stale(parser_fingerprint(options), get_data_path(congress, bill_type, bill_type_and_number), options)):
                         bill_id = bill_type_and_number + "-" + congress
                         yield bill_id
 
@@ -100,6 +114,12 @@ def process_bill(bill_id, options):
     Parse FDSYS XML record for a bill, and save the data as JSON and GovTrack
     XML.
 
+    The bill and its amendments are parsed into records, which are saved in
+    the record store (see congress.recordstore), and then rendered from
+    there. If the store has records parsed from the same file by the same
+    code, they are rendered without parsing anything (unless --force is
+    given).
+
     Parameters
     ----------
     bill_id
@@ -112,20 +132,22 @@ def process_bill(bill_id, options):
     fdsys_xml_path = _path_to_billstatus_file(bill_id)
     logging.info("[%s] Processing %s..." % (bill_id, fdsys_xml_path))
 
-    # Read FDSys bulk data file.
-    xml_as_dict = read_fdsys_bulk_bill_status_file(fdsys_xml_path, bill_id)
-    bill_data = form_bill_json_dict(xml_as_dict)
+    fdsys_billstatus = utils.read(fdsys_xml_path)
+    source_hash = recordstore.source_hash(fdsys_billstatus)
 
-    # Convert and write out data.json and data.xml.
-    utils.write(
-        unicode(json.dumps(bill_data, indent=2, sort_keys=True)),
-        os.path.dirname(fdsys_xml_path) + '/data.json')
+    bill_data, amendments_data = None, None
+    if not options.get("force"):
+        bill_data, amendments_data = stored_bill_data(bill_id, source_hash, options)
+    if bill_data is None:
+        bill_data, amendments_data = parse_bill_data(bill_id, fdsys_billstatus, source_hash, options)
 
-    with open(os.path.dirname(fdsys_xml_path) + '/data.xml', 'wb') as xml_file:
-        xml_file.write(create_govtrack_xml(bill_data, options))
+    # Convert and write out data.json and data.xml.
+    fingerprint = parser_fingerprint(options)
+    render(bill_data, options)
+    utils.write_parser_fingerprint(fingerprint, os.path.dirname(fdsys_xml_path), options)
 
-    if options.get("amendments", True):
-        process_amendments(bill_id, xml_as_dict, options)
+    for amendment_data in amendments_data:
+        amendments.render(amendment_data, options, fingerprint)
 
     # Mark this bulk data file as processed by saving its lastmod
     # file under a new path.
@@ -138,14 +160,135 @@ def process_bill(bill_id, options):
         "saved": True,
     }
 
-r
+
+def record_fingerprint():
+    # The code that parses bill and amendment records (see congress.recordstore).
+    return utils.parser_fingerprint(
+        (congress_bills.bill_info, congress_bills, congress_amendments, congress_utils, rules), {})
+
+
+def stored_bill_data(bill_id, source_hash, options):
+    """
+    The bill's records from the record store, if they were parsed from the
+    source with this hash by the current code.
+
+    Returns
+    -------
+    (dict, list)
+        The bill data and the data of its amendments (none unless
+        options["amendments"] is true, as by default), or (None, None).
+    """
+    store = utils.record_store()
+    stored = store.get(identifiers.BillId.parse(bill_id), source_hash, record_fingerprint())
+    if stored is None:
+        return None, None
+
+    amendments_data = []
+    if options.get("amendments", True):
+        for amendment in stored.data["amendments"]:
+            stored_amendment = store.get(identifiers.AmendmentId.parse(amendment["amendment_id"]), source_hash, record_fingerprint())
+            if stored_amendment is None:
+                return None, None
+            amendments_data.append(stored_amendment.data)
+
+    logging.info("[%s] Unchanged since it was parsed, rendering the stored records." % bill_id)
+    return stored.data, amendments_data
+
+
+def parse_bill_data(bill_id, fdsys_billstatus, source_hash, options):
+    """
+    Parse the bill and its amendments and save the records in the record
+    store.
+
+    Returns
+    -------
+    (dict, list)
+        The bill data and the data of its amendments (none unless
+        options["amendments"] is true, as by default).
+    """
+    xml_as_dict = xmltodict.parse(fdsys_billstatus, force_list=('item', 'amendment', 'committeeReport',))
+
+    # Usually only new actions have been added since we last parsed the bill,
+    # so try parsing just those first, unless --force is given.
+    bill_data = None
+    parse_state = None
+    if not options.get("force"):
+        bill_data, parse_state = update_bill_data(bill_id, xml_as_dict)
+    if bill_data is None:
+        bill_data = congress_bills.form_bill_json_dict(xml_as_dict)
+        parse_state = congress_bills.parse_state_for(xml_as_dict, bill_data)
+
+    store = utils.record_store()
+    store.put(identifiers.BillId.parse(bill_id), bill_data, source_hash, record_fingerprint(), parse_state)
+
+    amendments_data = []
+    if options.get("amendments", True):
+        amdt_list = xml_as_dict['billStatus']['bill']['amendments']
+        for amdt in (amdt_list['amendment'] if amdt_list else []):  # many bills don't have amendments
+            amendment_data = amendments.parse(amdt, bill_id, options)
+            store.put(identifiers.AmendmentId.parse(amendment_data['amendment_id']), amendment_data,
+                      source_hash, record_fingerprint())
+            amendments_data.append(amendment_data)
+
+    return bill_data, amendments_data
+
+
+def update_bill_data(bill_id, xml_as_dict):
+    """
+    Update the bill's stored record by parsing only newly added actions.
+
+    Returns
+    -------
+    (dict, dict)
+        The bill data and parse state, or (None, None) if the bill must be
+        parsed in full.
+    """
+    stored = utils.record_store().get(identifiers.BillId.parse(bill_id), fingerprint=record_fingerprint())
+    if stored is None or stored.state is None:
+        return None, None
+
+    bill_data, parse_state = stored.data, stored.state
+    if congress_bills.update_bill_json_dict(xml_as_dict, bill_data, parse_state) is None:
+        logging.info("[%s] Earlier actions or other fields changed, parsing in full." % bill_id)
+        return None, None
+    return bill_data, parse_state
+
+
+def write_json(bill_data, options):
+    utils.write(
+        unicode(utils.json_dumps(bill_data, default=None)),
+        output_for_bill(bill_data['bill_id'], "json"))
+
+
+def write_xml(bill_data, options):
+    path = output_for_bill(bill_data['bill_id'], "xml")
+    utils.record_legislator_ids()
+    with utils.xml_output(path, options) as xml:
+        write_govtrack_xml(bill_data, options, xml)
+    utils.index_legislator_ids(path, "bill", options)
+
+
+def write_sqlite(bill_data, options):
+    if not options.get("diff"):
+        utils.sqlite_sink().write_bill(bill_data)
+
+
+# output format => function(bill_data, options) that writes it
+RENDERERS = {
+    "json": write_json,
+    "xml": write_xml,
+    "sqlite": write_sqlite,
+}
+
+
+def render(bill_data, options):
+    # Write the outputs selected with --outputs.
+    utils.render(RENDERERS, bill_data, options)
+
+
 def _path_to_billstatus_file(bill_id):
     return output_for_bill(bill_id, fdsys.FDSYS_BILLSTATUS_FILENAME, is_data_dot=False)
 
-def read_fdsys_bulk_bill_status_file(fn, bill_id):
-    fdsys_billstatus = utils.read(fn)
-    return xmltodict.parse(fdsys_billstatus, force_list=('item', 'amendment', 'committeeReport',))
-
 
 def output_for_bill(bill_id, format, is_data_dot=True):
     """
@@ -161,35 +304,35 @@ def output_for_bill(bill_id, format, is_data_dot=True):
     -------
     str
     """
-    bill_type, number, congress = utils.split_bill_id(bill_id)
     if is_data_dot:
         fn = "data.%s" % format
     else:
         fn = format
-    return "%s/%s/bills/%s/%s%s/%s" % (utils.data_dir(), congress, bill_type, bill_type, number, fn)
+    return "%s/%s/%s" % (utils.data_dir(), identifiers.BillId.parse(bill_id).path, fn)
 
 
-def process_amendments(bill_id, bill_amendments, options):
-    amdt_list = bill_amendments['billStatus']['bill']['amendments']
-    if amdt_list is None:  # many bills don't have amendments
-        return
-
-    for amdt in amdt_list['amendment']:
-        amendments.process_amendment(amdt, bill_id, options)
+def create_govtrack_xml(bill, options):
+    """
+    Generate a GovTrack XML document from bill data, as a string.
+    """
+    f = io.BytesIO()
+    write_govtrack_xml(bill, options, XMLWriter(f))
+    return f.getvalue()
 
 
-def create_govtrack_xml(bill, options):
+def write_govtrack_xml(bill, options, xml):
     """
-    Generate a GovTrack XML document from bill data.
+    Write a GovTrack XML document for bill data to an XMLWriter.
     """
 
-    root = etree.Element("bill")
-    root.set("session", bill['congress'])
-    root.set("type", govtrack_type_codes[bill['bill_type']])
-    root.set("number", bill['number'])
-    root.set("updated", utils.format_datetime(bill['updated_at']))
+    xml.start("bill", [
+        ("session", bill['congress']),
+        ("type", govtrack_type_codes[bill['bill_type']]),
+        ("number", bill['number']),
+        ("updated", utils.format_datetime(bill['updated_at'])),
+    ])
 
-    def make_node(parent, tag, text, **attrs):
+    def node_attrs(**attrs):
         if options.get("govtrack", False):
             # Rewrite bioguide_id attributes as just id with GovTrack person IDs.
             attrs2 = {}
@@ -202,119 +345,132 @@ def create_govtrack_xml(bill, options):
                     attrs2[k] = v
             attrs = attrs2
 
-        return utils.make_node(parent, tag, text, **attrs)
+        return utils.xml_attrs(**attrs)
 
     # for American Memory Century of Lawmaking bills...
     for source in bill.get("sources", []):
-        n = make_node(root, "source", "")
+        text = ""
+        attrs = node_attrs()
         for k, v in sorted(source.items()):
             if k == "source":
-                n.text = v
+                text = v
             elif k == "source_url":
-                n.set("url", v)
+                attrs.append(("url", v))
             else:
-                n.set(k, unicode(v))
+                attrs.append((k, unicode(v)))
+        xml.leaf("source", text, attrs)
     if "original_bill_number" in bill:
-        make_node(root, "bill-number", bill["original_bill_number"])
+        xml.leaf("bill-number", bill["original_bill_number"], node_attrs())
 
-    make_node(root, "state", bill['status'], datetime=bill['status_at'])
-    old_status = make_node(root, "status", None)
-    make_node(old_status, "introduced" if bill['status'] in ("INTRODUCED", "REFERRED") else "unknown", None, datetime=bill['status_at'])  # dummy for the sake of comparison
+    xml.leaf("state", bill['status'], node_attrs(datetime=bill['status_at']))
+    xml.start("status", node_attrs())
+    xml.leaf("introduced" if bill['status'] in ("INTRODUCED", "REFERRED") else "unknown", None, node_attrs(datetime=bill['status_at']))  # dummy for the sake of comparison
+    xml.end()
 
-    make_node(root, "introduced", None, datetime=bill['introduced_at'])
-    titles = make_node(root, "titles", None)
+    xml.leaf("introduced", None, node_attrs(datetime=bill['introduced_at']))
+    xml.start("titles", node_attrs())
     for title in bill['titles']:
-        n = make_node(titles, "title", title['title'])
-        n.set("type", title['type'])
+        attrs = node_attrs()
+        attrs.append(("type", title['type']))
         if title['as']:
-            n.set("as", title['as'])
+            attrs.append(("as", title['as']))
         if title['is_for_portion']:
-            n.set("partial", "1")
+            attrs.append(("partial", "1"))
+        xml.leaf("title", title['title'], attrs)
+    xml.end()
 
     if bill['sponsor']:
         # TODO: Sponsored by committee?
-        make_node(root, "sponsor", None, bioguide_id=bill['sponsor']['bioguide_id'])
+        xml.leaf("sponsor", None, node_attrs(bioguide_id=bill['sponsor']['bioguide_id']))
     else:
-        make_node(root, "sponsor", None)
+        xml.leaf("sponsor", None, node_attrs())
 
-    cosponsors = make_node(root, "cosponsors", None)
+    xml.start("cosponsors", node_attrs())
     for cosp in bill['cosponsors']:
-        n = make_node(cosponsors, "cosponsor", None, bioguide_id=cosp["bioguide_id"])
+        attrs = node_attrs(bioguide_id=cosp["bioguide_id"])
         if cosp["sponsored_at"]:
-            n.set("joined", cosp["sponsored_at"])
+            attrs.append(("joined", cosp["sponsored_at"]))
         if cosp["withdrawn_at"]:
-            n.set("withdrawn", cosp["withdrawn_at"])
+            attrs.append(("withdrawn", cosp["withdrawn_at"]))
+        xml.leaf("cosponsor", None, attrs)
+    xml.end()
 
-    actions = make_node(root, "actions", None)
+    xml.start("actions", node_attrs())
     for action in bill['actions']:
-        a = make_node(actions,
-                      action['type'] if action['type'] in ("vote", "vote-aux", "calendar", "topresident", "signed", "enacted", "vetoed") else "action",
-                      None,
-                      datetime=action['acted_at'])
+        attrs = node_attrs(datetime=action['acted_at'])
         if action.get("status"):
-            a.set("state", action["status"])
+            attrs.append(("state", action["status"]))
         if action['type'] in ('vote', 'vote-aux'):
-            a.clear()  # re-insert date between some of these attributes
-            a.set("how", action["how"])
-            a.set("type", action["vote_type"])
+            attrs = []  # re-insert date between some of these attributes
+            attrs.append(("how", action["how"]))
+            attrs.append(("type", action["vote_type"]))
             if action.get("roll") != None:
-                a.set("roll", action["roll"])
-            a.set("datetime", utils.format_datetime(action['acted_at']))
-            a.set("where", action["where"])
-            a.set("result", action["result"])
+                attrs.append(("roll", action["roll"]))
+            attrs.append(("datetime", utils.format_datetime(action['acted_at'])))
+            attrs.append(("where", action["where"]))
+            attrs.append(("result", action["result"]))
             if action.get("suspension"):
-                a.set("suspension", "1")
+                attrs.append(("suspension", "1"))
             if action.get("status"):
-                a.set("state", action["status"])
+                attrs.append(("state", action["status"]))
         if action['type'] == 'calendar' and "calendar" in action:
-            a.set("calendar", action["calendar"])
+            attrs.append(("calendar", action["calendar"]))
             if action["under"]:
-                a.set("under", action["under"])
+                attrs.append(("under", action["under"]))
             if action["number"]:
-                a.set("number", action["number"])
+                attrs.append(("number", action["number"]))
         if action['type'] == 'enacted':
-            a.clear()  # re-insert date between some of these attributes
-            a.set("number", "%s-%s" % (bill['congress'], action["number"]))
-            a.set("type", action["law"])
-            a.set("datetime", utils.format_datetime(action['acted_at']))
+            attrs = []  # re-insert date between some of these attributes
+            attrs.append(("number", "%s-%s" % (bill['congress'], action["number"])))
+            attrs.append(("type", action["law"]))
+            attrs.append(("datetime", utils.format_datetime(action['acted_at'])))
             if action.get("status"):
-                a.set("state", action["status"])
+                attrs.append(("state", action["status"]))
         if action['type'] == 'vetoed':
             if action.get("pocket"):
-                a.set("pocket", "1")
+                attrs.append(("pocket", "1"))
+
+        xml.start(action['type'] if action['type'] in ("vote", "vote-aux", "calendar", "topresident", "signed", "enacted", "vetoed") else "action", attrs)
         if action.get('text'):
-            make_node(a, "text", action['text'])
+            xml.leaf("text", action['text'], node_attrs())
         if action.get('in_committee'):
-            make_node(a, "committee", None, name=action['in_committee'])
+            xml.leaf("committee", None, node_attrs(name=action['in_committee']))
         for cr in action['references']:
-            make_node(a, "reference", None, ref=cr['reference'], label=cr['type'])
+            xml.leaf("reference", None, node_attrs(ref=cr['reference'], label=cr['type']))
+        xml.end()
+    xml.end()
 
-    committees = make_node(root, "committees", None)
+    xml.start("committees", node_attrs())
     for cmt in bill['committees']:
-        make_node(committees, "committee", None, code=(cmt["committee_id"] + cmt["subcommittee_id"]) if cmt.get("subcommittee_id", None) else cmt["committee_id"], name=cmt["committee"], subcommittee=cmt.get("subcommittee").replace("Subcommittee on ", "") if cmt.get("subcommittee") else "", activity=", ".join(c.title() for c in cmt["activity"]))
+        xml.leaf("committee", None, node_attrs(code=(cmt["committee_id"] + cmt["subcommittee_id"]) if cmt.get("subcommittee_id", None) else cmt["committee_id"], name=cmt["committee"], subcommittee=cmt.get("subcommittee").replace("Subcommittee on ", "") if cmt.get("subcommittee") else "", activity=", ".join(c.title() for c in cmt["activity"])))
+    xml.end()
 
-    relatedbills = make_node(root, "relatedbills", None)
+    xml.start("relatedbills", node_attrs())
     for rb in bill['related_bills']:
         if rb['type'] == "bill":
             rb_bill_type, rb_number, rb_congress = congress_utils.split_bill_id(rb['bill_id'])
-            make_node(relatedbills, "bill", None, session=rb_congress, type=govtrack_type_codes[rb_bill_type], number=rb_number, relation="unknown" if rb['reason'] == "related" else rb['reason'])
+            xml.leaf("bill", None, node_attrs(session=rb_congress, type=govtrack_type_codes[rb_bill_type], number=rb_number, relation="unknown" if rb['reason'] == "related" else rb['reason']))
+    xml.end()
 
-    subjects = make_node(root, "subjects", None)
+    xml.start("subjects", node_attrs())
     if bill['subjects_top_term']:
-        make_node(subjects, "term", None, name=bill['subjects_top_term'])
+        xml.leaf("term", None, node_attrs(name=bill['subjects_top_term']))
     for s in bill['subjects']:
         if s != bill['subjects_top_term']:
-            make_node(subjects, "term", None, name=s)
+            xml.leaf("term", None, node_attrs(name=s))
+    xml.end()
 
-    amendments = make_node(root, "amendments", None)
+    xml.start("amendments", node_attrs())
     for amd in bill['amendments']:
-        make_node(amendments, "amendment", None, number=amd["chamber"] + str(amd["number"]))
+        xml.leaf("amendment", None, node_attrs(number=amd["chamber"] + str(amd["number"])))
+    xml.end()
 
     if bill.get('summary'):
-        make_node(root, "summary", bill['summary']['text'], date=bill['summary']['date'], status=bill['summary']['as'])
+        xml.leaf("summary", bill['summary']['text'], node_attrs(date=bill['summary']['date'], status=bill['summary']['as']))
 
-    committee_reports = make_node(root, "committee-reports", None)
+    xml.start("committee-reports", node_attrs())
     for report in bill['committee_reports']:
-        make_node(committee_reports, "report", report)
+        xml.leaf("report", report, node_attrs())
+    xml.end()
 
-    return etree.tostring(root, pretty_print=True)
+    xml.end()
@@ -10,6 +10,8 @@ import logging
 import mechanize
 import zipfile
 import StringIO
+
+from congress import datetimes
 import requests
 import subprocess
 
@@ -365,7 +367,7 @@ def parse_witness_list(witness_tree, uploaded_documents, event_id):
             try:
                 document["published_on"] = datetime.datetime.strptime(published_on, "%Y-%m-%dT%H:%M:%S.%f")
             except:
-                document["published_on"] = datetime.datetime.strptime(published_on, "%Y-%m-%dT%H:%M:%S")
+                document["published_on"] = datetimes.parse_datetime(published_on, "%Y-%m-%dT%H:%M:%S")
 
             document["description"] = doc.xpath("string(description)")
             if document["description"] == '':
@@ -409,7 +411,7 @@ def parse_house_committee_meeting(event_id, dom, existing_meetings, committees,
     try:
         congress = int(dom.xpath("//@congress-num")[0])
         occurs_at = dom.xpath("string(meeting-details/meeting-date/calendar-date)") + " " + dom.xpath("string(meeting-details/meeting-date/start-time)")
-        occurs_at = datetime.datetime.strptime(occurs_at, "%Y-%m-%d %H:%M:%S")
+        occurs_at = datetimes.parse_datetime(occurs_at)
     except:
         raise ValueError("Invalid meeting data (probably server error).")
 
@@ -452,7 +454,7 @@ def parse_house_committee_meeting(event_id, dom, existing_meetings, committees,
         try:
             document["published_on"] = datetime.datetime.strptime(published_on, "%Y-%m-%dT%H:%M:%S.%f")
         except:
-            document["published_on"] = datetime.datetime.strptime(published_on, "%Y-%m-%dT%H:%M:%S")
+            document["published_on"] = datetimes.parse_datetime(published_on, "%Y-%m-%dT%H:%M:%S")
         document["description"] = doc.xpath("string(description)")
         if document["description"] == '':
             document["description"] = None
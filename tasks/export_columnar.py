@@ -0,0 +1,44 @@
+import utils
+import logging
+import os.path
+
+from congress import columnar
+
+# Exports the parsed bills of a Congress and their actions, as saved in the
+# record store (see congress.recordstore), to column-oriented tables in
+# data/<congress>/columnar: bills.npz and actions.npz (one NumPy array per
+# column, see congress.columnar), and bills.parquet and actions.parquet if
+# pyarrow is installed. Only the records that changed since the last export
+# are read again.
+#
+# --congress=113[,114]: the Congresses to export (required).
+# --force: read every record again.
+
+
+def run(options):
+    if not options.get("congress"):
+        logging.error("Specify the Congresses to export, e.g. --congress=113.")
+        return None
+
+    store = utils.record_store()
+    for congress in str(options["congress"]).split(","):
+        paths = store.paths(congress, "bills")
+        if not paths:
+            logging.warn("[%s] No parsed bills to export." % congress)
+            continue
+
+        directory = output_dir(congress)
+        count, read = columnar.export(paths, lambda path: load_bill(store, path), directory, force=options.get("force", False))
+        logging.warn("[%s] Exported %i bills (%i read) to %s." % (congress, count, read, directory))
+
+
+def output_dir(congress):
+    return os.path.join(utils.data_dir(), str(congress), "columnar")
+
+
+def load_bill(store, path):
+    stored = store.load(path)
+    if stored is None:
+        logging.warn("Skipping %s, saved by another version of the code." % path)
+        return None
+    return stored.data
@@ -69,6 +69,8 @@ import os.path
 import zipfile
 import utils
 
+from congress import identifiers
+
 # globals
 fdsys_baseurl = "https://www.gpo.gov/smap/"
 BULKDATA_BASE_URL = "https://www.gpo.gov/fdsys/bulkdata/"
@@ -486,10 +488,10 @@ def mirror_package_or_granule(sitemap, package_name, granule_name, lastmod, opti
             with open(file_path_text, "w") as f:
                 f.write(unwrap_text_in_html(data))
 
-        if sitemap["collection"] == "BILLS" and file_type == "mods":
+        if sitemap["collection"] == "BILLS" and file_type == "mods" and utils.wants_output(options, "json"):
             # When we download bill files, also create the text-versions/data.json file
             # which extracts commonly used components of the MODS XML, whenever we update
-            # that MODS file.
+            # that MODS file (unless JSON output is turned off with --outputs).
             extract_bill_version_metadata(package_name, path)
 
     # Write the current last modified date back to disk so we know the next time whether
@@ -666,10 +668,9 @@ def extract_bill_version_metadata(package_name, text_path):
     bill_version["issued_on"] = doc.xpath("string(//mods:dateIssued)", namespaces=mods_ns)
 
     utils.write(
-        json.dumps(bill_version, sort_keys=True, indent=2, default=utils.format_datetime),
+        utils.json_dumps(bill_version, default=utils.format_datetime),
         output_for_bill_version(bill_version_id)
     )
 
 def output_for_bill_version(bill_version_id):
-    bill_type, number, congress, version_code = utils.split_bill_version_id(bill_version_id)
-    return "%s/%s/bills/%s/%s%s/text-versions/%s/data.json" % (utils.data_dir(), congress, bill_type, bill_type, number, version_code)
+    return "%s/%s/data.json" % (utils.data_dir(), identifiers.BillVersionId.parse(bill_version_id).path)
@@ -1,12 +1,13 @@
 import utils
 import logging
 import re
-import json
 from datetime import datetime
 from lxml import etree
 import time
 from lxml.html import fromstring
 
+from congress import identifiers
+
 # can be run on its own, just require a nomination_id (e.g. PN2094-112)
 
 
@@ -217,8 +218,7 @@ def parse_nomination(nomination_id, body, options):
 
 
 def output_for_nomination(nomination_id, format):
-	nomination_type, number, congress = utils.split_nomination_id(nomination_id)
-	return "%s/%s/nominations/%s/%s" % (utils.data_dir(), congress, number, "data.%s" % format)
+	return "%s/%s/%s" % (utils.data_dir(), identifiers.NominationId.parse(nomination_id).path, "data.%s" % format)
 
 
 def nomination_url_for(nomination_id):
@@ -243,6 +243,6 @@ def output_nomination(nomination, options):
 
 	# output JSON - so easy!
 	utils.write(
-		json.dumps(nomination, sort_keys=True, indent=2, default=utils.format_datetime),
+		utils.json_dumps(nomination, default=utils.format_datetime),
 		output_for_nomination(nomination['nomination_id'], "json")
 	)
@@ -0,0 +1,95 @@
+import utils
+import logging
+import multiprocessing
+import os.path
+
+# Renders bills, amendments and votes again from the records saved in the
+# record store when they were parsed (see congress.recordstore), without
+# fetching or parsing anything. Run it after adding or fixing an output format.
+#
+# --congress=113[,114]: the Congresses to render (required).
+# --kinds=bills,amendments,votes: what to render (everything by default).
+# --outputs=json,xml: the formats to write (see utils.output_formats).
+# --workers=4: render in this many processes.
+
+KINDS = ("bills", "amendments", "votes")
+
+
+def run(options):
+    if not options.get("congress"):
+        logging.error("Specify the Congresses to render, e.g. --congress=113.")
+        return None
+
+    kinds = options.get("kinds", ",".join(KINDS)).split(",")
+    for kind in kinds:
+        if kind not in KINDS:
+            logging.error("Unknown kind %s (choose from %s)." % (kind, ", ".join(KINDS)))
+            return None
+
+    store = utils.record_store()
+    to_render = []
+    for congress in str(options["congress"]).split(","):
+        for kind in kinds:
+            to_render.extend(store.paths(congress, kind))
+    if not to_render:
+        logging.warn("No parsed records to render.")
+        return None
+
+    logging.warn("Going to render %i records." % len(to_render))
+
+    workers = int(options.get("workers", 1))
+    if workers > 1:
+        pool = multiprocessing.Pool(workers)
+        try:
+            pool.map(render_set, [(to_render[i::workers], options) for i in range(workers)])
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        render_set((to_render, options))
+
+
+def render_set(args):
+    # process_set in one worker process
+    paths, options = args
+    return utils.process_set(paths, render, options)
+
+
+def render(path, options):
+    stored = utils.record_store().load(path)
+    if stored is None:
+        return {'saved': False, 'ok': True, 'reason': "saved by another version of the code"}
+
+    # the directory under the Congress is the kind (see RecordStore.paths)
+    kind = os.path.basename(os.path.dirname(os.path.dirname(path)))
+    if kind == "bills":
+        import bills
+        bills.render(stored.data, options)
+        current = (stored.fingerprint == bills.record_fingerprint())
+        output_dir = os.path.dirname(bills.output_for_bill(stored.id, "json"))
+        fingerprint = bills.parser_fingerprint(options)
+
+    elif kind == "amendments":
+        import amendments
+        import bills
+        amendments.render(stored.data, options)
+        current = (stored.fingerprint == bills.record_fingerprint())
+        output_dir = os.path.dirname(amendments.output_path(stored.id, "json"))
+        fingerprint = bills.parser_fingerprint(options)
+
+    elif kind == "votes":
+        import vote_info
+        vote_info.output_vote(stored.data, options)
+        current = vote_info.is_current(stored)
+        output_dir = os.path.dirname(vote_info.output_for_vote(stored.id, "json"))
+        fingerprint = vote_info.parser_fingerprint(options)
+
+    else:
+        return {'saved': False, 'ok': False, 'reason': "don't know how to render %s" % kind}
+
+    # The outputs are now as current as the record they were rendered from
+    # (see --stale-only).
+    if current and not options.get("diff"):
+        utils.write_parser_fingerprint(fingerprint, output_dir, options)
+
+    return {'ok': True, 'saved': True}
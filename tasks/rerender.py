@@ -0,0 +1,77 @@
+import utils
+import json
+import logging
+import os.path
+
+from congress import datetimes
+
+# Re-renders existing XML output from the JSON data beside it, without
+# fetching or parsing anything.
+#
+# --changed-legislators: re-render the outputs that were written with a
+#   legislator ID translation (see --govtrack) that has since changed in the
+#   congress-legislators repo, according to the index kept by
+#   utils.index_legislator_ids.
+
+
+def run(options):
+    if not options.get("changed_legislators"):
+        logging.error("Specify what to re-render: --changed-legislators.")
+        return None
+
+    # get the latest ID mappings
+    utils.require_congress_legislators_repo()
+
+    to_render = utils.outputs_with_changed_legislator_ids()
+    if not to_render:
+        logging.warn("No outputs use legislator IDs that have changed.")
+        return None
+
+    kinds = dict(to_render)
+    logging.warn("Going to re-render %i files." % len(kinds))
+
+    utils.process_set(sorted(kinds), rerender, utils.merge(options, {"govtrack": True}), kinds)
+
+
+def rerender(output_path, options, kinds):
+    data_path = os.path.join(os.path.dirname(output_path), "data.json")
+    if not os.path.exists(data_path):
+        return {'saved': False, 'ok': True, 'reason': "no longer has data"}
+    data = json.load(open(data_path))
+
+    kind = kinds[output_path]
+    if kind == "bill":
+        import bills
+        utils.record_legislator_ids()
+        with utils.xml_output(output_path, options) as xml:
+            bills.write_govtrack_xml(data, options, xml)
+        utils.index_legislator_ids(output_path, kind, options)
+
+    elif kind == "amendment":
+        import amendments
+        utils.record_legislator_ids()
+        with utils.xml_output(output_path, options) as xml:
+            amendments.write_govtrack_xml(data, options, xml)
+        utils.index_legislator_ids(output_path, kind, options)
+
+    elif kind == "vote":
+        import vote_info
+
+        # output_vote_xml needs the dates as they were before they were
+        # serialized (naive datetimes in Eastern time).
+        for field in ("date", "updated_at"):
+            data[field] = parse_datetime(data[field])
+
+        vote_info.output_vote_xml(data, options, vote_info.legislator_id_type(data))
+
+    else:
+        return {'saved': False, 'ok': False, 'reason': "don't know how to re-render %s output" % kind}
+
+    return {'ok': True, 'saved': True}
+
+
+def parse_datetime(value):
+    # the inverse of utils.format_datetime
+    if len(value) == 10:
+        return datetimes.parse_date(value)
+    return datetimes.parse_datetime(value[:19], "%Y-%m-%dT%H:%M:%S")
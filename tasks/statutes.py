@@ -59,12 +59,12 @@ import time
 import datetime
 from lxml import etree
 import glob
-import json
 import os.path
 import subprocess
 
 import utils
 import bill_info
+import bills
 import bill_versions
 import fdsys
 
@@ -215,7 +215,8 @@ def proc_statute_volume(path, options):
                 "references": [],  # XXX
             }]
 
-        status, status_date = bill_info.latest_status(actions)
+        action_state = bill_info.fold_actions(actions)
+        status, status_date = bill_info.latest_status(actions, None, action_state)
 
         bill_data = {
             'bill_id': bill_id,
@@ -228,10 +229,10 @@ def proc_statute_volume(path, options):
             'cosponsors': [],  # XXX
 
             'actions': actions,  # XXX
-            'history': bill_info.history_from_actions(actions),
+            'history': bill_info.history_from_actions(actions, action_state),
             'status': status,
             'status_at': status_date,
-            'enacted_as': bill_info.slip_law_from(actions),
+            'enacted_as': bill_info.slip_law_from(actions, action_state),
 
             'titles': titles,
             'official_title': bill_info.current_title_for(titles, "official"),
@@ -250,7 +251,7 @@ def proc_statute_volume(path, options):
         }
 
         if not options.get('textversions', False):
-            bill_info.output_bill(bill_data, options)
+            bills.render(bill_data, options)
 
         # XXX: Can't use bill_versions.fetch_version() because it depends on fdsys.
         version_code = "enr"
@@ -262,10 +263,11 @@ def proc_statute_volume(path, options):
             'urls': {"pdf": bill.find("mods:location/mods:url[@displayLabel='PDF rendition']", mods_ns).text},
             'sources': sources,
         }
-        utils.write(
-            json.dumps(bill_version, sort_keys=True, indent=2, default=utils.format_datetime),
-            bill_versions.output_for_bill_version(bill_version_id)
-        )
+        if utils.wants_output(options, "json"):
+            utils.write(
+                utils.json_dumps(bill_version, default=utils.format_datetime),
+                bill_versions.output_for_bill_version(bill_version_id)
+            )
 
         # Process the granule PDF.
         # - Hard-link it into the right place to be seen as bill text.
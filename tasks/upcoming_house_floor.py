@@ -7,11 +7,12 @@ import time
 from dateutil.relativedelta import relativedelta
 from dateutil.relativedelta import MO
 import lxml
-import json
 import re
 
 from bs4 import BeautifulSoup
 
+from congress import datetimes
+
 # Parsing data from the House' upcoming floor feed, at
 # http://docs.house.gov/floor/
 #
@@ -45,7 +46,7 @@ def run(options):
     house_floor = fetch_floor_week(for_the_week, options)
 
     output_file = "%s/upcoming_house_floor/%s.json" % (utils.data_dir(), for_the_week)
-    output = json.dumps(house_floor, sort_keys=True, indent=2, default=utils.format_datetime)
+    output = utils.json_dumps(house_floor, default=utils.format_datetime)
     utils.write(output, output_file)
 
     logging.warn("\nFound %i bills for the week of %s, written to %s" % (len(house_floor['upcoming']), for_the_week, output_file))
@@ -204,7 +205,6 @@ def draft_bill_id_for(bill_number, published_at, congress):
 
 def date_for(timestamp):
     if "." not in timestamp:
-        strptime_config = "%Y-%m-%dT%H:%M:%S"
+        return datetimes.parse_datetime(timestamp, "%Y-%m-%dT%H:%M:%S")
     else:
-        strptime_config = "%Y-%m-%dT%H:%M:%S.%f"
-    return datetime.strptime(timestamp, strptime_config)
+        return datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%f")
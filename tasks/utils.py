@@ -6,12 +6,13 @@ import traceback
 import zipfile
 import platform
 import re
-import htmlentitydefs
 import json
-from pytz import timezone
 import datetime
 import time
+import contextlib
+import io
 from lxml import html, etree
+import requests
 import scrapelib
 import pprint
 import logging
@@ -22,6 +23,10 @@ import email.utils
 from email.mime.text import MIMEText
 import getpass
 
+from congress import datetimes, identifiers, jsonwriter, records, recordstore, text, xmlwriter
+from congress.text import unescape
+from congress.xmlwriter import XMLWriter
+
 
 # read in an opt-in config file for changing directories and supplying email settings
 # returns None if it's not there, and this should always be handled gracefully
@@ -34,22 +39,21 @@ else:
     config = None
 
 
-eastern_time_zone = timezone('US/Eastern')
+eastern_time_zone = datetimes.eastern_time_zone
 
 # scraper should be instantiated at class-load time, so that it can rate limit appropriately
 scraper = scrapelib.Scraper(requests_per_minute=120, retry_attempts=3)
 scraper.user_agent = "unitedstates/congress (https://github.com/unitedstates/congress)"
 
 
-def format_datetime(obj):
-    if isinstance(obj, datetime.datetime):
-        return eastern_time_zone.localize(obj.replace(microsecond=0)).isoformat()
-    elif isinstance(obj, datetime.date):
-        return obj.isoformat()
-    elif isinstance(obj, (str, unicode)):
-        return obj
-    else:
-        return None
+format_datetime = datetimes.format_datetime
+
+
+def json_default(obj):
+    # records (see congress.records) serialize as the dicts they stand for
+    if isinstance(obj, records.Record):
+        return obj.to_dict()
+    return format_datetime(obj)
 
 
 def current_congress():
@@ -123,7 +127,8 @@ def get_term_congresses(term):
 # bill_type, bill_number, congress
 
 
-
+def split_bill_id(bill_id):
+    return identifiers.BillId.parse(bill_id).split()
 
 # "hjres1234-115"
 
@@ -135,7 +140,7 @@ def build_bill_id(bill_type, bill_number, congress):
 
 
 def split_bill_version_id(bill_version_id):
-    return re.match("^([a-z]+)(\d+)-(\d+)-([a-z\d]+)$", bill_version_id).groups()
+    return identifiers.BillVersionId.parse(bill_version_id).split()
 
 # "hjres1234-115-enr"
 
@@ -145,9 +150,7 @@ def build_bill_version_id(bill_type, bill_number, congress, version_code):
 
 
 def split_vote_id(vote_id):
-    # Sessions are either four-digit years for modern day votes or a digit or letter
-    # for historical votes before sessions were basically calendar years.
-    return re.match("^(h|s)(\d+)-(\d+).(\d\d\d\d|[0-9A-Z])$", vote_id).groups()
+    return identifiers.VoteId.parse(vote_id).split()
 
 # nomination_type (always PN), nomination_number, congress
 #   nomination_number is usually a number, but can be hyphenated, e.g. PN64-01-111
@@ -156,8 +159,8 @@ def split_vote_id(vote_id):
 
 def split_nomination_id(nomination_id):
     try:
-        return re.match("^([A-z]{2})([\d-]+)-(\d+)$", nomination_id).groups()
-    except Exception, e:
+        return identifiers.NominationId.parse(nomination_id).split()
+    except ValueError:
         logging.error("Unabled to parse %s" % nomination_id)
         return (None, None, None)
 
@@ -220,6 +223,15 @@ def process_set(to_fetch, fetch_func, options, *extra_args):
     logging.warning("Skipped %s." % len(skips))
     logging.warning("Saved data for %s." % len(saved))
 
+    for cache in lru_caches:
+        if cache.hits or cache.misses:
+            logging.warning(cache.stats())
+
+    if _vote_matrix_store is not None:
+        _vote_matrix_store.save()
+    if _pending_legislator_ids:
+        save_legislator_id_index()
+
     return saved + skips  # all of the OK's
 
 
@@ -393,15 +405,14 @@ def write(content, destination, options={}):
     f.write(content)
     f.close()
 
+def json_dumps(data, default=json_default):
+    # The JSON of an output file: keys sorted, indented two spaces (see
+    # congress.jsonwriter).
+    return jsonwriter.dumps(data, default)
+
+
 def write_json(data, destination):
-    return write(
-        json.dumps(data,
-            sort_keys=True,
-            indent=2,
-            default=format_datetime
-        ),
-        destination
-    )
+    return write(json_dumps(data), destination)
 
 
 def read(destination):
@@ -446,38 +457,6 @@ def xpath_regex(doc, element, pattern):
         "//%s[re:match(text(), '%s')]" % (element, pattern),
         namespaces={"re": "http://exslt.org/regular-expressions"})
 
-# taken from http://effbot.org/zone/re-sub.htm#unescape-html
-
-
-def unescape(text):
-
-    def remove_unicode_control(str):
-        remove_re = re.compile(u'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]')
-        return remove_re.sub('', str)
-
-    def fixup(m):
-        text = m.group(0)
-        if text[:2] == "&#":
-            # character reference
-            try:
-                if text[:3] == "&#x":
-                    return unichr(int(text[3:-1], 16))
-                else:
-                    return unichr(int(text[2:-1]))
-            except ValueError:
-                pass
-        else:
-            # named entity
-            try:
-                text = unichr(htmlentitydefs.name2codepoint[text[1:-1]])
-            except KeyError:
-                pass
-        return text  # leave as is
-
-    text = re.sub("&#?\w+;", fixup, text)
-    text = remove_unicode_control(text)
-    return text
-
 
 def extract_bills(text, session):
     bill_ids = []
@@ -595,6 +574,187 @@ def make_node(parent, tag, text, **attrs):
     return n
 
 
+OUTPUT_FORMATS = ("json", "xml", "sqlite")
+DEFAULT_OUTPUT_FORMATS = ("json", "xml")
+
+
+def output_formats(options):
+    """
+    The output formats selected with --outputs (e.g. --outputs=json), as a
+    frozenset. JSON and XML are written by default.
+    """
+    value = options.get("outputs")
+    if value is None or value is True:
+        return frozenset(DEFAULT_OUTPUT_FORMATS)
+    formats = frozenset(format.strip() for format in value.split(",") if format.strip())
+    unknown = formats - frozenset(OUTPUT_FORMATS)
+    if unknown:
+        raise ValueError("Unknown output format(s) in --outputs: %s (choose from %s)" % (
+            ", ".join(sorted(unknown)), ", ".join(OUTPUT_FORMATS)))
+    return formats
+
+
+def wants_output(options, format):
+    # Whether to write the given format (see output_formats). Writers check
+    # this before building anything for the format.
+    return format in output_formats(options)
+
+
+def render(renderers, data, options):
+    """
+    Write a parsed record with each of the renderers (output format =>
+    function(data, options)) that is selected with --outputs.
+    """
+    formats = output_formats(options)
+    for format in OUTPUT_FORMATS:
+        if format in formats and format in renderers:
+            renderers[format](data, options)
+
+
+def record_store():
+    # Where parsed bills, amendments and votes are saved before they're
+    # rendered (see congress.recordstore).
+    return recordstore.RecordStore(os.path.join(cache_dir(), "records"))
+
+
+_sqlite_sink = None
+
+
+def sqlite_sink():
+    # The database written with --outputs=sqlite (see congress.sqlitesink).
+    # Each record is committed as it's written.
+    global _sqlite_sink
+    if _sqlite_sink is None:
+        from congress.sqlitesink import SQLiteSink
+        mkdir_p(data_dir())
+        _sqlite_sink = SQLiteSink(os.path.join(data_dir(), "congress.sqlite3"))
+    return _sqlite_sink
+
+
+_vote_matrix_store = None
+
+
+def vote_matrix_store():
+    # The matrices of how members voted (see congress.votematrix), which
+    # votes are added to as they're saved. They're saved at the end of
+    # process_set.
+    global _vote_matrix_store
+    if _vote_matrix_store is None:
+        from congress.votematrix import VoteMatrixStore
+        _vote_matrix_store = VoteMatrixStore(data_dir())
+    return _vote_matrix_store
+
+
+SESSIONS_URL = "http://www.govtrack.us/data/us/sessions.tsv"
+
+# how long the cached sessions.tsv is used before checking for a newer one
+SESSIONS_MAX_AGE = 24 * 60 * 60
+
+_congress_sessions = None
+
+
+def congress_sessions(options={}):
+    # The sessions of Congress (see congress.sessions), from sessions.tsv
+    # as cached in the cache directory, or None if it can't be had (which
+    # isn't tried again).
+    global _congress_sessions
+    if _congress_sessions is None:
+        from congress import sessions
+        tsv = download_if_modified(SESSIONS_URL, "sessions.tsv", SESSIONS_MAX_AGE, options)
+        _congress_sessions = sessions.parse(tsv) if tsv is not None else False
+    return _congress_sessions or None
+
+
+def get_session_number(congress, session):
+    # The number of a session of a Congress (1 for the first), as the
+    # Senate numbers its roll call votes by. Sessions named by their year
+    # are numbered from the Congress's first year, without sessions.tsv.
+    if re.match(r"^\d{4}$", str(session)):
+        return int(session) - get_congress_first_year(congress) + 1
+    index = congress_sessions()
+    if index is None:
+        raise KeyError((congress, session))
+    return index.session_number(congress, session)
+
+
+def download_if_modified(url, destination, max_age, options={}):
+    """
+    Like download, for a file that changes now and then: the copy in the
+    cache directory is used until it's max_age seconds old (or with
+    --force), and then it's downloaded again only if it was modified since
+    (with an If-Modified-Since request). The cached copy is used if the
+    request fails. Returns the file's contents as unicode, or None.
+    """
+    cache_path = os.path.join(cache_dir(), destination)
+    headers = {}
+    if os.path.exists(cache_path):
+        modified = os.path.getmtime(cache_path)
+        if time.time() - modified < max_age and not options.get("force"):
+            with open(cache_path) as f:
+                return f.read().decode("utf8")
+        headers["If-Modified-Since"] = email.utils.formatdate(modified, usegmt=True)
+
+    try:
+        logging.info("Downloading: %s" % url)
+        response = scraper.urlopen(url, headers=headers, timeout=float(options.get('timeout', 30)))
+    except (scrapelib.HTTPError, requests.exceptions.RequestException) as e:
+        # including connection errors and timeouts
+        logging.error("Error downloading %s:\n\n%s" % (url, format_exception(e)))
+        response = None
+
+    if response is None or response.response.status_code == 304 or not response.strip():
+        if not os.path.exists(cache_path):
+            return None
+        if response is not None:
+            # not modified: check again in max_age seconds
+            os.utime(cache_path, None)
+        with open(cache_path) as f:
+            return f.read().decode("utf8")
+
+    write(response.encode("utf8"), cache_path)
+    return unicode(response)
+
+
+def xml_attrs(**attrs):
+    """
+    The attributes make_node would set, as (name, value) pairs in the same
+    order, for an XMLWriter (see congress.xmlwriter).
+    """
+    pairs = []
+    for k, v in attrs.items():
+        if v is None:
+            continue
+        if isinstance(v, datetime.datetime):
+            v = format_datetime(v)
+        pairs.append((k.replace("___", ""), v))
+    return pairs
+
+
+@contextlib.contextmanager
+def xml_output(destination, options={}, encoding=None):
+    """
+    Stream an XML document to a file with an XMLWriter (see
+    congress.xmlwriter). The file is replaced only once the whole document
+    has been written. With --diff the document is compared with the file on
+    disk, as in write().
+    """
+    if options.get("diff"):
+        f = io.BytesIO()
+        yield XMLWriter(f, encoding)
+        write(f.getvalue(), destination, options)
+        return
+
+    mkdir_p(os.path.dirname(destination))
+    f = open(destination + ".new", "wb")
+    try:
+        with f:
+            yield XMLWriter(f, encoding)
+    except:
+        os.unlink(destination + ".new")
+        raise
+    os.rename(destination + ".new", destination)
+
+
 # Return a subset of a mapping type
 
 
@@ -638,6 +798,75 @@ def get_file_hash(filename):
     import hashlib
     return hashlib.sha1(open(filename).read()).hexdigest()
 
+# Parser fingerprints. Each output directory gets a sidecar file recording a
+# fingerprint of the code and options that wrote each format of its files, so
+# that after a parser fix --stale-only can regenerate just the outputs it
+# affects.
+
+PARSER_FINGERPRINT_FILENAME = "data-parser-fingerprint.txt"
+
+# options that change what the parsers write (the output formats selected
+# with --outputs are stamped separately, see write_parser_fingerprint)
+PARSER_FINGERPRINT_OPTIONS = ("govtrack",)
+
+parser_fingerprints = {}
+
+
+def shared_parser_modules():
+    # The modules that every parser and renderer uses, which are
+    # fingerprinted along with the modules each one gives.
+    return (sys.modules[__name__], datetimes, identifiers, jsonwriter, records, text, xmlwriter)
+
+
+def parser_fingerprint(modules, options, data=()):
+    # A hash of the source code of the modules (and of the shared modules
+    # above), the values of the options above and any other strings the
+    # parser's results depend on (data). It's computed once per run.
+    modules = tuple(modules) + shared_parser_modules()
+    key = (tuple(module.__name__ for module in modules),
+           tuple(repr(options.get(option)) for option in PARSER_FINGERPRINT_OPTIONS),
+           tuple(data))
+    if key not in parser_fingerprints:
+        import hashlib
+        h = hashlib.sha1()
+        for module in modules:
+            filename = module.__file__
+            if filename.endswith(".pyc"):
+                filename = filename[:-1]
+            h.update(open(filename).read())
+        h.update(repr(key[1:]))
+        parser_fingerprints[key] = h.hexdigest()
+    return parser_fingerprints[key]
+
+
+def read_parser_fingerprints(output_dir):
+    # The fingerprint each output format in the directory was written with,
+    # as lines of "<format> <fingerprint>".
+    fingerprints = {}
+    for line in (read(os.path.join(output_dir, PARSER_FINGERPRINT_FILENAME)) or "").splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            fingerprints[parts[0]] = parts[1]
+    return fingerprints
+
+
+def write_parser_fingerprint(fingerprint, output_dir, options={}):
+    # Stamp the formats selected with --outputs, keeping the stamps of the
+    # others, which weren't written.
+    fingerprints = read_parser_fingerprints(output_dir)
+    for format in output_formats(options):
+        fingerprints[format] = fingerprint
+    write("".join("%s %s\n" % item for item in sorted(fingerprints.items())),
+          os.path.join(output_dir, PARSER_FINGERPRINT_FILENAME))
+
+
+def is_stale(fingerprint, output_dir, options={}):
+    # True if any of the formats selected with --outputs was written in the
+    # directory by different code or options, or by a version that didn't
+    # record a fingerprint for it.
+    fingerprints = read_parser_fingerprints(output_dir)
+    return any(fingerprints.get(format) != fingerprint for format in output_formats(options))
+
 # Get the location of the cached version of a file.
 
 
@@ -656,6 +885,86 @@ def check_cached_file(filename, cache_filename):
 class CacheError(LookupError):
     pass
 
+# A bounded in-memory memo that evicts the least recently used entry once it
+# is full. Every instance is registered in lru_caches so that process_set can
+# report hit rates at the end of a run.
+
+lru_caches = []
+
+
+class LRUCache(object):
+
+    # Entries are kept in a circular doubly linked list, from least to most
+    # recently used, of [prev, next, key, value] lists, which makes a hit much
+    # cheaper than moving an entry to the end of an OrderedDict. That matters
+    # because some of these caches stand in for only a few microseconds of work.
+
+    def __init__(self, name, maxsize=10000):
+        self.name = name
+        self.maxsize = maxsize
+        self.data = {}  # key => link
+        self.root = []
+        self.root[:] = [self.root, self.root, None, None]
+        self.hits = 0
+        self.misses = 0
+        lru_caches.append(self)
+
+    def get(self, key, default=None):
+        link = self.data.get(key)
+        if link is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.move_to_end(link)
+        return link[3]
+
+    def set(self, key, value):
+        link = self.data.get(key)
+        if link is not None:
+            link[3] = value
+            self.move_to_end(link)
+            return
+
+        root = self.root
+        last = root[0]
+        link = [last, root, key, value]
+        last[1] = root[0] = self.data[key] = link
+
+        if len(self.data) > self.maxsize:
+            # drop the least recently used
+            oldest = root[1]
+            root[1] = oldest[1]
+            oldest[1][0] = root
+            del self.data[oldest[2]]
+
+    def move_to_end(self, link):
+        # make it the most recently used
+        link_prev, link_next = link[0], link[1]
+        link_prev[1] = link_next
+        link_next[0] = link_prev
+        root = self.root
+        last = root[0]
+        last[1] = root[0] = link
+        link[0] = last
+        link[1] = root
+
+    def clear(self):
+        self.data.clear()
+        self.root[:] = [self.root, self.root, None, None]
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+    def stats(self):
+        return "%s cache: %d hits, %d misses (%.1f%% hit rate), %d entries." % (
+            self.name, self.hits, self.misses, 100 * self.hit_rate(), len(self.data))
+
 # Load a cached file.
 
 
@@ -686,7 +995,14 @@ def cache_write(file_data, filename, file_hash):
 
 
 def yaml_load(filename):
-    file_hash = get_file_hash(filename)
+    # Files in the congress-legislators repo are identified by its HEAD, which
+    # is quicker than hashing them.
+    file_hash = None
+    if filename.startswith("congress-legislators/"):
+        require_congress_legislators_repo()
+        file_hash = congress_legislators_commit
+    if file_hash is None:
+        file_hash = get_file_hash(filename)
     cache_filename = get_cache_filename(filename)
 
     # Try to load a cached version of the requested YAML file.
@@ -709,75 +1025,185 @@ def yaml_load(filename):
 
 
 # Make sure we have the congress-legislators repository available.
+#
+# It's cloned into the congress-legislators directory from GitHub, or from the
+# source given under congress_legislators in config.yml, which can be the path
+# to a local mirror. After that it's updated at most once every ttl seconds
+# (also set in config.yml, default one hour), or never if the environment has
+# UPDATE_CONGRESS_LEGISLATORS=NO. Concurrent runs take turns through a lock
+# file in the cache directory, and the HEAD of each update is recorded next to
+# it, whose modification time is when the repo was last updated.
 has_congress_legislators_repo = False
 
+# the commit checked out, once we have it (None if it isn't a git repository)
+congress_legislators_commit = None
+
+CONGRESS_LEGISLATORS_SOURCE = "https://github.com/unitedstates/congress-legislators"
+CONGRESS_LEGISLATORS_TTL = 60 * 60
+
+
+def congress_legislators_config(key, default):
+    if config and config.get('congress_legislators'):
+        value = config['congress_legislators'].get(key)
+        if value is not None:
+            return value
+    return default
+
+
 def require_congress_legislators_repo():
-    global has_congress_legislators_repo
+    global has_congress_legislators_repo, congress_legislators_commit
 
     # Once we have the congress-legislators repo, we don't need to keep getting it.
     if has_congress_legislators_repo:
         return
 
-    # Clone the congress-legislators repo if we don't have it.
-    if not os.path.exists("congress-legislators"):
-        logging.warn("Cloning the congress-legislators repo...")
-        os.system("git clone -q --depth 1 https://github.com/unitedstates/congress-legislators congress-legislators")
+    import fcntl
+    source = congress_legislators_config("source", None)
+    ttl = congress_legislators_config("ttl", CONGRESS_LEGISLATORS_TTL)
+    head_file = os.path.join(cache_dir(), "congress-legislators-HEAD")
+
+    mkdir_p(cache_dir())
+    with open(os.path.join(cache_dir(), "congress-legislators.lock"), "w") as lock:
+        # wait for any other run that is updating it (released when closed)
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        # Clone the congress-legislators repo if we don't have it.
+        if not os.path.exists("congress-legislators"):
+            logging.warn("Cloning the congress-legislators repo...")
+            updated = subprocess.call(["git", "clone", "-q", "--depth", "1", source or CONGRESS_LEGISLATORS_SOURCE, "congress-legislators"]) == 0
 
-    if os.environ.get("UPDATE_CONGRESS_LEGISLATORS") != "NO":
-        # Update the repo so we have the latest.
-        logging.warn("Updating the congress-legislators repo...")
-        # these two == git pull, but git pull ignores -q on the merge part so is less quiet
-        os.system("cd congress-legislators; git fetch -pq; git merge --ff-only -q origin/master")
+        elif os.environ.get("UPDATE_CONGRESS_LEGISLATORS") == "NO":
+            updated = False
+
+        elif os.path.exists(head_file) and time.time() - os.stat(head_file).st_mtime < ttl:
+            logging.info("The congress-legislators repo was updated recently.")
+            updated = False
+
+        else:
+            # Update the repo so we have the latest.
+            logging.warn("Updating the congress-legislators repo...")
+            if source:
+                subprocess.call(["git", "remote", "set-url", "origin", source], cwd="congress-legislators")
+            # these two == git pull, but git pull ignores -q on the merge part so is less quiet
+            updated = subprocess.call(["git", "fetch", "-pq"], cwd="congress-legislators") == 0 \
+                and subprocess.call(["git", "merge", "--ff-only", "-q", "origin/master"], cwd="congress-legislators") == 0
+
+        congress_legislators_commit = git_head("congress-legislators")
+        if updated:
+            write(congress_legislators_commit, head_file)
 
     # We now have the congress-legislators repo.
     has_congress_legislators_repo = True
 
-lookup_legislator_cache = []
 
+def git_head(path):
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=path, stderr=open(os.devnull, "w")).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
 
-def lookup_legislator(congress, role_type, name, state, party, when, id_requested, exclude=set()):
-    # This is a basic lookup function given the legislator's name, state, party,
-    # and the date of the vote.
 
+# Legislators' terms indexed by Congress and then by (role type, state), in file
+# order. Each entry is a (moc, term, names) tuple where names holds the moc's
+# name records (see legislator_names), which are shared by all of the moc's terms.
+lookup_legislator_cache = {}
+
+# People who we know changed party; lookup_legislator doesn't check their party.
+PARTY_SWITCHERS = ("Laughlin", "Crenshaw", "Goode", "Martinez", "Parker", "Emerson", "Tauzin", "Hayes", "Deal", "Forbes")
+
+
+def name_to_ascii(name):
+    # Fold a name for comparison: hyphens become spaces and accents are dropped.
+    name = name.replace("-", " ")
+    if not isinstance(name, unicode):
+        return name
+    import unicodedata
+    return u"".join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c))
+
+
+def legislator_names(moc):
+    # The names a moc can be matched on, precomputed for lookup_legislator: a list
+    # of (start, end, last name, last name parts, first names) for their current
+    # name and then their other_names. start and end are None if the name isn't
+    # limited to a date range.
+    names = []
+    for name_info_rec in [moc['name']] + moc.get('other_names', []):
+        # an other_name overrides the current name's information
+        name_info = dict(moc['name'])  # clone
+        name_info.update(name_info_rec)
+
+        last = name_to_ascii(name_info['last'])
+        first = name_to_ascii(name_info.get('first', ""))
+
+        # Allow the first name to match the first name, the nickname, or an
+        # initialized version of the first name (i.e. "E." matches "Eddie").
+        if first:
+            first_names = (first, name_to_ascii(name_info.get('nickname', "")), first[0] + ".")
+        else:
+            first_names = None  # only fails if it's needed, see lookup_legislator
+
+        names.append((name_info_rec.get('start'), name_info_rec.get('end'), last, last.split(" "), first_names))
+    return names
+
+
+def load_legislator_terms():
     # On the first load, cache all of the legislators' terms in memory.
-    # Group by Congress so we can limit our search later to be faster.
+    # Group by Congress, role type and state so we can limit our search later
+    # to be faster.
     global lookup_legislator_cache
     if not lookup_legislator_cache:
         require_congress_legislators_repo()
-        lookup_legislator_cache = {}  # from Congress number to list of (moc,term) tuples that might be in that Congress
+        lookup_legislator_cache = {}
         for filename in ("legislators-historical", "legislators-current"):
             for moc in yaml_load("congress-legislators/%s.yaml" % (filename)):
+                names = legislator_names(moc)
                 for term in moc["terms"]:
                     for c in xrange(congress_from_legislative_year(int(term['start'][0:4])) - 1,
                                     congress_from_legislative_year(int(term['end'][0:4])) + 1 + 1):
-                        lookup_legislator_cache.setdefault(c, []).append((moc, term))
+                        lookup_legislator_cache.setdefault(c, {}).setdefault((term['type'], term['state']), []).append((moc, term, names))
+    return lookup_legislator_cache
 
-    def to_ascii(name):
-        name = name.replace("-", " ")
-        if not isinstance(name, unicode):
-            return name
-        import unicodedata
-        return u"".join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c))
 
-    # Scan all of the terms that cover 'when' for a match.
+def lookup_legislator(congress, role_type, name, state, party, when, id_requested, exclude=set(), memo=None):
+    # This is a basic lookup function given the legislator's name, state, party,
+    # and the date of the vote. If a LegislatorLookupMemo is given, it's
+    # consulted first.
     if isinstance(when, datetime.datetime):
         when = when.date()
     when = when.isoformat()
-    name_parts = to_ascii(name).split(", ", 1)
+
+    if memo is not None:
+        matches = memo.matches(congress, role_type, name, state, party, when, id_requested)
+        matches = [id for id in matches if id not in exclude]
+    else:
+        matches = legislator_matches(congress, role_type, name, state, party, when, id_requested, exclude)
+
+    # Return if there is a unique match.
+    if len(matches) == 0:
+        logging.warn("Could not match name %s (%s-%s; %s) to any legislator." % (name, state, party, when))
+        return None
+    if len(matches) > 1:
+        logging.warn("Multiple matches of name %s (%s-%s; %s) to legislators (%s; excludes %s)." % (name, state, party, when, str(matches), str(exclude)))
+        return None
+    return list(matches)[0]
+
+
+def legislator_matches(congress, role_type, name, state, party, when, id_requested, exclude=set()):
+    # Scan all of the terms that cover 'when' (an ISO-formatted date) for a
+    # match. Returns a dict from the IDs of the matching legislators to the
+    # terms that matched.
+    terms = load_legislator_terms()[congress].get((role_type, state), [])
+    name_parts = name_to_ascii(name).split(", ", 1)
     matches = { }
-    for moc, term in lookup_legislator_cache[congress]:
+    for moc, term, names in terms:
         # Make sure the date is surrounded by the term start/end dates.
         if term['start'] > when:
             continue  # comparing ISO-formatted date strings
         if term['end'] < when:
             continue  # comparing ISO-formatted date strings
 
-        # Compare the role type, state, and party, except for people who we know changed party.
-        if term['type'] != role_type:
-            continue
-        if term['state'] != state:
-            continue
-        if term['party'][0] != party and name not in ("Laughlin", "Crenshaw", "Goode", "Martinez", "Parker", "Emerson", "Tauzin", "Hayes", "Deal", "Forbes"):
+        # Compare the party, except for people who we know changed party.
+        if term['party'][0] != party and name not in PARTY_SWITCHERS:
             continue
 
         # When doing process-of-elimination matching, don't match on people we've already seen.
@@ -786,31 +1212,26 @@ def lookup_legislator(congress, role_type, name, state, party, when, id_requeste
 
         # Compare the last name. Allow "Chenoweth" to match "Chenoweth Hage", but also
         # allow "Millender McDonald" to match itself.
-        for name_info_rec in [moc['name']] + moc.get('other_names', []):
+        for start, end, last, last_parts, first_names in names:
             # for other_names, check that the record covers the right date range
-            if 'start' in name_info_rec and name_info_rec['start'] > when:
+            if start is not None and start > when:
                 continue  # comparing ISO-formatted date strings
-            if 'end' in name_info_rec and name_info_rec['end'] < when:
+            if end is not None and end < when:
                 continue  # comparing ISO-formatted date strings
 
-            # in order to process an other_name we have to go like this...
-            name_info = dict(moc['name'])  # clone
-            name_info.update(name_info_rec)  # override with the other_name information
-
             # check last name
-            if name_parts[0] != to_ascii(name_info['last']) \
-                    and name_parts[0] not in to_ascii(name_info['last']).split(" "):
-                  continue  # no match
-
-            # Compare the first name. Allow it to match either the first or middle name,
-            # and an initialized version of the first name (i.e. "E." matches "Eddie").
-            # Test the whole string (so that "Jo Ann" is compared to "Jo Ann") but also
-            # the first part of a string split (so "E. B." is compared as "E." to "Eddie").
-            first_names = (to_ascii(name_info['first']), to_ascii(name_info.get('nickname', "")), to_ascii(name_info['first'])[0] + ".")
+            if name_parts[0] != last and name_parts[0] not in last_parts:
+                continue  # no match
+
+            # Compare the first name. Test the whole string (so that "Jo Ann" is
+            # compared to "Jo Ann") but also the first part of a string split (so
+            # "E. B." is compared as "E." to "Eddie").
+            if first_names is None:
+                raise IndexError("%s has no first name" % moc["id"])
             if len(name_parts) >= 2 and \
                     name_parts[1] not in first_names and \
                     name_parts[1].split(" ")[0] not in first_names:
-                  continue
+                continue
 
             break  # match
         else:
@@ -821,42 +1242,316 @@ def lookup_legislator(congress, role_type, name, state, party, when, id_requeste
         # on Jan 3's, don't key on the term uniquely, only on the moc.
         matches[moc['id'][id_requested]] = term
 
-    # Return if there is a unique match.
-    if len(matches) == 0:
-        logging.warn("Could not match name %s (%s-%s; %s) to any legislator." % (name, state, party, when))
-        return None
-    if len(matches) > 1:
-        logging.warn("Multiple matches of name %s (%s-%s; %s) to legislators (%s; excludes %s)." % (name, state, party, when, str(matches), str(exclude)))
-        return None
-    return list(matches)[0]
+    return matches
 
 
+def legislators_fingerprint():
+    # The congress-legislators HEAD, or else a hash of the files that
+    # lookup_legislator reads, computed once per run.
+    global _legislators_fingerprint
+    if _legislators_fingerprint is None:
+        require_congress_legislators_repo()
+        _legislators_fingerprint = congress_legislators_commit
+    if _legislators_fingerprint is None:
+        import hashlib
+        h = hashlib.sha1()
+        for filename in ("legislators-historical", "legislators-current"):
+            h.update(get_file_hash("congress-legislators/%s.yaml" % (filename)))
+        _legislators_fingerprint = h.hexdigest()
+    return _legislators_fingerprint
+
+_legislators_fingerprint = None
+
+
+class LegislatorLookupMemo(object):
+    # Remembers the legislators that names resolved to, so that the roll calls
+    # of a session, which list mostly the same people, each look up a name
+    # once. It's saved to a JSON file along with a fingerprint of the
+    # congress-legislators files, and is discarded when they change.
+    #
+    # A remembered result is reused for any date in the same period, where
+    # periods are separated by the dates that terms and other_names start and
+    # end for the chamber and state. Most of a session falls in one period.
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.periods = None  # (congress, role_type, state) => (sorted start dates, sorted end dates)
+        self.results = None  # (congress, role_type, state, period, name, party, id_requested) => matching IDs
+        self.changed = False
+
+    def load(self):
+        # The file is read on first use, since most votes don't need lookups.
+        self.periods = {}
+        self.results = {}
+        if os.path.exists(self.filename):
+            data = json.load(open(self.filename))
+            if data["legislators"] == legislators_fingerprint():
+                for key, value in data["periods"]:
+                    self.periods[tuple(key)] = value
+                for key, value in data["results"]:
+                    self.results[tuple(key[:3]) + (tuple(key[3]),) + tuple(key[4:])] = value
+
+    def period(self, congress, role_type, state, when):
+        import bisect
+        if self.periods is None:
+            self.load()
+        key = (congress, role_type, state)
+        if key not in self.periods:
+            starts, ends = set(), set()
+            for moc, term, names in load_legislator_terms()[congress].get((role_type, state), []):
+                starts.add(term['start'])
+                ends.add(term['end'])
+                for start, end, last, last_parts, first_names in names:
+                    if start is not None:
+                        starts.add(start)
+                    if end is not None:
+                        ends.add(end)
+            self.periods[key] = [sorted(starts), sorted(ends)]
+            self.changed = True
+
+        # which starts have passed and which ends have passed
+        starts, ends = self.periods[key]
+        return (bisect.bisect_right(starts, when), bisect.bisect_left(ends, when))
+
+    def matches(self, congress, role_type, name, state, party, when, id_requested):
+        key = (congress, role_type, state, self.period(congress, role_type, state, when), name, party, id_requested)
+        if key not in self.results:
+            self.results[key] = sorted(legislator_matches(congress, role_type, name, state, party, when, id_requested))
+            self.changed = True
+        return self.results[key]
+
+    def save(self):
+        if not self.changed:
+            return
+        write(json.dumps({
+            "legislators": legislators_fingerprint(),
+            "periods": sorted(self.periods.items()),
+            "results": sorted(self.results.items()),
+        }), self.filename)
+        self.changed = False
+
 
 class UnmatchedIdentifer(Exception):
 
     def __init__(self, id_type, id_value, desired_id_type):
         super(UnmatchedIdentifer, self).__init__("%s=%s => %s" % (id_type, str(id_value), desired_id_type))
 
-_translate_legislator_id_cache = None
+# All of the IDs of every legislator, keyed by each of their IDs, in an SQLite
+# database in the cache directory. It's built from the congress-legislators
+# files when they change (see legislators_fingerprint), so each process only
+# has to open it rather than load the YAML. The ids column holds the
+# legislator's "id" mapping as JSON. The id column has no type so that
+# integer IDs (govtrack, icpsr) don't match strings.
+
+_legislator_ids_db = None
+
+
+def legislator_ids_db():
+    global _legislator_ids_db
+    if _legislator_ids_db is None:
+        import fcntl
+        filename = os.path.join(cache_dir(), "legislator-ids.sqlite3")
+        fingerprint = legislators_fingerprint()
+        db = current_legislator_ids_db(filename, fingerprint)
+        if db is None:
+            mkdir_p(cache_dir())
+            with open(os.path.join(cache_dir(), "congress-legislators.lock"), "w") as lock:
+                # processes that start together all find it out of date: one
+                # builds it while the others wait, and then they open it
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                db = current_legislator_ids_db(filename, fingerprint)
+                if db is None:
+                    logging.warn("Indexing legislator IDs...")
+                    mocs = []
+                    for f in ("legislators-historical", "legislators-current"):
+                        mocs.extend(yaml_load("congress-legislators/%s.yaml" % (f)))
+                    # build it beside the old one and swap it in, so that
+                    # processes that have the old one open aren't disturbed
+                    new_filename = "%s.%d.new" % (filename, os.getpid())
+                    build_legislator_ids_db(new_filename, mocs, fingerprint)
+                    os.rename(new_filename, filename)
+                    db = open_legislator_ids_db(filename)
+        _legislator_ids_db = db
+    return _legislator_ids_db
+
+
+def open_legislator_ids_db(filename):
+    # Opened read-only: the database is only ever replaced, not changed.
+    import sqlite3
+    db = sqlite3.connect(filename)
+    db.execute("PRAGMA query_only = ON")
+    return db
+
+
+def current_legislator_ids_db(filename, fingerprint):
+    # The database, if it was built from the current congress-legislators
+    # files, or None.
+    import sqlite3
+    if not os.path.exists(filename):
+        return None
+    db = open_legislator_ids_db(filename)
+    try:
+        if db.execute("SELECT value FROM info WHERE key = 'legislators'").fetchone() == (fingerprint,):
+            return db
+    except sqlite3.DatabaseError:
+        pass
+    db.close()
+    return None
+
+
+def build_legislator_ids_db(filename, mocs, fingerprint):
+    import sqlite3
+    mkdir_p(os.path.dirname(filename))
+    if os.path.exists(filename):
+        os.unlink(filename)
+    db = sqlite3.connect(filename)
+    with db:
+        db.execute("CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT)")
+        db.execute("CREATE TABLE legislator_ids (id_type TEXT, id, ids TEXT, PRIMARY KEY (id_type, id))")
+        rows = {}
+        for moc in mocs:
+            ids = json.dumps(moc["id"], sort_keys=True)
+            for id_type, id_value in moc["id"].items():
+                # 'fec' is a list of IDs
+                for v in (id_value if isinstance(id_value, list) else [id_value]):
+                    rows[(id_type, v)] = ids  # later legislators win, as they did in a dict
+        db.executemany("INSERT INTO legislator_ids VALUES (?, ?, ?)", [k + (v,) for k, v in rows.items()])
+        db.execute("INSERT INTO info VALUES ('legislators', ?)", (fingerprint,))
+    db.close()
+
+
+def legislator_ids(id_type, id_value):
+    # Returns all of the IDs of the legislator with the given ID, as in
+    # congress-legislators, or None.
+    row = legislator_ids_db().execute("SELECT ids FROM legislator_ids WHERE id_type = ? AND id = ?", (id_type, id_value)).fetchone()
+    if row is None:
+        return None
+    return json.loads(row[0])
+
 
 def translate_legislator_id(source_id_type, source_id, dest_id_type):
-    global _translate_legislator_id_cache
-    # On the first load, cache all of the legislators' ids in memory.
-    if not _translate_legislator_id_cache:
-        require_congress_legislators_repo()
-        _translate_legislator_id_cache = { }
-        for filename in ("legislators-historical", "legislators-current"):
-            for moc in yaml_load("congress-legislators/%s.yaml" % (filename)):
-                for id_type, id_value in moc["id"].items():
-                    try:
-                        _translate_legislator_id_cache[(id_type, id_value)] = moc['id']
-                    except TypeError:
-                        # The 'fec' id is a list which is not hashable
-                        # and so cannot go in the key of a cached entry.
-                        pass
-
-    # Get from mapping.
     try:
-        return _translate_legislator_id_cache[(source_id_type, source_id)][dest_id_type]
-    except KeyError:
+        dest_id = legislator_ids(source_id_type, source_id)[dest_id_type]
+    except (TypeError, KeyError):
+        dest_id = None
+    if legislator_id_references is not None:
+        legislator_id_references.add((source_id_type, source_id, dest_id_type, dest_id))
+    if dest_id is None:
         raise UnmatchedIdentifer(source_id_type, source_id, dest_id_type)
+    return dest_id
+
+
+def get_person_id(source_id_type, source_id, dest_id_type):
+    # Like translate_legislator_id, but raises a KeyError if there's no match.
+    ids = legislator_ids(source_id_type, source_id)
+    if ids is None or dest_id_type not in ids:
+        raise KeyError("%s=%s => %s" % (source_id_type, str(source_id), dest_id_type))
+    return ids[dest_id_type]
+
+
+# A reverse index from output files to the legislator IDs that were translated
+# while rendering them (i.e. with --govtrack), kept in an SQLite database in the
+# cache directory. When the congress-legislators ID mappings change, the
+# rerender task uses it to find the outputs that need to be rendered again.
+#
+# Writers call record_legislator_ids before rendering a file and
+# index_legislator_ids after writing it. The entries are saved together at the
+# end of process_set (see save_legislator_id_index).
+
+legislator_id_references = None
+_legislator_id_index = None
+
+# output path => (kind, references), or None to remove the file's entries
+_pending_legislator_ids = {}
+
+
+def legislator_id_index_filename():
+    return os.path.join(cache_dir(), "legislator-id-index.sqlite3")
+
+
+def legislator_id_index(filename=None):
+    # Opens the index on first use, or another database file if one is given.
+    global _legislator_id_index
+    if _legislator_id_index is None or filename:
+        import sqlite3
+        if not filename:
+            mkdir_p(cache_dir())
+            filename = legislator_id_index_filename()
+        # other processes (e.g. ./run render --workers) may be saving too
+        _legislator_id_index = sqlite3.connect(filename, timeout=60)
+        _legislator_id_index.execute("PRAGMA journal_mode = WAL")
+        with _legislator_id_index:
+            _legislator_id_index.execute("CREATE TABLE IF NOT EXISTS legislator_ids (output_path TEXT, kind TEXT, id_type TEXT, id TEXT, dest_id_type TEXT, dest_id TEXT)")
+            _legislator_id_index.execute("CREATE INDEX IF NOT EXISTS legislator_ids_output_path ON legislator_ids (output_path)")
+            _legislator_id_index.execute("CREATE INDEX IF NOT EXISTS legislator_ids_id ON legislator_ids (id_type, id)")
+    return _legislator_id_index
+
+
+def record_legislator_ids():
+    # Start collecting the IDs passed to translate_legislator_id.
+    global legislator_id_references
+    legislator_id_references = set()
+
+
+def index_legislator_ids(output_path, kind, options={}):
+    # Replace what the index has for the output file with the IDs collected
+    # since record_legislator_ids (once the index is saved), and stop
+    # collecting. kind says how to re-render the file: "bill", "amendment" or
+    # "vote". Without --govtrack no IDs are translated, and the file's entries,
+    # if it had any, are removed.
+    global legislator_id_references
+    references = legislator_id_references or set()
+    legislator_id_references = None
+    if options.get("diff"):
+        return
+    _pending_legislator_ids[output_path] = (kind, references) if options.get("govtrack") else None
+
+
+def save_legislator_id_index():
+    # Save the entries given to index_legislator_ids, in one transaction.
+    def text(value):
+        return unicode(value) if value is not None else None
+
+    pending = dict(_pending_legislator_ids)
+    _pending_legislator_ids.clear()
+    if _legislator_id_index is None and not os.path.exists(legislator_id_index_filename()) \
+            and not any(pending.values()):
+        return  # nothing to remove or add
+
+    rows = []
+    for output_path, entry in sorted(pending.items()):
+        if entry is not None:
+            kind, references = entry
+            rows.extend((output_path, kind, text(id_type), text(id_value), text(dest_id_type), text(dest_id))
+                        for id_type, id_value, dest_id_type, dest_id in references)
+
+    db = legislator_id_index()
+    with db:
+        db.executemany("DELETE FROM legislator_ids WHERE output_path = ?", [(path,) for path in sorted(pending)])
+        db.executemany("INSERT INTO legislator_ids VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+def outputs_with_changed_legislator_ids():
+    # Returns a sorted list of (output_path, kind) for the output files that were
+    # rendered with an ID translation that is different now.
+    db = legislator_id_index()
+    changed = []
+    for id_type, id_value, dest_id_type, dest_id in db.execute("SELECT DISTINCT id_type, id, dest_id_type, dest_id FROM legislator_ids"):
+        try:
+            current = unicode(translate_legislator_id(id_type, id_value, dest_id_type))
+        except UnmatchedIdentifer:
+            # IDs read back from the index are strings, but some source IDs are integers.
+            try:
+                current = unicode(translate_legislator_id(id_type, int(id_value), dest_id_type))
+            except (ValueError, UnmatchedIdentifer):
+                current = None
+        if current != dest_id:
+            logging.info("%s %s was %s %s and is now %s." % (id_type, id_value, dest_id_type, dest_id, current))
+            changed.append((id_type, id_value, dest_id_type, dest_id))
+
+    outputs = set()
+    for id_type, id_value, dest_id_type, dest_id in changed:
+        outputs.update(db.execute(
+            "SELECT output_path, kind FROM legislator_ids WHERE id_type = ? AND id = ? AND dest_id_type = ? AND dest_id IS ?",
+            (id_type, id_value, dest_id_type, dest_id)))
+    return sorted(outputs)
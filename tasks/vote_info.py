@@ -1,14 +1,39 @@
 import utils
 import logging
 import re
-import json
 from lxml import etree
 import time
 import datetime
 import os
 import os.path
+import sys
 
 from govtrack import govtrack_type_codes
+from congress import identifiers, records, recordstore, rules
+
+
+def parser_fingerprint(options):
+    # The code that writes vote data (see --stale-only).
+    return utils.parser_fingerprint((rules, sys.modules[__name__]), options)
+
+
+def record_fingerprint(legislators=False):
+    # The code that parses vote records (see congress.recordstore), and for a
+    # vote whose voters' IDs were looked up by name, the congress-legislators
+    # data they were looked up in. Most votes give their voters' IDs, so
+    # reusing their records doesn't need congress-legislators at all.
+    data = (utils.legislators_fingerprint(),) if legislators else ()
+    return utils.parser_fingerprint((rules, sys.modules[__name__]), {}, data)
+
+
+def is_current(stored):
+    # Whether a stored vote record was parsed by this code (and from the
+    # current congress-legislators data, if it was used).
+    return stored.fingerprint == record_fingerprint((stored.state or {}).get("legislators", False))
+
+
+def is_stale(vote_id, options):
+    return utils.is_stale(parser_fingerprint(options), os.path.dirname(output_for_vote(vote_id, "json")), options)
 
 
 def fetch_vote(vote_id, options):
@@ -19,7 +44,7 @@ def fetch_vote(vote_id, options):
     if vote_chamber == "h":
         url = "http://clerk.house.gov/evs/%s/roll%03d.xml" % (vote_session_year, int(vote_number))
     else:
-        session_num = int(vote_session_year) - utils.get_congress_first_year(int(vote_congress)) + 1
+        session_num = utils.get_session_number(int(vote_congress), vote_session_year)
         url = "http://www.senate.gov/legislative/LIS/roll_call_votes/vote%d%d/vote_%d_%d_%05d.xml" % (int(vote_congress), session_num, int(vote_congress), session_num, int(vote_number))
 
     # fetch vote XML page
@@ -41,8 +66,39 @@ def fetch_vote(vote_id, options):
         for f in (output_for_vote(vote_id, "json"), output_for_vote(vote_id, "xml")):
             if os.path.exists(f):
                 os.unlink(f)
+        utils.record_store().delete(identifiers.VoteId.parse(vote_id))
+        utils.vote_matrix_store().remove(vote_id)
         return {'saved': False, 'ok': True, 'reason': "vote was vacated"}
 
+    # Render the vote saved in the record store if it was parsed from the
+    # same file by the same code, otherwise parse it and save it there.
+    source_hash = recordstore.source_hash(body)
+    stored = None
+    if not options.get("force"):
+        stored = utils.record_store().get(identifiers.VoteId.parse(vote_id), source_hash)
+    if stored is not None and is_current(stored):
+        logging.info("[%s] Unchanged since it was parsed, rendering the stored record." % vote_id)
+        vote = stored.data
+    else:
+        vote = parse_vote(vote_id, body, url)
+        legislators = vote_id in legislator_lookups
+        utils.record_store().put(identifiers.VoteId.parse(vote_id), vote, source_hash,
+                                 record_fingerprint(legislators), {"legislators": legislators})
+
+    # output and return
+
+    output_vote(vote, options)
+    if not options.get("diff"):
+        utils.write_parser_fingerprint(parser_fingerprint(options), os.path.dirname(output_for_vote(vote_id, "json")), options)
+        utils.vote_matrix_store().update(vote)
+
+    return {'ok': True, 'saved': True}
+
+
+def parse_vote(vote_id, body, url):
+    """Parse a vote's House or Senate XML into the vote's record."""
+    vote_chamber, vote_number, vote_congress, vote_session_year = utils.split_vote_id(vote_id)
+
     dom = etree.fromstring(body)
 
     vote = {
@@ -57,28 +113,80 @@ def fetch_vote(vote_id, options):
 
     # do the heavy lifting
 
+    legislator_lookups.discard(vote_id)
     if vote_chamber == "h":
         parse_house_vote(dom, vote)
     elif vote_chamber == "s":
         parse_senate_vote(dom, vote)
 
-    # output and return
+    # remember how voters' names were resolved for the next vote in the session
+    voter_memo(vote).save()
 
-    output_vote(vote, options)
+    return vote
 
-    return {'ok': True, 'saved': True}
+
+# Name lookups for the votes of a session, by (congress, chamber, session).
+voter_memos = {}
+
+# The IDs of the votes parsed whose voters were looked up by name.
+legislator_lookups = set()
 
 
-def output_vote(vote, options, id_type=None):
+def voter_memo(vote):
+    # The memo of voters' names resolved by utils.lookup_legislator for the
+    # vote's session, kept in the cache directory between runs.
+    key = (vote["congress"], vote["chamber"], vote["session"])
+    if key not in voter_memos:
+        voter_memos[key] = utils.LegislatorLookupMemo(
+            os.path.join(utils.cache_dir(), "%s/votes/%s/voters-%s.json" % key))
+    return voter_memos[key]
+
+
+def lookup_voter(vote, *args, **kwargs):
+    # utils.lookup_legislator, noting that the vote's record depends on
+    # congress-legislators (see record_fingerprint).
+    legislator_lookups.add(vote["vote_id"])
+    return utils.lookup_legislator(*args, memo=voter_memo(vote), **kwargs)
+
+
+def output_vote(vote, options):
     logging.info("[%s] Writing to disk..." % vote['vote_id'])
+    utils.render(RENDERERS, vote, options)
 
+
+def write_json(vote, options):
     # output JSON - so easy!
     utils.write(
-        json.dumps(vote, sort_keys=True, indent=2, default=utils.format_datetime),
+        utils.json_dumps(vote),
         output_for_vote(vote["vote_id"], "json"),
         options=options
     )
 
+
+def write_xml(vote, options):
+    output_vote_xml(vote, options, legislator_id_type(vote))
+
+
+def write_sqlite(vote, options):
+    if not options.get("diff"):
+        utils.sqlite_sink().write_vote(vote)
+
+
+# output format => function(vote, options) that writes it
+RENDERERS = {
+    "json": write_json,
+    "xml": write_xml,
+    "sqlite": write_sqlite,
+}
+
+
+def legislator_id_type(vote):
+    # Historical votes from voteview use bioguide IDs for both chambers.
+    # Otherwise it's inferred from the chamber (see output_vote_xml).
+    return "bioguide" if "voteview" in vote["source_url"] else None
+
+
+def output_vote_xml(vote, options, id_type=None):
     # What kind of IDs are we passed for Members of Congress?
     # For current data, we infer from the chamber. For historical data from voteview,
     # we're passed the type in id_type, which is set to "bioguide".
@@ -86,46 +194,56 @@ def output_vote(vote, options, id_type=None):
         id_type = ("bioguide" if vote["chamber"] == "h" else "lis")
 
     # output XML
-    root = etree.Element("roll")
+    utils.record_legislator_ids()
+    with utils.xml_output(output_for_vote(vote['vote_id'], "xml"), options, encoding="utf8") as xml:
+        write_vote_xml(vote, options, id_type, xml)
+    utils.index_legislator_ids(output_for_vote(vote['vote_id'], "xml"), "vote", options)
 
-    root.set("where", "house" if vote['chamber'] == "h" else "senate")
-    root.set("session", str(vote["congress"]))
-    root.set("year", str(vote["date"].year))
-    root.set("roll", str(vote["number"]))
-    if "voteview" in vote["source_url"]:
-        root.set("source", "keithpoole")
-    else:
-        root.set("source", "house.gov" if vote["chamber"] == "h" else "senate.gov")
-
-    root.set("datetime", utils.format_datetime(vote['date']))
-    root.set("updated", utils.format_datetime(vote['updated_at']))
 
+def write_vote_xml(vote, options, id_type, xml):
     def get_votes(option):
         return len(vote["votes"].get(option, []))
-    root.set("aye", str(get_votes("Yea") + get_votes("Aye")))
-    root.set("nay", str(get_votes("Nay") + get_votes("No")))
-    root.set("nv", str(get_votes("Not Voting")))
-    root.set("present", str(get_votes("Present")))
 
-    utils.make_node(root, "category", vote["category"])
-    utils.make_node(root, "type", vote["type"])
-    utils.make_node(root, "question", vote["question"])
-    utils.make_node(root, "required", vote["requires"])
-    utils.make_node(root, "result", vote["result"])
+    if "voteview" in vote["source_url"]:
+        source = "keithpoole"
+    else:
+        source = "house.gov" if vote["chamber"] == "h" else "senate.gov"
+
+    # mimick two hard line breaks in GovTrack's legacy output to ease running diffs
+    xml.start("roll", [
+        ("where", "house" if vote['chamber'] == "h" else "senate"),
+        ("session", str(vote["congress"])),
+        ("year", str(vote["date"].year)),
+        ("roll", str(vote["number"])),
+        ("source", source),
+        ("datetime", utils.format_datetime(vote['date'])),
+        ("updated", utils.format_datetime(vote['updated_at'])),
+        ("aye", str(get_votes("Yea") + get_votes("Aye"))),
+        ("nay", str(get_votes("Nay") + get_votes("No"))),
+        ("nv", str(get_votes("Not Voting"))),
+        ("present", str(get_votes("Present"))),
+    ], break_after=("source", "updated"))
+
+    xml.leaf("category", vote["category"])
+    xml.leaf("type", vote["type"])
+    xml.leaf("question", vote["question"])
+    xml.leaf("required", vote["requires"])
+    xml.leaf("result", vote["result"])
 
     if vote.get("bill"):
-        utils.make_node(root, "bill", None, session=str(vote["bill"]["congress"]), type=govtrack_type_codes[vote["bill"]["type"]], number=str(vote["bill"]["number"]))
+        xml.leaf("bill", None, utils.xml_attrs(session=str(vote["bill"]["congress"]), type=govtrack_type_codes[vote["bill"]["type"]], number=str(vote["bill"]["number"])))
 
     if "amendment" in vote:
-        n = utils.make_node(root, "amendment", None)
+        attrs = []
         if vote["amendment"]["type"] == "s":
-            n.set("ref", "regular")
-            n.set("session", str(vote["congress"]))
-            n.set("number", "s" + str(vote["amendment"]["number"]))
+            attrs.append(("ref", "regular"))
+            attrs.append(("session", str(vote["congress"])))
+            attrs.append(("number", "s" + str(vote["amendment"]["number"])))
         elif vote["amendment"]["type"] == "h-bill":
-            n.set("ref", "bill-serial")
-            n.set("session", str(vote["congress"]))
-            n.set("number", str(vote["amendment"]["number"]))
+            attrs.append(("ref", "bill-serial"))
+            attrs.append(("session", str(vote["congress"])))
+            attrs.append(("number", str(vote["amendment"]["number"])))
+        xml.leaf("amendment", None, attrs)
 
     # well-known keys for certain vote types: +/-/P/0
     option_keys = {"Aye": "+", "Yea": "+", "Nay": "-", "No": "-", "Present": "P", "Not Voting": "0", "Guilty": "+", "Not Guilty": "-" }
@@ -137,41 +255,31 @@ def output_vote(vote, options, id_type=None):
     for option in options_list:
         if option not in option_keys:
             option_keys[option] = option
-        utils.make_node(root, "option", option, key=option_keys[option])
+        xml.leaf("option", option, utils.xml_attrs(key=option_keys[option]))
 
     for option in options_list:
         for v in vote["votes"][option]:
-            n = utils.make_node(root, "voter", None)
+            attrs = []
             if v == "VP":
-                n.set("id", "0")
-                n.set("VP", "1")
+                attrs.append(("id", "0"))
+                attrs.append(("VP", "1"))
             elif not options.get("govtrack", False):
-                n.set("id", str(v["id"]))
+                attrs.append(("id", str(v["id"])))
             else:
-                n.set("id", str(utils.translate_legislator_id(id_type, v["id"], 'govtrack')))
-            n.set("vote", option_keys[option])
-            n.set("value", option)
+                attrs.append(("id", str(utils.translate_legislator_id(id_type, v["id"], 'govtrack'))))
+            attrs.append(("vote", option_keys[option]))
+            attrs.append(("value", option))
             if v != "VP":
-                n.set("state", v["state"])
+                attrs.append(("state", v["state"]))
                 if v.get("voteview_votecode_extra") is not None:
-                    n.set("voteview_votecode_extra", v["voteview_votecode_extra"])
-
-    xmloutput = etree.tostring(root, pretty_print=True, encoding="utf8")
+                    attrs.append(("voteview_votecode_extra", v["voteview_votecode_extra"]))
+            xml.leaf("voter", None, attrs)
 
-    # mimick two hard line breaks in GovTrack's legacy output to ease running diffs
-    xmloutput = re.sub('(source=".*?") ', r"\1\n  ", xmloutput)
-    xmloutput = re.sub('(updated=".*?") ', r"\1\n  ", xmloutput)
-
-    utils.write(
-        xmloutput,
-        output_for_vote(vote['vote_id'], "xml"),
-        options=options
-    )
+    xml.end()
 
 
 def output_for_vote(vote_id, format):
-    vote_chamber, vote_number, vote_congress, vote_session_year = utils.split_vote_id(vote_id)
-    return "%s/%s/votes/%s/%s%s/%s" % (utils.data_dir(), vote_congress, vote_session_year, vote_chamber, vote_number, "data.%s" % format)
+    return "%s/%s/%s" % (utils.data_dir(), identifiers.VoteId.parse(vote_id).path, "data.%s" % format)
 
 
 def parse_senate_vote(dom, vote):
@@ -277,7 +385,7 @@ def parse_senate_vote(dom, vote):
 
         # In the 101st Congress, 1st session (1989), votes 133 through 136 lack lis_member_id nodes.
         if voter != "VP" and voter["id"] == "":
-            voter["id"] = utils.lookup_legislator(vote["congress"], "sen", voter["last_name"], voter["state"], voter["party"], vote["date"], "lis")
+            voter["id"] = lookup_voter(vote, vote["congress"], "sen", voter["last_name"], voter["state"], voter["party"], vote["date"], "lis")
             if voter["id"] == None:
                 logging.error("[%s] Missing lis_member_id and name lookup failed for %s" % (vote["vote_id"], voter["last_name"]))
                 raise Exception("Could not find ID for %s (%s-%s)" % (voter["last_name"], voter["state"], voter["party"]))
@@ -299,14 +407,14 @@ def parse_senate_vote(dom, vote):
         add_vote(str(dom.xpath("string(tie_breaker/tie_breaker_vote)")), "VP")
 
     for member in dom.xpath("members/member"):
-        add_vote(str(member.xpath("string(vote_cast)")), {
-            "id": str(member.xpath("string(lis_member_id)")),
-            "state": str(member.xpath("string(state)")),
-            "party": str(member.xpath("string(party)")),
-            "display_name": unicode(member.xpath("string(member_full)")),
-            "first_name": str(member.xpath("string(first_name)")),
-            "last_name": str(member.xpath("string(last_name)")),
-        })
+        add_vote(str(member.xpath("string(vote_cast)")), records.Voter(
+            id=str(member.xpath("string(lis_member_id)")),
+            state=str(member.xpath("string(state)")),
+            party=str(member.xpath("string(party)")),
+            display_name=unicode(member.xpath("string(member_full)")),
+            first_name=str(member.xpath("string(first_name)")),
+            last_name=str(member.xpath("string(last_name)")),
+        ))
 
 
 def parse_house_vote(dom, vote):
@@ -399,12 +507,12 @@ def parse_house_vote(dom, vote):
         party = str(member.xpath("string(legislator/@party)"))
         vote_cast = str(member.xpath("string(vote)"))
         bioguideid = str(member.xpath("string(legislator/@name-id)"))
-        add_vote(vote_cast, {
-            "id": bioguideid,
-            "state": state,
-            "party": party,
-            "display_name": display_name,
-        })
+        add_vote(vote_cast, records.Voter(
+            id=bioguideid,
+            state=state,
+            party=party,
+            display_name=display_name,
+        ))
 
     # Through the 107th Congress and sporadically in more recent data, the bioguide field
     # is not present. Look up the Members' bioguide IDs by name/state/party/date. This works
@@ -449,7 +557,7 @@ def parse_house_vote(dom, vote):
             continue
 
         # look up ID
-        v["id"] = utils.lookup_legislator(vote["congress"], "rep", display_name, v["state"], v["party"], vote["date"], "bioguide", exclude=seen_ids)
+        v["id"] = lookup_voter(vote, vote["congress"], "rep", display_name, v["state"], v["party"], vote["date"], "bioguide", exclude=seen_ids)
 
         if v["id"] == None:
             logging.error("[%s] Missing bioguide ID and name lookup failed for %s (%s-%s on %s)" % (vote["vote_id"], display_name, v["state"], v["party"], vote["date"]))
@@ -460,91 +568,91 @@ def parse_house_vote(dom, vote):
             seen_ids.add(v["id"])
 
 
+# note that these allow .* after each pattern, so some things look like
+# no-ops but they are really truncating the type after the specified text.
+VOTE_TYPE_RULES = rules.RuleTable([
+    rules.Rule(r"^On the Resolution of Ratification.*", "On the Resolution of Ratification", anchored=True), # order matters so must go before other resolutions
+    rules.Rule(r"On (Agreeing to )?the (Joint |Concurrent )?Resolution", "On the $2Resolution", anchored=True),
+    rules.Rule(r"On (Agreeing to )?the Conference Report", "On the Conference Report", anchored=True),
+    rules.Rule(r"On (Agreeing to )?the (En Bloc )?Amendments?", "On the Amendment", anchored=True),
+    rules.Rule(r"On (?:the )?Motion to Recommit", "On the Motion to Recommit", anchored=True),
+    rules.Rule(r"(On Motion to )?(Concur in|Concurring|On Concurring|Agree to|On Agreeing to) (the )?Senate (Amendment|amdt|Adt)s?", "Concurring in the Senate Amendment", anchored=True),
+    rules.Rule(r"(On Motion to )?Suspend (the )?Rules and (Agree|Concur|Pass)(, As Amended)", "On Motion to Suspend the Rules and $3$4", anchored=True),
+    rules.Rule(r"Will the House Now Consider the Resolution|On (Question of )?Consideration of the Resolution", "On Consideration of the Resolution", anchored=True),
+    rules.Rule(r"On (the )?Motion to Adjourn", "On the Motion to Adjourn", anchored=True),
+    rules.Rule(r"On (the )?Cloture Motion", "On the Cloture Motion", anchored=True),
+    rules.Rule(r"On Cloture on the Motion to Proceed", "On the Cloture Motion", anchored=True),
+    rules.Rule(r"On (the )?Nomination", "On the Nomination", anchored=True),
+    rules.Rule(r"On Passage( of the Bill|$)", "On Passage of the Bill", anchored=True),
+    rules.Rule(r"On (the )?Motion to Proceed", "On the Motion to Proceed", anchored=True),
+])
+
+
 def normalize_vote_type(vote_type):
     # Takes the "type" field of a House or Senate vote and returns a normalized
     # version of the same, as best as possible.
 
-    # note that these allow .* after each pattern, so some things look like
-    # no-ops but they are really truncating the type after the specified text.
-    mapping = (
-        (r"^On the Resolution of Ratification.*", "On the Resolution of Ratification"), # order matters so must go before other resolutions
-        (r"On (Agreeing to )?the (Joint |Concurrent )?Resolution", "On the $2Resolution"),
-        (r"On (Agreeing to )?the Conference Report", "On the Conference Report"),
-        (r"On (Agreeing to )?the (En Bloc )?Amendments?", "On the Amendment"),
-        (r"On (?:the )?Motion to Recommit", "On the Motion to Recommit"),
-        (r"(On Motion to )?(Concur in|Concurring|On Concurring|Agree to|On Agreeing to) (the )?Senate (Amendment|amdt|Adt)s?", "Concurring in the Senate Amendment"),
-        (r"(On Motion to )?Suspend (the )?Rules and (Agree|Concur|Pass)(, As Amended)", "On Motion to Suspend the Rules and $3$4"),
-        (r"Will the House Now Consider the Resolution|On (Question of )?Consideration of the Resolution", "On Consideration of the Resolution"),
-        (r"On (the )?Motion to Adjourn", "On the Motion to Adjourn"),
-        (r"On (the )?Cloture Motion", "On the Cloture Motion"),
-        (r"On Cloture on the Motion to Proceed", "On the Cloture Motion"),
-        (r"On (the )?Nomination", "On the Nomination"),
-        (r"On Passage( of the Bill|$)", "On Passage of the Bill"),
-        (r"On (the )?Motion to Proceed", "On the Motion to Proceed"),
-    )
-
-    for regex, replacement in mapping:
-        m = re.match(regex, vote_type, re.I)
-        if m:
-            if m.groups():
-                for i, val in enumerate(m.groups()):
-                    replacement = replacement.replace("$%d" % (i + 1), val if val else "")
-            return replacement
+    replacement, m = VOTE_TYPE_RULES.first(vote_type)
+    if m:
+        if m.groups():
+            for i, val in enumerate(m.groups()):
+                replacement = replacement.replace("$%d" % (i + 1), val if val else "")
+        return replacement
 
     return vote_type
 
 
+# Based on Eric's vote_type_for function in sunlightlabs/congress.
+VOTE_CATEGORY_RULES = rules.RuleTable([
+    # empty text (historical data)
+    rules.Rule(r"^$", "unknown"),
+
+    # common
+    rules.Rule(r"^On Overriding the Veto", "veto-override"),
+    rules.Rule(r"^On Presidential Veto", "veto-override"),
+    rules.Rule(r"Objections of the President (To The Contrary )?Not ?Withstanding", "veto-override"),  # order matters so must go before bill passage
+    rules.Rule(r"^On Passage", "passage"),
+    rules.Rule(r"^On the Resolution of Ratification.*", "treaty"), # order matters so must go before other resolutions
+    rules.Rule(r"^On (Agreeing to )?the (Joint |Concurrent )?Resolution", "passage"),
+    rules.Rule(r"^On (Agreeing to )?the Conference Report", "passage"),
+    rules.Rule(r"^On (Agreeing to )?the (En Bloc )?Amendments?", "amendment"),
+
+    # senate only
+    rules.Rule(r"cloture", "cloture"),
+    rules.Rule(r"^On the Nomination", "nomination"),
+    rules.Rule(r"^Guilty or Not Guilty", "conviction"),  # was "impeachment" in sunlightlabs/congress but that's not quite right
+    rules.Rule(r"^On (?:the )?Motion to Recommit", "recommit"),
+    rules.Rule(r"^On the Motion \(Motion to Concur", "passage"),
+
+    # house only
+    rules.Rule(r"^(On Motion (to|that the House) )?(Concur in|Concurring|Concurring in|On Concurring|On Concurring in|Agree to|On Agreeing to) (the )?Senate (Amendment|amdt|Adt)s?", "passage"),
+    rules.Rule(r"^(On Motion to )?Suspend (the )?Rules and (Agree|Concur|Pass)", "passage-suspension"),
+    rules.Rule(r"^Call of the House$", "quorum"),
+    rules.Rule(r"^Call by States$", "quorum"),
+    rules.Rule(r"^Election of the Speaker$", "leadership"),
+
+    # various procedural things
+    # order matters, so these must go last
+    rules.Rule(r"^On Ordering the Previous Question", "procedural"),
+    rules.Rule(r"^On Approving the Journal", "procedural"),
+    rules.Rule(r"^Will the House Now Consider the Resolution|On (Question of )?Consideration of the Resolution", "procedural"),
+    rules.Rule(r"^On (the )?Motion to Adjourn", "procedural"),
+    rules.Rule(r"Authoriz(e|ing) Conferees", "procedural"),
+    rules.Rule(r"On the Point of Order|Sustaining the Ruling of the Chair", "procedural"),
+    rules.Rule(r"^On .*Motion ", "procedural"),  # $1 is a name like "Broun of Georgia"
+    rules.Rule(r"^On the Decision of the Chair", "procedural"),
+    rules.Rule(r"^Whether the Amendment is Germane", "procedural"),
+    rules.Rule(r"^Table Appeal of the Ruling of the Chair", "procedural"),
+])
+
+
 def get_vote_category(vote_question):
     # Takes the type/question field of a House or Senate vote and returns a normalized
     # category for the vote type.
-    #
-    # Based on Eric's vote_type_for function in sunlightlabs/congress.
-
-    mapping = (
-        # empty text (historical data)
-        (r"^$", "unknown"),
-
-        # common
-        (r"^On Overriding the Veto", "veto-override"),
-        (r"^On Presidential Veto", "veto-override"),
-        (r"Objections of the President (To The Contrary )?Not ?Withstanding", "veto-override"),  # order matters so must go before bill passage
-        (r"^On Passage", "passage"),
-        (r"^On the Resolution of Ratification.*", "treaty"), # order matters so must go before other resolutions
-        (r"^On (Agreeing to )?the (Joint |Concurrent )?Resolution", "passage"),
-        (r"^On (Agreeing to )?the Conference Report", "passage"),
-        (r"^On (Agreeing to )?the (En Bloc )?Amendments?", "amendment"),
-
-        # senate only
-        (r"cloture", "cloture"),
-        (r"^On the Nomination", "nomination"),
-        (r"^Guilty or Not Guilty", "conviction"),  # was "impeachment" in sunlightlabs/congress but that's not quite right
-        (r"^On (?:the )?Motion to Recommit", "recommit"),
-        (r"^On the Motion \(Motion to Concur", "passage"),
-
-        # house only
-        (r"^(On Motion (to|that the House) )?(Concur in|Concurring|Concurring in|On Concurring|On Concurring in|Agree to|On Agreeing to) (the )?Senate (Amendment|amdt|Adt)s?", "passage"),
-        (r"^(On Motion to )?Suspend (the )?Rules and (Agree|Concur|Pass)", "passage-suspension"),
-        (r"^Call of the House$", "quorum"),
-        (r"^Call by States$", "quorum"),
-        (r"^Election of the Speaker$", "leadership"),
-
-        # various procedural things
-        # order matters, so these must go last
-        (r"^On Ordering the Previous Question", "procedural"),
-        (r"^On Approving the Journal", "procedural"),
-        (r"^Will the House Now Consider the Resolution|On (Question of )?Consideration of the Resolution", "procedural"),
-        (r"^On (the )?Motion to Adjourn", "procedural"),
-        (r"Authoriz(e|ing) Conferees", "procedural"),
-        (r"On the Point of Order|Sustaining the Ruling of the Chair", "procedural"),
-        (r"^On .*Motion ", "procedural"),  # $1 is a name like "Broun of Georgia"
-        (r"^On the Decision of the Chair", "procedural"),
-        (r"^Whether the Amendment is Germane", "procedural"),
-        (r"^Table Appeal of the Ruling of the Chair", "procedural"),
-    )
 
-    for regex, category in mapping:
-        if re.search(regex, vote_question, re.I):
-            return category
+    category, m = VOTE_CATEGORY_RULES.first(vote_question)
+    if m:
+        return category
 
     # unhandled
     logging.warn("Unhandled vote question: %s" % vote_question)
@@ -0,0 +1,39 @@
+import utils
+import logging
+import os.path
+
+# Builds the matrices of how each member voted on each roll call vote (see
+# congress.votematrix) from the votes saved in the record store. Votes are
+# also added to the matrices as vote_info and voteview save them, so this is
+# only needed for votes saved before that, or to rebuild a matrix.
+#
+# --congress=113[,114]: the Congresses to build (required).
+# --chamber=h|s: just one chamber.
+
+
+def run(options):
+    if not options.get("congress"):
+        logging.error("Specify the Congresses to build, e.g. --congress=113.")
+        return None
+
+    chamber = options.get("chamber")
+    if chamber not in (None, "h", "s"):
+        logging.error("Unknown chamber %s (choose from h, s)." % chamber)
+        return None
+
+    store = utils.record_store()
+    matrices = utils.vote_matrix_store()
+    for congress in str(options["congress"]).split(","):
+        count = 0
+        for path in store.paths(congress, "votes"):
+            # the file is named by chamber and number (see VoteId.path_for)
+            if chamber and not os.path.basename(path).startswith(chamber):
+                continue
+            stored = store.load(path)
+            if stored is None:
+                logging.warn("Skipping %s, saved by another version of the code." % path)
+                continue
+            matrices.update(stored.data)
+            count += 1
+        matrices.save()
+        logging.warn("[%s] Added %i votes to the vote matrices." % (congress, count))
@@ -114,7 +114,7 @@ def vote_ids_for_house(congress, session_year, options):
 
 
 def vote_ids_for_senate(congress, session_year, options):
-    session_num = int(session_year) - utils.get_congress_first_year(int(congress)) + 1
+    session_num = utils.get_session_number(int(congress), session_year)
 
     vote_ids = []
 
@@ -150,6 +150,11 @@ def vote_ids_for_senate(congress, session_year, options):
 
 
 def should_process(vote_id, options):
+    # If --stale-only is used, only regenerate votes written by another
+    # version of the code.
+    if options.get("stale_only", False) and not vote_info.is_stale(vote_id, options):
+        return False
+
     if not options.get("fast", False):
         return True
 
@@ -1,11 +1,14 @@
 import re
-import StringIO
 import csv
 import datetime
 import time
 import logging
+import sys
+
+import numpy
 
 import utils
+from congress import identifiers, records
 from vote_info import output_vote
 
 # load some hard-coded codes
@@ -22,7 +25,10 @@ def run(options):
     chamber = options.get('chamber', None)
 
     # we're going to need to map votes to sessions because in modern history the numbering resets by session
-    session_dates = list(csv.DictReader(StringIO.StringIO(utils.download("http://www.govtrack.us/data/us/sessions.tsv").encode("utf8")), delimiter="\t"))
+    session_dates = utils.congress_sessions(options)
+    if session_dates is None:
+        logging.error("Couldn't download the sessions of Congress.")
+        return
 
     # download the vote data now
     if chamber and chamber in [ "h", "s" ]:
@@ -298,7 +304,6 @@ def extract_vote_info_from_parsed_vote_list_line(parsed_vote_list_line):
         "means": int(parsed_vote_list_line[7]) if parsed_vote_list_line[7].strip() else None,
         # parsed_vote_list_line[8] is partial member name
         "member_name": parsed_vote_list_line[8].strip(),
-        "votes": [int(icpsr_vote_code) for icpsr_vote_code in parsed_vote_list_line[9]],
     }
 
     return vote_info
@@ -318,16 +323,23 @@ def parse_vote_list_file(vote_list_file):
     # Each line in the vote list file is for a Member of Congress, with
     # identifying data in the left column followed by one character per
     # vote (1=aye, etc.).
+    #
+    # Returns the members and the matrix of their votes: a row per member
+    # and a column per roll call (in order), holding the vote codes, or -1
+    # past the end of a line that is shorter than the others.
 
     logging.info("Parsing vote list file...")
 
     vote_list_info = []
+    vote_codes = []
 
     for vote_list_line in vote_list_file.split("\r\n"):
         if not vote_list_line.strip():
             continue
 
-        vote_info = extract_vote_info_from_parsed_vote_list_line(parse_vote_list_line(vote_list_line))
+        parsed_vote_list_line = parse_vote_list_line(vote_list_line)
+        vote_info = extract_vote_info_from_parsed_vote_list_line(parsed_vote_list_line)
+        vote_codes.append(parsed_vote_list_line[9])
 
         vote_info["state"] = get_state_from_icpsr_state_code(vote_info["icpsr_state"]) if vote_info["icpsr_state"] is not None else None
         vote_info["party"] = get_party_from_icpsr_party_code(vote_info["icpsr_party"]) if vote_info["icpsr_party"] is not None else None
@@ -377,7 +389,21 @@ def parse_vote_list_file(vote_list_file):
 
         vote_list_info.append(vote_info)
 
-    return vote_list_info
+    return vote_list_info, vote_matrix(vote_codes)
+
+
+def vote_matrix(vote_codes):
+    # The digit strings at the ends of the lines => an int8 matrix, without
+    # going through a Python int per vote.
+    width = max(len(codes) for codes in vote_codes) if vote_codes else 0
+    if all(len(codes) == width for codes in vote_codes):
+        matrix = numpy.frombuffer("".join(vote_codes), dtype=numpy.uint8).reshape(len(vote_codes), width)
+        return (matrix - ord("0")).astype(numpy.int8)
+
+    matrix = numpy.full((len(vote_codes), width), -1, dtype=numpy.int8)
+    for i, codes in enumerate(vote_codes):
+        matrix[i, :len(codes)] = numpy.frombuffer(codes, dtype=numpy.uint8) - ord("0")
+    return matrix
 
 
 def parse_rollcall_dtl_list_file(rollcall_dtl_list_file, congress):
@@ -428,51 +454,37 @@ def parse_rollcall_dtl_list_file(rollcall_dtl_list_file, congress):
     return rollcall_dtl_list_info
 
 
-def build_votes(vote_list):
-    # Go from a list of individuals (and their votes) to a mapping
-    # from votes to how the individuals voted on it.
+def build_votes(vote_list, vote_matrix):
+    # Go from a list of individuals (and the matrix of their votes) to the
+    # voters on each vote and the matrix's columns, one per vote, holding
+    # how each of them voted (see build_votes_dict).
 
     logging.info("Building votes...")
 
-    votes = {}
+    # Separate the president's position from Member votes.
     presidents_positions = {}
-
-    for voter in vote_list:
-        for i, choice in enumerate(voter["votes"]):
-            # Separate the president's position from Member votes.
-            if voter["is_president"]:
-                presidents_positions[i] = choice
-                continue
-
-            # Drop anyone we didn't have a bioguide id for. We issued warnings
-            # when we did the lookup if we couldn't find the id. Any remaining
-            # cases are individuals who didn't actually take office and didn't
-            # actually vote. Presidents may not have bioguide IDs so we filter
-            # those first above.
-            if voter["bioguide_id"] is None:
-                continue
-
-            # Make a record for this vote, grouped by vote option (Aye, etc).
-            votes.setdefault(i, []).append({
-                "id": voter["bioguide_id"],
-                "display_name": voter["member_name"],
-                "party": voter["party"],
-                "state": voter["state"],
-                "vote": choice,
-            })
+    for voter, choices in zip(vote_list, vote_matrix):
+        if voter["is_president"]:
+            choices = choices[choices >= 0]
+            presidents_positions.update(enumerate(choices.tolist()))
+
+    # Drop anyone we didn't have a bioguide id for. We issued warnings
+    # when we did the lookup if we couldn't find the id. Any remaining
+    # cases are individuals who didn't actually take office and didn't
+    # actually vote. Presidents may not have bioguide IDs so we filter
+    # those first above.
+    rows = [i for i, voter in enumerate(vote_list) if not voter["is_president"] and voter["bioguide_id"] is not None]
 
     # sort for output
-    for voters in votes.values():
-        voters.sort(key=lambda v: v['display_name'])
+    rows.sort(key=lambda i: vote_list[i]["member_name"])
 
-    return (votes, presidents_positions)
+    voters = [vote_list[i] for i in rows]
+    return (voters, vote_matrix[rows].T.copy()), presidents_positions
 
 
 def session_from_date(date, session_dates):
-    for sess in session_dates:
-        if sess["start"] <= date <= sess["end"]:
-            return int(sess["congress"]), sess["session"]
-    return None, None
+    # session_dates is a congress.sessions.Sessions
+    return session_dates.session_from_date(date)
 
 def parse_rollcall_description(rollcall):
     # The description sometimes has additional metadata. It's a little tricky
@@ -497,7 +509,12 @@ def parse_rollcall_description(rollcall):
     rollcall['description'] = ". ".join(dparts)
     if not rollcall['description'].endswith('.'): rollcall['description'] += "."
 
-def build_votes_dict(votes_list, rollcall):    
+def build_votes_dict(voters, choices, rollcall):
+    # The voters on a vote (see build_votes) and how each voted => a dict
+    # from vote option to the legislators who voted that option, in the
+    # order of the voters (which is already sorted).
+    codes = numpy.unique(choices[choices >= 0]).tolist()
+
     if rollcall.get("description") in special_vote_options:
         # Some votes are for things besides aye/no etc where the vote
         # description says how the numeric codes are mapped to options.
@@ -508,38 +525,63 @@ def build_votes_dict(votes_list, rollcall):
         original_description = rollcall["description"]
         new_description, vote_codes = special_vote_options[original_description]
         rollcall["description"] = new_description
-        for v in votes_list:
-            if v["vote"] == 0:
-                v["vote"] = None
-            elif v["vote"] == 9:
-                v["vote"] = "Not Voting"
+        options = {}
+        for code in codes:
+            if code == 0:
+                option = None
+            elif code == 9:
+                option = "Not Voting"
             else:
                 try:
-                    v["vote"] = vote_codes[v["vote"]]
+                    option = vote_codes[code]
                 except KeyError:
-                    logging.error('Vote "%s" had a "%d" vote.' % (original_description, v["vote"]))
-                    v["vote"] = "Unknown"
+                    logging.error('Vote "%s" had a "%d" vote.' % (original_description, code))
+                    option = "Unknown"
+            options[code] = (option, None)
+        extra = False
 
     else:
         # This is a regular vote. Use the regular voteview codebook.
-        for v in votes_list:
-            v["vote"], v["voteview_votecode_extra"] = parse_voteview_vote_code(v["vote"])
-
-    # Now make a dict from vote option to the legislators who voted
-    # that option. Preserve ordering of votes_list which is already
-    # sorted.
-    ret = {
-        choice: [v for v in votes_list if v["vote"] == choice]
-        for choice in set(v["vote"] for v in votes_list)
-        if choice != None # legislators who were not serving at the time of the vote
-    }
-
-    # No longer need the "vote" keys.
-    for v in votes_list:
-        del v["vote"]
+        options = dict((code, parse_voteview_vote_code(code)) for code in codes)
+        extra = True
+
+    ret = {}
+    for code in codes:
+        choice, votecode_extra = options[code]
+        if choice is None:
+            continue  # legislators who were not serving at the time of the vote
+        ret.setdefault(choice, []).append(code)
+
+    voter_codes = choices.tolist()
+    for choice, choice_codes in ret.items():
+        ret[choice] = [
+            voter_record(voters[i], options[voter_codes[i]][1], extra)
+            for i in numpy.flatnonzero(numpy.in1d(choices, choice_codes))]
 
     return ret
 
+
+def voter_record(voter, votecode_extra, extra):
+    # A member votes the same way on many votes, so the records are shared
+    # between the votes of a Congress. They aren't changed once made.
+    key = (votecode_extra, extra)
+    try:
+        return voter["records"][key]
+    except KeyError:
+        pass
+
+    record = records.Voter(
+        id=voter["bioguide_id"],
+        display_name=voter["member_name"],
+        party=voter["party"],
+        state=voter["state"],
+    )
+    if extra:
+        record["voteview_votecode_extra"] = votecode_extra
+    voter.setdefault("records", {})[key] = record
+    return record
+
+
 def get_votes(chamber, congress, options, session_dates):
     logging.warn("Getting votes for %d-%s..." % (congress, chamber))
 
@@ -552,8 +594,8 @@ def get_votes(chamber, congress, options, session_dates):
         logging.error("Couldn't download vote list file.")
         return None
 
-    vote_list = parse_vote_list_file(vote_list_file)
-    votes, presidents_positions = build_votes(vote_list)
+    vote_list, vote_matrix = parse_vote_list_file(vote_list_file)
+    (voters, votes), presidents_positions = build_votes(vote_list, vote_matrix)
 
     # Load the DTL file which lists each roll call vote with textual metadata.
 
@@ -627,7 +669,7 @@ def get_votes(chamber, congress, options, session_dates):
 
         # Make the votes dictionary, but also replace the description
         # text when it contains coded vote information.
-        votes_dict = build_votes_dict(vote_results, rollcall)
+        votes_dict = build_votes_dict(voters, vote_results, rollcall)
 
         # Form the vote dict.
         vote_output = {
@@ -658,10 +700,19 @@ def get_votes(chamber, congress, options, session_dates):
 
 
 def put_vote(vote, options):
-    output_vote(vote, options, id_type="bioguide")
+    # Save the vote's record (see congress.recordstore) and render it.
+    utils.record_store().put(identifiers.VoteId.parse(vote["vote_id"]), vote, fingerprint=record_fingerprint())
+    output_vote(vote, options)
+    if not options.get("diff"):
+        utils.vote_matrix_store().update(vote)
     return {"ok": True, "saved": True}
 
 
+def record_fingerprint():
+    # The code that parses vote records from voteview.
+    return utils.parser_fingerprint((sys.modules[__name__],), {})
+
+
 def normalize_vote_type(descr):
     if descr.startswith("TO PASS "):
         return "On Passage"
@@ -0,0 +1,676 @@
+#!/usr/bin/env python
+
+# Microbenchmarks for the parsing hot paths. Run from the root of the
+# repository:
+#
+#   python test/benchmark.py            # run all of them
+#   python test/benchmark.py rules      # run one of them
+#
+# Each benchmark checks that the optimized code path gives the same results
+# as the straightforward one before timing them.
+
+import sys
+import timeit
+sys.path.append("tasks")
+sys.path.append("test")
+sys.path.append(".")
+
+import fixtures
+
+benchmarks = []
+
+
+def benchmark(func):
+    benchmarks.append(func)
+    return func
+
+
+def report(name, number, old, new):
+    print "%-40s %8.1f us  ->  %8.1f us  (%.1fx)" % (
+        name, old / number * 1e6, new / number * 1e6, old / new if new else 0)
+
+
+@benchmark
+def rules(number=20):
+    import re
+    import vote_info
+    from congress import bill_info
+
+    lines = [line.replace(", the Passed", ", Passed") for line in fixtures.action_lines()]
+
+    def plain_scan():
+        results = []
+        for line in lines:
+            matches = {}
+            for rule in bill_info.BILL_ACTION_RULES.rules:
+                m = re.search(rule.pattern, line, re.I)
+                if m:
+                    matches[rule.value] = m.groups()
+            results.append(matches)
+        return results
+
+    def table_scan():
+        results = []
+        for line in lines:
+            matches = bill_info.BILL_ACTION_RULES.scan(line)
+            results.append(dict((value, m.groups()) for value, m in matches.items()))
+        return results
+
+    assert plain_scan() == table_scan()
+    report("bill action rules (%d lines)" % len(lines), number * len(lines),
+           timeit.timeit(plain_scan, number=number), timeit.timeit(table_scan, number=number))
+
+    def plain_first(table, texts):
+        results = []
+        for text in texts:
+            for rule in table.rules:
+                m = (re.match if rule.anchored else re.search)(rule.pattern, text, re.I)
+                if m:
+                    results.append(rule.value)
+                    break
+            else:
+                results.append(None)
+        return results
+
+    def table_first(table, texts):
+        return [table.first(text)[0] for text in texts]
+
+    for name, table in (("vote type", vote_info.VOTE_TYPE_RULES), ("vote category", vote_info.VOTE_CATEGORY_RULES)):
+        assert plain_first(table, lines) == table_first(table, lines)
+        report("%s rules (%d lines)" % (name, len(lines)), number * len(lines),
+               timeit.timeit(lambda: plain_first(table, lines), number=number),
+               timeit.timeit(lambda: table_first(table, lines), number=number))
+
+
+def linear_lookup_legislator(terms_by_congress, congress, role_type, name, state, party, when, id_requested, exclude=set()):
+    # utils.lookup_legislator before it was indexed, for comparison: a scan
+    # over every term in the Congress that folds names as it goes.
+    def to_ascii(name):
+        name = name.replace("-", " ")
+        if not isinstance(name, unicode):
+            return name
+        import unicodedata
+        return u"".join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c))
+
+    when = when.isoformat()
+    name_parts = to_ascii(name).split(", ", 1)
+    matches = {}
+    for moc, term in terms_by_congress[congress]:
+        if term['start'] > when or term['end'] < when:
+            continue
+        if term['type'] != role_type or term['state'] != state:
+            continue
+        if term['party'][0] != party and name not in ("Laughlin", "Crenshaw", "Goode", "Martinez", "Parker", "Emerson", "Tauzin", "Hayes", "Deal", "Forbes"):
+            continue
+        if moc["id"].get(id_requested) in exclude:
+            continue
+        for name_info_rec in [moc['name']] + moc.get('other_names', []):
+            if 'start' in name_info_rec and name_info_rec['start'] > when:
+                continue
+            if 'end' in name_info_rec and name_info_rec['end'] < when:
+                continue
+            name_info = dict(moc['name'])
+            name_info.update(name_info_rec)
+            if name_parts[0] != to_ascii(name_info['last']) \
+                    and name_parts[0] not in to_ascii(name_info['last']).split(" "):
+                continue
+            first_names = (to_ascii(name_info['first']), to_ascii(name_info.get('nickname', "")), to_ascii(name_info['first'])[0] + ".")
+            if len(name_parts) >= 2 and \
+                    name_parts[1] not in first_names and \
+                    name_parts[1].split(" ")[0] not in first_names:
+                continue
+            break
+        else:
+            continue
+        matches[moc['id'][id_requested]] = term
+    if len(matches) != 1:
+        return None
+    return list(matches)[0]
+
+
+@benchmark
+def lookup_legislator(number=1):
+    # Looks up everyone who served in the 103rd-107th Congresses the way
+    # vote_info does for House and Senate roll calls, by last name and by
+    # "Last, First", on the first day of each session they served in.
+    import datetime
+    import logging
+    import utils
+    logging.disable(logging.WARNING)
+
+    utils.lookup_legislator(103, "rep", "", "", "", datetime.date(1993, 1, 5), "bioguide")  # load the index
+
+    terms_by_congress = {}
+    queries = []
+    for congress, by_role_and_state in utils.lookup_legislator_cache.items():
+        for (role_type, state), entries in by_role_and_state.items():
+            for moc, term, names in entries:
+                terms_by_congress.setdefault(congress, []).append((moc, term))
+                if congress < 103 or congress > 107:
+                    continue
+                id_requested = "bioguide" if role_type == "rep" else "lis"
+                if id_requested not in moc["id"]:
+                    continue
+                for year in (utils.get_congress_first_year(congress), utils.get_congress_first_year(congress) + 1):
+                    when = datetime.date(year, 1, 25)
+                    if not (term["start"] <= when.isoformat() <= term["end"]):
+                        continue
+                    for name in (moc["name"]["last"], moc["name"]["last"] + ", " + moc["name"]["first"]):
+                        queries.append((congress, role_type, name, state, term["party"][0], when, id_requested))
+
+    def linear():
+        return [linear_lookup_legislator(terms_by_congress, *q) for q in queries]
+
+    def indexed():
+        return [utils.lookup_legislator(*q) for q in queries]
+
+    assert linear() == indexed()
+    report("lookup_legislator (%d lookups)" % len(queries), number * len(queries),
+           timeit.timeit(linear, number=number), timeit.timeit(indexed, number=number))
+
+
+@benchmark
+def sponsors(number=3, congress=113):
+    # Parses the sponsor and cosponsors of every bill in a Congress, from the
+    # BILLSTATUS files that ./run fdsys --collections=BILLSTATUS has saved.
+    import glob
+    import re
+    import xmltodict
+    import utils
+    from congress import bill_info
+
+    items = []
+    for fn in glob.glob("%s/%d/bills/*/*/fdsys_billstatus.xml" % (utils.data_dir(), congress)):
+        bill = xmltodict.parse(open(fn).read(), force_list=('item', 'amendment', 'committeeReport',))['billStatus']['bill']
+        items.append((bill['sponsors']['item'][0], bill.get('cosponsors')))
+    if not items:
+        print "sponsors: no BILLSTATUS files for the %d Congress in %s" % (congress, utils.data_dir())
+        return
+
+    def plain_sponsor_for(sponsor_dict):
+        m = re.match(r'(?P<title>(Rep|Sen))\. (?P<name>.*?) +\[(?P<party>[DRI])-(?P<state>[A-Z][A-Z])(-(?P<district>\d{1,2}|At Large))?\]$',
+                     sponsor_dict['fullName'])
+        district = m.group("district")
+        if district == "At Large":
+            district = None
+        return {'title': m.group("title"), 'name': m.group("name"), 'district': district, 'state': m.group('state'),
+                'bioguide_id': sponsor_dict['bioguideId'], 'type': 'person'}
+
+    def plain():
+        results = []
+        for sponsor, cosponsors in items:
+            cosponsor_dicts = []
+            for item in (cosponsors or {'item': []})['item']:
+                d = plain_sponsor_for(item)
+                del d['type']
+                d.update({'sponsored_at': item['sponsorshipDate'], 'withdrawn_at': item['sponsorshipWithdrawnDate'],
+                          'original_cosponsor': item['isOriginalCosponsor'] == 'True'})
+                cosponsor_dicts.append(d)
+            cosponsor_dicts.sort(key=lambda c: c['name'].lower())
+            results.append((plain_sponsor_for(sponsor), cosponsor_dicts))
+        return results
+
+    def memoized():
+        return [(bill_info.sponsor_for(sponsor), bill_info.cosponsors_for(cosponsors)) for sponsor, cosponsors in items]
+
+    assert plain() == memoized()
+    count = sum(1 + len((cosponsors or {'item': []})['item']) for sponsor, cosponsors in items)
+    report("sponsors (%d names in %d bills)" % (count, len(items)), number * count,
+           timeit.timeit(plain, number=number), timeit.timeit(memoized, number=number))
+
+
+@benchmark
+def text(number=20):
+    # strip_tags on the bill summaries in the fixtures' THOMAS pages, and
+    # unescape on the whole pages as download() does.
+    import glob
+    import htmlentitydefs
+    import re
+    from congress import text
+
+    pages = [open(fn).read() for fn in sorted(glob.glob("test/fixtures/bills/*/information.html"))]
+    summaries = []
+    for page in pages:
+        summaries.extend(re.findall(r"(?s)<p>.*?</p>", page))
+    summaries = [s.decode("utf8") for s in summaries]
+
+    def plain_unescape(text):
+        def fixup(m):
+            text = m.group(0)
+            if text[:2] == "&#":
+                try:
+                    if text[:3] == "&#x":
+                        return unichr(int(text[3:-1], 16))
+                    else:
+                        return unichr(int(text[2:-1]))
+                except ValueError:
+                    pass
+            else:
+                try:
+                    text = unichr(htmlentitydefs.name2codepoint[text[1:-1]])
+                except KeyError:
+                    pass
+            return text
+        text = re.sub("&#?\w+;", fixup, text)
+        return re.compile(u'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]').sub('', text)
+
+    def plain_strip_tags(text):
+        text = re.sub("\s*</\s*p\s*>\s*", "\n\n", text).strip()
+        text = re.sub("<[^>]+>", "", text)
+        text = re.sub("[ \t\r\f\v]{2,}", " ", text).strip()
+        return plain_unescape(text)
+
+    for name, old, new, texts in (
+            ("strip_tags (%d summaries)" % len(summaries), plain_strip_tags, text.strip_tags, summaries),
+            ("unescape (%d pages)" % len(pages), plain_unescape, text.unescape, pages)):
+        assert [old(t) for t in texts] == [new(t) for t in texts]
+        report(name, number * len(texts),
+               timeit.timeit(lambda: [old(t) for t in texts], number=number),
+               timeit.timeit(lambda: [new(t) for t in texts], number=number))
+
+
+@benchmark
+def identifiers(number=5):
+    # Output paths for every bill, version and vote ID, as they're built on
+    # each call to output_for_bill and the like.
+    import re
+    from congress import identifiers
+
+    bill_ids = ["%s%d-%d" % (t, n, c) for c in (111, 112, 113) for t in ("hr", "s", "hres") for n in range(1, 3001)]
+    vote_ids = ["%s%d-%d.%d" % (ch, n, c, 2009 + (c - 111) * 2) for c in (111, 112, 113) for ch in "hs" for n in range(1, 1001)]
+
+    def old_bill_path(bill_id):
+        bill_type, number, congress = re.match("^([a-z]+)(\d+)-(\d+)$", bill_id).groups()
+        return "%s/bills/%s/%s%s" % (congress, bill_type, bill_type, number)
+
+    def old_vote_path(vote_id):
+        chamber, number, congress, session = re.match("^(h|s)(\d+)-(\d+).(\d\d\d\d|[0-9A-Z])$", vote_id).groups()
+        return "%s/votes/%s/%s%s" % (congress, session, chamber, number)
+
+    for name, old, new, ids in (
+            ("bill paths (%d IDs)" % len(bill_ids), old_bill_path, lambda id: identifiers.BillId.parse(id).path, bill_ids),
+            ("vote paths (%d IDs)" % len(vote_ids), old_vote_path, lambda id: identifiers.VoteId.parse(id).path, vote_ids)):
+        assert [old(id) for id in ids] == [new(id) for id in ids]
+        report(name, number * len(ids),
+               timeit.timeit(lambda: [old(id) for id in ids], number=number),
+               timeit.timeit(lambda: [new(id) for id in ids], number=number))
+
+
+def deep_size(obj, seen):
+    # The memory taken by obj and everything it refers to that isn't in seen,
+    # counting shared objects (like interned strings) once.
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_size(v, seen) for v in obj)
+    elif hasattr(type(obj), "__slots__"):
+        for cls in type(obj).__mro__:
+            for attribute in cls.__dict__.get("__slots__", ()):
+                if hasattr(obj, attribute):
+                    size += deep_size(getattr(obj, attribute), seen)
+    return size
+
+
+def synthetic_bills(data_dir, congress=113, count=2000):
+    # Writes the data.json of count bills of a Congress under data_dir,
+    # copies of the bills in test/fixtures/govtrack numbered hr1, hr2, ...
+    import glob
+    import json
+    import os
+
+    fixtures = []
+    for filename in sorted(glob.glob("test/fixtures/govtrack/bill-*.json")):
+        with open(filename) as f:
+            fixtures.append(json.load(f))
+
+    for number in range(1, count + 1):
+        bill = dict(fixtures[number % len(fixtures)])
+        bill.update(bill_id="hr%d-%d" % (number, congress), bill_type="hr", number=str(number), congress=str(congress))
+        directory = os.path.join(data_dir, str(congress), "bills", "hr", "hr%d" % number)
+        os.makedirs(directory)
+        with open(os.path.join(directory, "data.json"), "w") as f:
+            json.dump(bill, f, sort_keys=True, indent=2)
+
+
+@benchmark
+def bill_records(congress=113, count=2000):
+    # Memory taken by the data.json of every bill in a Congress, loaded as
+    # dicts and as records.
+    import glob
+    import json
+    import shutil
+    import tempfile
+    from congress import records
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        synthetic_bills(data_dir, congress, count)
+        paths = sorted(glob.glob("%s/%d/bills/*/*/data.json" % (data_dir, congress)))
+        dicts = [json.load(open(path)) for path in paths]
+        bills = list(records.load_bills(congress, data_dir))
+    finally:
+        shutil.rmtree(data_dir)
+
+    for d, bill in zip(dicts, bills):
+        assert json.dumps(d, sort_keys=True, indent=2) == json.dumps(bill, sort_keys=True, indent=2, default=records.json_default)
+
+    old, new = deep_size(dicts, set()), deep_size(bills, set())
+    print "%-40s %8.1f MB  ->  %8.1f MB  (%.1fx)" % (
+        "bills as records (%d bills)" % len(bills), old / 1e6, new / 1e6, float(old) / new)
+
+
+@benchmark
+def columnar_export(number=1, congress=113, count=2000):
+    # Exporting the bills of a Congress as column arrays, again when nothing
+    # changed, and loading the tables rather than every data.json.
+    import glob
+    import json
+    import os
+    import shutil
+    import tempfile
+    from congress import columnar
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        synthetic_bills(data_dir, congress, count)
+        paths = sorted(glob.glob("%s/%d/bills/*/*/data.json" % (data_dir, congress)))
+        directory = os.path.join(data_dir, "columnar")
+
+        def load(path):
+            with open(path) as f:
+                return json.load(f)
+
+        def full():
+            return columnar.export(paths, load, directory, force=True, parquet=False)
+
+        def unchanged():
+            return columnar.export(paths, load, directory, parquet=False)
+
+        assert full() == (count, count)
+        assert unchanged() == (count, 0)
+        report("columnar export, unchanged (%d bills)" % count, number,
+               timeit.timeit(full, number=number), timeit.timeit(unchanged, number=number))
+
+        def tables():
+            return [columnar.load_table(directory, name) for name in ("bills", "actions")]
+
+        assert list(tables()[0]["bill_id"]) == [load(path)["bill_id"] for path in paths]
+        report("bills loaded as tables (%d bills)" % count, number,
+               timeit.timeit(lambda: [load(path) for path in paths], number=number), timeit.timeit(tables, number=number))
+    finally:
+        shutil.rmtree(data_dir)
+
+@benchmark
+def json_output(number=50):
+    # Serializing the output documents in test/fixtures/govtrack.
+    import glob
+    import json
+    import utils
+    from congress import jsonwriter
+
+    documents = [json.load(open(fn)) for fn in sorted(glob.glob("test/fixtures/govtrack/*.json"))]
+
+    def stdlib():
+        return [json.dumps(d, sort_keys=True, indent=2, default=utils.json_default) for d in documents]
+
+    def fast():
+        return [jsonwriter.fast_dumps(d, utils.json_default) for d in documents]
+
+    assert stdlib() == fast()
+    report("JSON output (%d documents)" % len(documents), number * len(documents),
+           timeit.timeit(stdlib, number=number), timeit.timeit(fast, number=number))
+
+
+
+def voteview_ord_file(congress, chamber):
+    # A synthetic voteview ORD file: a line per member (and one for the
+    # President) with a vote code per roll call, about as many roll calls as
+    # the chamber held in that Congress. Returns it and the number of roll
+    # calls.
+    import numpy
+    random = numpy.random.RandomState(congress)
+    members = 445 if chamber == "h" else 102
+    rollcalls = 160 + (congress - 80) * 32 if chamber == "h" else 250 + (congress - 80) * 12
+    codes = numpy.array(list("1" * 50 + "6" * 40 + "9" * 5 + "0" * 2 + "2345" + "78"))
+    matrix = random.choice(codes, (members + 1, rollcalls))
+    for row in random.choice(members, members // 20, replace=False):
+        # not serving for the whole Congress
+        matrix[row, random.randint(rollcalls):] = "0"
+    lines = []
+    for i, votes in enumerate(matrix):
+        president = i == members
+        lines.append("%3d%5d%2d%2d%-7s%4d%1d%1d%-11s%s" % (
+            congress, 99911 if president else 10000 + i, 99 if president else 41, 0 if president else i % 9 + 1,
+            "USA" if president else "ALABAMA", 100 if president else (100, 200, 328)[i % 3], 0, 1,
+            "PRESIDENT" if president else "MEMBER%s" % chr(65 + i % 26), "".join(votes)))
+    return "\r\n".join(lines) + "\r\n", rollcalls
+
+
+def plain_voteview_votes(vote_list_file, rollcalls):
+    # voteview's vote list parsing before the vote matrix, for comparison:
+    # a Python int per vote code, and a loop over every member and roll call.
+    import voteview
+    from congress import records
+
+    vote_list = []
+    for line in vote_list_file.split("\r\n"):
+        if not line.strip():
+            continue
+        parsed = voteview.parse_vote_list_line(line)
+        voter = voteview.extract_vote_info_from_parsed_vote_list_line(parsed)
+        voter["votes"] = [int(code) for code in parsed[9]]
+        voter["party"] = voteview.get_party_from_icpsr_party_code(voter["icpsr_party"])
+        voter["state"] = voteview.get_state_from_icpsr_state_code(voter["icpsr_state"])
+        voter["bioguide_id"] = None if voter["icpsr_state"] == 99 else "B%06d" % voter["icpsr_id"]
+        voter["is_president"] = voter["icpsr_state"] == 99
+        vote_list.append(voter)
+
+    votes = {}
+    for voter in vote_list:
+        for i, choice in enumerate(voter["votes"]):
+            if voter["is_president"] or voter["bioguide_id"] is None:
+                continue
+            votes.setdefault(i, []).append(records.Voter(id=voter["bioguide_id"], display_name=voter["member_name"],
+                                                         party=voter["party"], state=voter["state"], vote=choice))
+    for voters in votes.values():
+        voters.sort(key=lambda v: v['display_name'])
+
+    results = []
+    for i, rollcall in enumerate(rollcalls):
+        votes_list = votes[i]
+        if rollcall["description"] in voteview.special_vote_options:
+            vote_codes = voteview.special_vote_options[rollcall["description"]][1]
+            for v in votes_list:
+                v["vote"] = None if v["vote"] == 0 else "Not Voting" if v["vote"] == 9 else vote_codes.get(v["vote"], "Unknown")
+        else:
+            for v in votes_list:
+                v["vote"], v["voteview_votecode_extra"] = voteview.parse_voteview_vote_code(v["vote"])
+        ret = dict((choice, [v for v in votes_list if v["vote"] == choice])
+                   for choice in set(v["vote"] for v in votes_list) if choice is not None)
+        for v in votes_list:
+            del v["vote"]
+        results.append(ret)
+    return results
+
+
+@benchmark
+def voteview_votes(number=1, congresses=range(80, 114, 11)):
+    # Parsing the member x roll call matrix of voteview's ORD files and
+    # grouping each roll call's voters by vote option, for the House and
+    # Senate of Congresses across the 80th-113th (which would take minutes
+    # in all).
+    import logging
+    import utils
+    import voteview
+    logging.disable(logging.ERROR)
+
+    special = sorted(voteview.special_vote_options)[0]
+    files = []
+    for congress in congresses:
+        for chamber in ("h", "s"):
+            vote_list_file, count = voteview_ord_file(congress, chamber)
+            rollcalls = [{"description": special if i == 0 else "TO PASS H.R. %d." % i} for i in range(count)]
+            files.append((vote_list_file, rollcalls))
+
+    get_person_id = utils.get_person_id
+    utils.get_person_id = lambda source_id_type, source_id, dest_id_type: "B%06d" % source_id
+    try:
+        def plain():
+            return [plain_voteview_votes(vote_list_file, [dict(r) for r in rollcalls]) for vote_list_file, rollcalls in files]
+
+        def matrix():
+            results = []
+            for vote_list_file, rollcalls in files:
+                vote_list, vote_matrix = voteview.parse_vote_list_file(vote_list_file)
+                (voters, votes), presidents_positions = voteview.build_votes(vote_list, vote_matrix)
+                results.append([voteview.build_votes_dict(voters, votes[i], dict(rollcall)) for i, rollcall in enumerate(rollcalls)])
+            return results
+
+        assert plain() == matrix()
+        count = sum(len(rollcalls) for vote_list_file, rollcalls in files)
+        report("voteview votes (%d roll calls)" % count, number * count,
+               timeit.timeit(plain, number=number), timeit.timeit(matrix, number=number))
+    finally:
+        utils.get_person_id = get_person_id
+
+
+@benchmark
+def vote_statistics(number=1, members=445, votes=1200):
+    # Member agreement, party unity and participation over a synthetic
+    # House Congress, computed from the votes one member and vote at a time
+    # and from the vote matrix; then updated with one more day of votes. The
+    # pairwise agreement is computed the plain way for the first 100 members
+    # only (it would take minutes for the whole House).
+    import copy
+    import numpy
+    from congress import voteanalytics, votematrix
+
+    random = numpy.random.RandomState(113)
+    options = ["Yea", "Nay", "Present", "Not Voting"]
+    vote_list = []
+    for number_ in range(1, votes + 1):
+        vote = {"vote_id": "h%d-113.2013" % number_, "votes": {}}
+        for i in range(members):
+            party = "DR"[i % 2]
+            option = options[random.choice(4, p=[.46, .46, .01, .07])]
+            vote["votes"].setdefault(option, []).append({"id": "M%03d" % i, "party": party})
+        vote_list.append(vote)
+
+    def plain():
+        positions = {}
+        parties = {}
+        for vote in vote_list:
+            for option, voters in vote["votes"].items():
+                for voter in voters:
+                    positions.setdefault(voter["id"], {})[vote["vote_id"]] = option
+                    parties[voter["id"]] = voter["party"]
+        ids = sorted(positions)
+
+        agreement = []
+        for a in ids[:100]:
+            row = []
+            for b in ids[:100]:
+                agree = both = 0
+                for vote_id, x in positions[a].iteritems():
+                    y = positions[b].get(vote_id)
+                    if x in ("Yea", "Nay") and y in ("Yea", "Nay"):
+                        both += 1
+                        agree += x == y
+                row.append(float(agree) / both if both else float("nan"))
+            agreement.append(row)
+
+        with_party = dict((m, 0) for m in ids)
+        party_votes = dict((m, 0) for m in ids)
+        for vote in vote_list:
+            majority = {}
+            for party in "DR":
+                yeas = sum(1 for m in ids if parties[m] == party and positions[m].get(vote["vote_id"]) == "Yea")
+                nays = sum(1 for m in ids if parties[m] == party and positions[m].get(vote["vote_id"]) == "Nay")
+                majority[party] = "Yea" if yeas > nays else "Nay" if nays > yeas else None
+            if None in majority.values() or majority["D"] == majority["R"]:
+                continue
+            for m in ids:
+                if positions[m].get(vote["vote_id"]) in ("Yea", "Nay"):
+                    party_votes[m] += 1
+                    with_party[m] += positions[m][vote["vote_id"]] == majority[parties[m]]
+        unity = [float(with_party[m]) / party_votes[m] if party_votes[m] else float("nan") for m in ids]
+        participation = [float(sum(1 for p in positions[m].values() if p != "Not Voting")) / len(positions[m]) for m in ids]
+        return numpy.array(agreement), numpy.array(unity), numpy.array(participation)
+
+    matrix = voteanalytics.matrix_from_votes(vote_list)
+
+    def vectorized():
+        statistics = voteanalytics.VoteStatistics()
+        statistics.update(matrix)
+        return statistics.agreement()[:100, :100], statistics.party_unity(), statistics.participation()
+
+    for old, new in zip(plain(), vectorized()):
+        assert numpy.allclose(old, new, equal_nan=True)
+    report("vote statistics (%d members, %d votes)" % (members, votes), number,
+           timeit.timeit(plain, number=number), timeit.timeit(vectorized, number=number))
+
+    # a day's votes added to the matrix
+    statistics = voteanalytics.VoteStatistics()
+    statistics.update(matrix)
+    day = dict((vote["vote_id"], votematrix.vote_positions(vote)) for vote in vote_list[-10:])
+    day = dict(("h%d-113.2013" % (votes + i + 1), columns) for i, columns in enumerate(day.values()))
+    updated = votematrix.merge(matrix, day)
+
+    def full():
+        voteanalytics.VoteStatistics().update(updated)
+
+    def incremental():
+        copy.copy(statistics).update(updated)
+
+    report("vote statistics update (%d new votes)" % len(day), number,
+           timeit.timeit(full, number=number), timeit.timeit(incremental, number=number))
+
+
+@benchmark
+def session_lookups(number=1):
+    import csv
+    import datetime
+    import StringIO
+    from congress import sessions
+    import voteview
+
+    # two sessions a Congress, and a roll call on each day of the sessions
+    # of the last twenty Congresses, looked up twice as get_votes does
+    lines = ["congress\tsession\tstart\tend"]
+    for congress in range(1, 115):
+        year = 1789 + (congress - 1) * 2
+        lines.append("%d\t1\t%d-01-03\t%d-10-01" % (congress, year, year))
+        lines.append("%d\t2\t%d-01-03\t%d-10-01" % (congress, year + 1, year + 1))
+    tsv = "\n".join(lines) + "\n"
+    first = datetime.date(1789 + 94 * 2, 1, 1)
+    dates = [(first + datetime.timedelta(days=i)).isoformat() for i in range(40 * 365)] * 2
+
+    def linear():
+        rows = list(csv.DictReader(StringIO.StringIO(tsv), delimiter="\t"))
+        results = []
+        for date in dates:
+            result = (None, None)
+            for sess in rows:
+                if sess["start"] <= date <= sess["end"]:
+                    result = (int(sess["congress"]), sess["session"])
+                    break
+            results.append(result)
+        return results
+
+    def bisected():
+        index = sessions.parse(tsv)
+        return [voteview.session_from_date(date, index) for date in dates]
+
+    assert linear() == bisected()
+    report("session lookups (%d dates)" % len(dates), number * len(dates),
+           timeit.timeit(linear, number=number), timeit.timeit(bisected, number=number))
+
+if __name__ == "__main__":
+    names = sys.argv[1:]
+    for func in benchmarks:
+        if not names or func.__name__ in names:
+            func()
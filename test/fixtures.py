@@ -1,3 +1,6 @@
+import glob
+from lxml import etree
+
 import bill_info
 
 
@@ -7,3 +10,12 @@ def open_bill(bill_id):
 
 def bill(bill_id):
     return bill_info.parse_bill(bill_id, open_bill(bill_id), {})
+
+
+def action_lines():
+    # the text of every action in the bill fixtures
+    lines = []
+    for fn in sorted(glob.glob("test/fixtures/bills/*/govtrack.xml")):
+        for text in etree.parse(fn).xpath("//actions/*/text"):
+            lines.append(text.text or "")
+    return lines
@@ -0,0 +1,30 @@
+import unittest
+
+from congress import bill_info
+
+# reusing the status-independent part of action parsing across bills
+
+
+def parse_bill_action(line, state, bill_id, title):
+    return bill_info.parse_bill_action({"text": line}, state, bill_id, title)
+
+
+class ActionParseCache(unittest.TestCase):
+
+    def test_cached_action_reuses_parse_but_not_status(self):
+        title = "To provide for the establishment of a border protection strategy for the international land borders of the United States, and for other purposes."
+        line = "Referred to the House Committee on Natural Resources."
+
+        bill_info.action_parse_cache.clear()
+        first_action, first_state = parse_bill_action(line, "INTRODUCED", "hr547-113", title)
+        second_action, second_state = parse_bill_action(line, "REPORTED", "hr718-113", title)
+
+        self.assertEqual(bill_info.action_parse_cache.hits, 1)
+        self.assertEqual(first_action, second_action)
+        self.assertEqual(first_state, "REFERRED")
+        self.assertEqual(second_state, None)  # did not change state
+
+        # callers update the returned dict, which must not leak into the cache
+        first_action["status"] = first_state
+        third_action, third_state = parse_bill_action(line, "INTRODUCED", "hr547-113", title)
+        self.assertTrue("status" not in third_action)
@@ -0,0 +1,90 @@
+import unittest
+
+from congress import bill_info
+
+# history, status and slip law computed in one pass over processed actions
+
+
+def action(action_type, acted_at, **fields):
+    fields.update({"type": action_type, "acted_at": acted_at, "text": fields.get("text", "")})
+    return fields
+
+
+ACTIONS = [
+    action("referral", "2009-09-17", status="REFERRED"),
+    action("action", "2009-09-18", text="Sponsor introductory remarks on measure."),
+    action("calendar", "2009-10-01"),
+    action("action", "2009-10-07"),
+    action("vote", "2009-10-08", where="h", vote_type="vote", result="pass", status="PASS_OVER:HOUSE"),
+    action("vote-aux", "2009-12-23", where="s", vote_type="cloture", result="pass"),
+    action("vote", "2009-12-24", where="s", vote_type="vote", result="pass", status="PASS_BACK:SENATE"),
+    action("vote", "2010-03-21", where="h", vote_type="pingpong", result="pass", status="PASSED:BILL"),
+    action("topresident", "2010-03-22"),
+    action("signed", "2010-03-23", status="ENACTED:SIGNED"),
+    action("enacted", "2010-03-23", law="public", congress="111", number="148"),
+    action("enacted", "2010-03-24", law="public", congress="111", number="149"),
+    action("action", "2010-03-25"),
+]
+
+
+class ActionState(unittest.TestCase):
+
+    def test_history(self):
+        history = bill_info.history_from_actions(ACTIONS)
+        self.assertEqual(history, {
+            "active": True,
+            "active_at": "2009-10-07",
+            "house_passage_result": "pass",
+            "house_passage_result_at": "2010-03-21",
+            "senate_cloture_result": "pass",
+            "senate_cloture_result_at": "2009-12-23",
+            "senate_passage_result": "pass",
+            "senate_passage_result_at": "2009-12-24",
+            "vetoed": False,
+            "enacted": True,
+            "enacted_at": "2010-03-25",
+            "awaiting_signature": False,
+        })
+        self.assertEqual(bill_info.latest_status(ACTIONS, "2009-09-17"), ("ENACTED:SIGNED", "2010-03-23"))
+        self.assertEqual(bill_info.slip_law_from(ACTIONS), {"law_type": "public", "congress": "111", "number": "148"})
+
+    def test_no_actions(self):
+        self.assertEqual(bill_info.history_from_actions([]), {"active": False, "vetoed": False, "enacted": False, "awaiting_signature": False})
+        self.assertEqual(bill_info.latest_status([], "2009-09-17"), ("INTRODUCED", "2009-09-17"))
+        self.assertEqual(bill_info.slip_law_from([]), None)
+
+    def test_vetoed_and_overridden(self):
+        actions = [
+            action("vote", "2010-01-01", where="s", vote_type="vote", result="pass"),
+            action("topresident", "2010-01-02"),
+            action("vetoed", "2010-01-03", status="PROV_KILL:VETO"),
+            action("vote", "2010-01-04", where="h", vote_type="override", result="pass"),
+            action("vote", "2010-01-05", where="s", vote_type="override", result="fail"),
+        ]
+        history = bill_info.history_from_actions(actions)
+        self.assertEqual(history["active"], True)
+        self.assertEqual(history["active_at"], "2010-01-01")
+        self.assertEqual(history["vetoed_at"], "2010-01-03")
+        self.assertEqual(history["awaiting_signature"], False)
+        self.assertEqual(history["house_override_result"], "pass")
+        self.assertEqual(history["senate_override_result"], "fail")
+        self.assertFalse("house_passage_result" in history)
+
+    def test_awaiting_signature(self):
+        actions = [action("referral", "2010-01-01"), action("topresident", "2010-01-02"), action("calendar", "2010-01-03")]
+        history = bill_info.history_from_actions(actions)
+        self.assertEqual(history["active_at"], "2010-01-02")
+        self.assertEqual(history["awaiting_signature"], True)
+        self.assertEqual(history["awaiting_signature_since"], "2010-01-03")
+
+    def test_incremental(self):
+        history = bill_info.history_from_actions(ACTIONS)
+        status = bill_info.latest_status(ACTIONS, "2009-09-17")
+        slip_law = bill_info.slip_law_from(ACTIONS)
+
+        for i in range(len(ACTIONS) + 1):
+            state = bill_info.fold_actions(ACTIONS[:i])
+            bill_info.fold_actions(ACTIONS[i:], state)
+            self.assertEqual(bill_info.history_from_actions(ACTIONS, state), history)
+            self.assertEqual(bill_info.latest_status(ACTIONS, "2009-09-17", state), status)
+            self.assertEqual(bill_info.slip_law_from(ACTIONS, state), slip_law)
@@ -0,0 +1,107 @@
+import unittest
+import json
+
+from congress import bill_info, bills
+
+# updating parsed bill data from actions appended to the bulk data
+
+
+def item(date, text, source="2"):
+    return {"actionDate": date, "text": text, "committee": None, "sourceSystem": {"code": source}}
+
+
+# in the order of the bulk data, most recent first
+ITEMS = [
+    item("2010-03-23", "Became Public Law No: 111-148."),
+    item("2010-03-23", "Signed by President."),
+    item("2010-03-22", "Presented to President."),
+    item("2010-03-21", "On motion that the House agree to the Senate amendments Agreed to by recorded vote: 219 - 212 (Roll no. 165)."),
+    item("2010-03-21", "Resolving differences -- House actions: On motion that the House agree to the Senate amendments Agreed to by recorded vote: 219 - 212 (Roll no. 165).", source="9"),
+    item("2009-12-24", "Passed Senate with an amendment by Yea-Nay Vote. 60 - 39. Record Vote Number: 396."),
+    item("2009-10-08", "On motion to suspend the rules and pass the bill, as amended Agreed to by the Yeas and Nays: 416 - 0 (Roll no. 768)."),
+    item("2009-09-17", ""),
+    item("2009-09-17", "Referred to the House Committee on Ways and Means."),
+]
+
+TITLE = "An act entitled The Patient Protection and Affordable Care Act."
+
+
+def bill_status(items, **fields):
+    bill = {"introducedDate": "2009-09-17", "title": TITLE, "actions": {"item": items}, "updateDate": "2010-03-%02d" % len(items)}
+    bill.update(fields)
+    return {"billStatus": {"bill": bill}}
+
+
+def bill_data_for(items):
+    actions = bill_info.actions_for(items, "hr3590-111", TITLE)
+    status, status_at = bill_info.latest_status(actions, "2009-09-17")
+    return {
+        "bill_id": "hr3590-111",
+        "official_title": TITLE,
+        "introduced_at": "2009-09-17",
+        "actions": actions,
+        "history": bill_info.history_from_actions(actions),
+        "status": status,
+        "status_at": status_at,
+        "enacted_as": bill_info.slip_law_from(actions),
+        "updated_at": "2010-03-%02d" % len(items),
+    }
+
+
+def saved(data):
+    # what comes back from disk
+    return json.loads(json.dumps(data))
+
+
+class BillUpdate(unittest.TestCase):
+
+    def test_appended_actions(self):
+        expected = bill_data_for(ITEMS)
+        expected_state = bills.parse_state_for(bill_status(ITEMS), expected)
+
+        # one split would make the LOC duplicate of the House vote the last
+        # earlier action, and then it is kept until the House action arrives
+        for i in range(len(ITEMS) + 1):
+            earlier = ITEMS[i:]
+            bill_data = saved(bill_data_for(earlier))
+            parse_state = saved(bills.parse_state_for(bill_status(earlier), bill_data))
+
+            updated = bills.update_bill_json_dict(bill_status(ITEMS), bill_data, parse_state)
+            if i == 4:
+                self.assertEqual(updated, None)
+                continue
+            self.assertEqual(saved(updated), saved(expected))
+            self.assertEqual(saved(parse_state), saved(expected_state))
+
+    def test_empty_earlier_action(self):
+        # an action without text between the LOC duplicate and the House
+        # vote: the duplicate is still the action the vote is checked against
+        items = ITEMS[:4] + [item("2010-03-21", "")] + ITEMS[4:]
+        expected = bill_data_for(items)
+        for i in range(len(items) + 1):
+            earlier = items[i:]
+            bill_data = saved(bill_data_for(earlier))
+            parse_state = saved(bills.parse_state_for(bill_status(earlier), bill_data))
+
+            updated = bills.update_bill_json_dict(bill_status(items), bill_data, parse_state)
+            if i in (4, 5):
+                self.assertEqual(updated, None)
+                continue
+            self.assertEqual(saved(updated), saved(expected))
+
+    def test_changed_earlier_action(self):
+        earlier = ITEMS[2:]
+        bill_data = bill_data_for(earlier)
+        parse_state = bills.parse_state_for(bill_status(earlier), bill_data)
+
+        changed = ITEMS[:2] + [item("2010-03-22", "Presented to President on March 22.")] + ITEMS[3:]
+        self.assertEqual(bills.update_bill_json_dict(bill_status(changed), bill_data, parse_state), None)
+        self.assertEqual(bills.update_bill_json_dict(bill_status(ITEMS[3:]), bill_data, parse_state), None)
+
+    def test_changed_fields(self):
+        earlier = ITEMS[2:]
+        bill_data = bill_data_for(earlier)
+        parse_state = bills.parse_state_for(bill_status(earlier), bill_data)
+
+        self.assertEqual(bills.update_bill_json_dict(bill_status(ITEMS, title="Another title"), bill_data, parse_state), None)
+        self.assertNotEqual(bills.update_bill_json_dict(bill_status(ITEMS, latestAction={"text": "Signed by President."}), bill_data, parse_state), None)
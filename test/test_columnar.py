@@ -0,0 +1,110 @@
+import unittest
+import json
+import glob
+import os
+import shutil
+import tempfile
+
+from congress import columnar, identifiers, recordstore
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy isn't installed")
+class Columnar(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = recordstore.RecordStore(os.path.join(self.root, "records"))
+        self.bills = {}
+        for filename in glob.glob("test/fixtures/govtrack/bill-*.json"):
+            with open(filename) as f:
+                bill = json.load(f)
+            # as if they were all in one Congress
+            bill["bill_id"] = "%s%s-113" % (bill["bill_type"], bill["number"])
+            self.bills[bill["bill_id"]] = bill
+            self.put(bill)
+        self.directory = os.path.join(self.root, "columnar")
+        self.read = []
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def put(self, bill):
+        id = identifiers.BillId.parse(bill["bill_id"])
+        self.store.put(id, bill)
+        # a new modification time, however quickly the tests run
+        stat = os.stat(self.store.path(id))
+        os.utime(self.store.path(id), (stat.st_atime, stat.st_mtime + 10))
+
+    def load(self, path):
+        self.read.append(path)
+        return self.store.load(path).data
+
+    def export(self, directory=None, force=False):
+        return columnar.export(self.store.paths(113, "bills"), self.load, directory or self.directory, force=force, parquet=False)
+
+    def tables(self, directory=None):
+        return [columnar.load_table(directory or self.directory, name) for name in ("bills", "actions")]
+
+    def test_export(self):
+        self.assertEqual(self.export(), (len(self.bills), len(self.bills)))
+        bills, actions = self.tables()
+
+        # in the order of the record files
+        bill_ids = [self.store.load(path).id for path in self.store.paths(113, "bills")]
+        self.assertEqual(list(bills["bill_id"]), bill_ids)
+        self.assertEqual(len(actions["bill"]), sum(len(bill["actions"]) for bill in self.bills.values()))
+
+        row = bill_ids.index("hr3590-113")
+        bill = self.bills["hr3590-113"]
+        self.assertEqual(columnar.decode(bills, "status")[row], "ENACTED:SIGNED")
+        self.assertEqual(bills["status"][row], columnar.code(bills, "status", "ENACTED:SIGNED"))
+        self.assertEqual(columnar.code(bills, "status", "NOT A STATUS"), -1)
+        self.assertEqual(columnar.decode(bills, "sponsor")[row], bill["sponsor"]["bioguide_id"])
+        self.assertEqual(bills["introduced_at"][row], numpy.datetime64(bill["introduced_at"]))
+        self.assertTrue(bills["enacted"][row])
+        self.assertEqual(bills["actions"][row], len(bill["actions"]))
+        self.assertEqual(bills["bill_type"].dtype, numpy.int8)
+
+        these = actions["bill"] == row
+        self.assertEqual(list(columnar.decode(actions, "type")[these]), [action["type"] for action in bill["actions"]])
+        self.assertEqual(list(actions["acted_at"][these].astype(str)), [action["acted_at"][:10] for action in bill["actions"]])
+
+    def test_incremental(self):
+        self.export()
+
+        # nothing changed
+        self.read = []
+        self.assertEqual(self.export(), (len(self.bills), 0))
+        self.assertEqual(self.read, [])
+
+        # a changed bill and a removed one
+        bill = self.bills["hr3590-113"]
+        bill["status"] = "PASS_OVER:HOUSE"
+        bill["actions"] = bill["actions"][:2]
+        self.put(bill)
+        self.store.delete(identifiers.BillId.parse("s968-113"))
+        self.assertEqual(self.export(), (len(self.bills) - 1, 1))
+        self.assertEqual(self.read, [self.store.path(identifiers.BillId.parse("hr3590-113"))])
+
+        # the same tables as exporting everything again
+        other = os.path.join(self.root, "other")
+        self.export(other)
+        for updated, exported in zip(self.tables(), self.tables(other)):
+            self.assertEqual(sorted(updated), sorted(exported))
+            for name in updated:
+                if name != "generation":
+                    self.assertTrue(numpy.array_equal(updated[name], exported[name]), name)
+
+    def test_interrupted(self):
+        # tables that weren't written together are exported again in full
+        self.export()
+        bills, actions = self.tables()
+        bills["generation"] = numpy.array(u"other")
+        columnar.save_table(self.directory, "bills", bills)
+        self.read = []
+        self.assertEqual(self.export(), (len(self.bills), len(self.bills)))
@@ -0,0 +1,67 @@
+import unittest
+import os
+import shutil
+import subprocess
+import tempfile
+
+import utils
+
+# cloning and updating congress-legislators from a local mirror
+
+
+class CongressLegislatorsRepo(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (os.getcwd(), utils.config, utils.has_congress_legislators_repo, utils.congress_legislators_commit,
+                      os.environ.get("UPDATE_CONGRESS_LEGISLATORS"))
+        os.environ.pop("UPDATE_CONGRESS_LEGISLATORS", None)
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+
+        self.mirror = os.path.join(self.tmp, "mirror")
+        self.git("init", "-q", self.mirror)
+        self.git("checkout", "-q", "-b", "master", cwd=self.mirror)
+        self.commit("legislators-current.yaml", "[]")
+
+    def tearDown(self):
+        cwd, utils.config, utils.has_congress_legislators_repo, utils.congress_legislators_commit, update = self.saved
+        os.chdir(cwd)
+        if update is not None:
+            os.environ["UPDATE_CONGRESS_LEGISLATORS"] = update
+        shutil.rmtree(self.tmp)
+
+    def git(self, *args, **kwargs):
+        subprocess.check_call(["git", "-c", "user.name=test", "-c", "user.email=test@example.com"] + list(args), **kwargs)
+
+    def commit(self, filename, content):
+        with open(os.path.join(self.mirror, filename), "w") as f:
+            f.write(content)
+        self.git("add", filename, cwd=self.mirror)
+        self.git("commit", "-q", "-m", "update", cwd=self.mirror)
+        return utils.git_head(self.mirror)
+
+    def require(self, ttl):
+        utils.config = {"congress_legislators": {"source": self.mirror, "ttl": ttl}}
+        utils.has_congress_legislators_repo = False
+        utils.require_congress_legislators_repo()
+
+    def test_update(self):
+        first = utils.git_head(self.mirror)
+        self.require(3600)
+        self.assertEqual(utils.congress_legislators_commit, first)
+        self.assertEqual(utils.read("cache/congress-legislators-HEAD"), first)
+
+        # not updated again within the TTL
+        second = self.commit("legislators-current.yaml", "[{}]")
+        self.require(3600)
+        self.assertEqual(utils.congress_legislators_commit, first)
+
+        self.require(0)
+        self.assertEqual(utils.congress_legislators_commit, second)
+        self.assertEqual(utils.read("cache/congress-legislators-HEAD"), second)
+
+        # or at all
+        self.commit("legislators-current.yaml", "[{}, {}]")
+        os.environ["UPDATE_CONGRESS_LEGISLATORS"] = "NO"
+        self.require(0)
+        self.assertEqual(utils.congress_legislators_commit, second)
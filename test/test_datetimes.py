@@ -0,0 +1,58 @@
+import unittest
+import datetime
+
+from congress import datetimes
+
+# the fast paths in congress.datetimes must give the same results as
+# strptime and pytz
+
+
+def pytz_format(obj):
+    return datetimes.eastern_time_zone.localize(obj.replace(microsecond=0)).isoformat()
+
+
+class Datetimes(unittest.TestCase):
+
+    def test_format_across_dst(self):
+        # every 47 minutes through years spanning the 2007 change in the DST rules,
+        # and every minute of the nights the clocks change
+        for year in (1974, 2007, 2013):
+            t = datetime.datetime(year, 1, 1, 0, 0, 30, 123456)
+            while t.year == year:
+                self.assertEqual(datetimes.format_datetime(t), pytz_format(t))
+                t += datetime.timedelta(minutes=47)
+        for night in ((2013, 3, 10), (2013, 11, 3), (2006, 4, 2), (2006, 10, 29), (1974, 1, 6)):
+            t = datetime.datetime(*night)
+            while t.day == night[2]:
+                self.assertEqual(datetimes.format_datetime(t), pytz_format(t))
+                t += datetime.timedelta(minutes=1)
+
+        self.assertEqual(datetimes.format_datetime(datetime.datetime(2013, 3, 10, 1, 59, 59)), "2013-03-10T01:59:59-05:00")
+        self.assertEqual(datetimes.format_datetime(datetime.datetime(2013, 3, 10, 3, 0, 0)), "2013-03-10T03:00:00-04:00")
+        self.assertEqual(datetimes.format_datetime(datetime.datetime(2013, 11, 3, 1, 30, 0)), "2013-11-03T01:30:00-05:00")
+        self.assertEqual(datetimes.eastern_offset(datetime.date(2013, 3, 10)), None)
+        self.assertEqual(datetimes.eastern_offset(datetime.date(2013, 3, 11)), "-04:00")
+
+    def test_format_other_values(self):
+        self.assertEqual(datetimes.format_datetime(datetime.date(2013, 3, 10)), "2013-03-10")
+        self.assertEqual(datetimes.format_datetime("2013-03-10"), "2013-03-10")
+        self.assertEqual(datetimes.format_datetime(None), None)
+
+    def test_parse(self):
+        for value, format in (
+                ("2013-03-10 14:05:09", "%Y-%m-%d %H:%M:%S"),
+                ("2013-03-10T14:05:09", "%Y-%m-%dT%H:%M:%S"),
+                ("2013-3-10 14:05:09", "%Y-%m-%d %H:%M:%S"),
+                ("10-Mar-2013 2:05 PM", "%d-%b-%Y %I:%M %p")):
+            self.assertEqual(datetimes.parse_datetime(value, format), datetime.datetime.strptime(value, format))
+        self.assertEqual(datetimes.parse_date("2013-03-10"), datetime.date(2013, 3, 10))
+
+        for value, format in (
+                ("2013-02-30 14:05:09", "%Y-%m-%d %H:%M:%S"),
+                ("2013-03-10 24:05:09", "%Y-%m-%d %H:%M:%S"),
+                ("2013-03-10T14:05:09", "%Y-%m-%d %H:%M:%S"),
+                ("2013-03-10 +4:05:09", "%Y-%m-%d %H:%M:%S"),
+                ("2013-03-10 14:05", "%Y-%m-%d %H:%M:%S")):
+            self.assertRaises(ValueError, datetime.datetime.strptime, value, format)
+            self.assertRaises(ValueError, datetimes.parse_datetime, value, format)
+        self.assertRaises(ValueError, datetimes.parse_date, "2013-02-30")
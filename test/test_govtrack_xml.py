@@ -0,0 +1,136 @@
+import unittest
+import glob
+import io
+import json
+import os.path
+import shutil
+import tempfile
+from lxml import etree
+
+import utils
+import bills
+import amendments
+import vote_info
+import rerender
+from congress.xmlwriter import XMLWriter
+
+# The GovTrack XML files in test/fixtures/govtrack were written by the
+# tree-building writers that the streaming writers replaced. The streaming
+# writers must write the same bytes.
+
+FIXTURES = "test/fixtures/govtrack"
+
+
+def cases(kind):
+    for fn in sorted(glob.glob("%s/%s-*.json" % (FIXTURES, kind))):
+        name = fn[:-len(".json")]
+        for suffix, options in (("", {}), ("-govtrack", {"govtrack": True})):
+            if os.path.exists(name + suffix + ".xml"):
+                with open(fn) as f:
+                    data = json.load(f)
+                with open(name + suffix + ".xml") as f:
+                    yield name + suffix, data, options, f.read()
+
+
+class GovTrackXML(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (utils.translate_legislator_id, utils.write, utils.record_legislator_ids, utils.index_legislator_ids)
+        utils.translate_legislator_id = lambda id_type, id, to: int(id[1:])
+
+    def tearDown(self):
+        utils.translate_legislator_id, utils.write, utils.record_legislator_ids, utils.index_legislator_ids = self.saved
+
+    def test_bills(self):
+        count = 0
+        for name, data, options, expected in cases("bill"):
+            self.assertEqual(bills.create_govtrack_xml(data, options), expected, name)
+            count += 1
+        self.assertEqual(count, 12)
+
+    def test_amendments(self):
+        count = 0
+        for name, data, options, expected in cases("amendment"):
+            self.assertEqual(amendments.create_govtrack_xml(data, options), expected, name)
+            count += 1
+        self.assertEqual(count, 4)
+
+    def test_votes(self):
+        # with --diff the file is written with utils.write
+        written = {}
+        utils.write = lambda content, destination, options={}: written.__setitem__(destination, content)
+        utils.record_legislator_ids = lambda: None
+        utils.index_legislator_ids = lambda *args: None
+
+        count = 0
+        for name, vote, options, expected in cases("vote"):
+            for field in ("date", "updated_at"):
+                vote[field] = rerender.parse_datetime(vote[field])
+            id_type = "bioguide" if "voteview" in vote["source_url"] else None
+            vote_info.output_vote_xml(vote, dict(options, diff=True), id_type)
+            self.assertEqual(written[vote_info.output_for_vote(vote["vote_id"], "xml")], expected, name)
+            count += 1
+        self.assertEqual(count, 5)
+
+    def test_escaping(self):
+        # against lxml, which the writers used to serialize with
+        for value in ("plain", "", u"caf\u00e9 \U0001F600", "&<>\"'\t\r\n", u"\x7f\x85\u2028"):
+            for encoding in (None, "utf8"):
+                root = etree.Element("root", value=value)
+                etree.SubElement(root, "text").text = value
+                f = io.BytesIO()
+                xml = XMLWriter(f, encoding)
+                xml.start("root", [("value", value)])
+                xml.leaf("text", value)
+                xml.end()
+                self.assertEqual(f.getvalue(), etree.tostring(root, pretty_print=True, encoding=encoding))
+
+        for value in ("\x07", u"\x00", "caf\xc3\xa9", u"\ufffe"):
+            self.assertRaises(ValueError, XMLWriter(io.BytesIO()).leaf, "text", value)
+        self.assertRaises(TypeError, XMLWriter(io.BytesIO()).leaf, "text", 1)
+
+    def test_output_file(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "113", "data.xml")
+            with utils.xml_output(path) as xml:
+                xml.leaf("bill", "first")
+            self.assertEqual(utils.read(path), "<bill>first</bill>\n")
+
+            # not replaced if writing the document fails
+            def fail():
+                with utils.xml_output(path) as xml:
+                    xml.start("bill")
+                    xml.leaf("text", 1)
+            self.assertRaises(TypeError, fail)
+            self.assertEqual(utils.read(path), "<bill>first</bill>\n")
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["data.xml"])
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_outputs(self):
+        self.assertEqual(utils.output_formats({}), frozenset(["json", "xml"]))
+        self.assertEqual(utils.output_formats({"outputs": "json"}), frozenset(["json"]))
+        self.assertEqual(utils.output_formats({"outputs": "xml, json"}), frozenset(["json", "xml"]))
+        self.assertRaises(ValueError, utils.output_formats, {"outputs": "json,yaml"})
+
+        # renderers that aren't selected aren't run at all
+        written = {}
+        utils.write = lambda content, destination, options={}: written.__setitem__(destination, content)
+        utils.record_legislator_ids = lambda: None
+        utils.index_legislator_ids = lambda *args: None
+        name, vote, options, expected = next(cases("vote"))
+        for field in ("date", "updated_at"):
+            vote[field] = rerender.parse_datetime(vote[field])
+        json_path = vote_info.output_for_vote(vote["vote_id"], "json")
+        xml_path = vote_info.output_for_vote(vote["vote_id"], "xml")
+
+        for outputs, expected_paths in ((None, [json_path, xml_path]), ("json", [json_path]), ("xml", [xml_path])):
+            written.clear()
+            vote_info.output_vote(vote, dict(options, diff=True, outputs=outputs))
+            self.assertEqual(sorted(written), sorted(expected_paths), outputs)
+
+        def translate(*args):
+            raise AssertionError("legislator IDs translated for JSON output")
+        utils.translate_legislator_id = translate
+        vote_info.output_vote(vote, dict(options, diff=True, outputs="json", govtrack=True))
@@ -0,0 +1,51 @@
+import unittest
+
+import utils
+from congress import identifiers
+
+# parsed IDs and the output paths built from them
+
+
+class Identifiers(unittest.TestCase):
+
+    def test_bill_id(self):
+        bill_id = identifiers.BillId.parse("hres12-113")
+        self.assertEqual(bill_id.split(), ("hres", "12", "113"))
+        self.assertEqual((bill_id.bill_type, bill_id.number, bill_id.congress), ("hres", "12", "113"))
+        self.assertEqual(bill_id.path, "113/bills/hres/hres12")
+        self.assertEqual(str(bill_id), "hres12-113")
+        self.assertEqual(utils.split_bill_id("hres12-113"), ("hres", "12", "113"))
+
+    def test_bill_version_id(self):
+        version_id = identifiers.BillVersionId.parse("hr1234-113-ih")
+        self.assertEqual(version_id.split(), ("hr", "1234", "113", "ih"))
+        self.assertEqual(version_id.path, "113/bills/hr/hr1234/text-versions/ih")
+        self.assertEqual(version_id.bill_id(), identifiers.BillId.parse("hr1234-113"))
+
+    def test_amendment_id(self):
+        self.assertEqual(identifiers.AmendmentId.parse("samdt5-113").path, "113/amendments/samdt/samdt5")
+
+    def test_vote_id(self):
+        vote_id = identifiers.VoteId.parse("h12-113.2013")
+        self.assertEqual(vote_id.split(), ("h", "12", "113", "2013"))
+        self.assertEqual(vote_id.path, "113/votes/2013/h12")
+        self.assertEqual(identifiers.VoteId.parse("s3-1.2").path, "1/votes/2/s3")
+
+    def test_nomination_id(self):
+        nomination_id = identifiers.NominationId.parse("PN64-01-111")
+        self.assertEqual(nomination_id.split(), ("PN", "64-01", "111"))
+        self.assertEqual(nomination_id.path, "111/nominations/64-01")
+        self.assertEqual(utils.split_nomination_id("not a nomination"), (None, None, None))
+
+    def test_invalid(self):
+        for cls, value in ((identifiers.BillId, "hr-113"), (identifiers.BillVersionId, "hr1234-113"),
+                           (identifiers.VoteId, "x12-113.2013"), (identifiers.NominationId, "PN-113")):
+            self.assertRaises(ValueError, cls.parse, value)
+        self.assertRaises(ValueError, utils.split_bill_id, "hr-113")
+
+    def test_cached_and_immutable(self):
+        bill_id = identifiers.BillId.parse("s5-112")
+        self.assertIs(identifiers.BillId.parse("s5-112"), bill_id)
+        self.assertEqual(identifiers.BillId("s", "5", "112"), bill_id)
+        self.assertNotEqual(identifiers.AmendmentId.parse("s5-112"), bill_id)
+        self.assertRaises(AttributeError, setattr, bill_id, "number", "6")
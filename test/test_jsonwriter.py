@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import unittest
+import datetime
+import glob
+import json
+
+import utils
+import rerender
+from congress import jsonwriter, records
+
+# The JSON written with congress.jsonwriter must be exactly what json.dumps
+# wrote before.
+
+
+def expected(data, default=None):
+    return json.dumps(data, sort_keys=True, indent=2, default=default)
+
+
+class Subclass(dict):
+    pass
+
+
+class JSONWriter(unittest.TestCase):
+
+    def test_fixtures(self):
+        count = 0
+        for fn in sorted(glob.glob("test/fixtures/govtrack/*.json")):
+            with open(fn) as f:
+                data = json.load(f)
+            if fn.startswith("test/fixtures/govtrack/vote-"):
+                # as vote_info has them when it writes the vote
+                for field in ("date", "updated_at"):
+                    data[field] = rerender.parse_datetime(data[field])
+                for voters in data["votes"].values():
+                    voters[:] = [records.Voter.from_dict(voter) if isinstance(voter, dict) else voter
+                                 for voter in voters]
+            self.assertEqual(jsonwriter.fast_dumps(data, utils.json_default), expected(data, utils.json_default), fn)
+            count += 1
+        self.assertEqual(count, 18)
+
+    def test_values(self):
+        for value in (
+            None, True, False, 0, -12, 10 ** 30, 0.1, 1e100, 3.0, float("nan"), float("inf"), -float("inf"),
+            "", "plain", "caf\xc3\xa9", u"café \U0001F600", "\"quoted\"\\\n\t\x00", u" ",
+            [], {}, (), [[]], [{}], {"a": []}, (1, (2, 3)),
+            {"b": 1, u"a": [1, {"c": None, "b": {}}], "c": (True, False)},
+            {1: "int", 2.5: "float", None: "null", 3L: "long"}, {True: "true", False: "false"},
+            Subclass(b=1, a=2), [Subclass()],
+        ):
+            self.assertEqual(jsonwriter.fast_dumps(value), expected(value), repr(value))
+            self.assertIs(type(jsonwriter.fast_dumps(value)), type(expected(value)))
+
+    def test_default(self):
+        value = {"at": datetime.datetime(2013, 3, 10, 12, 0), "on": datetime.date(2013, 3, 10), "other": object()}
+        self.assertEqual(jsonwriter.fast_dumps(value, utils.format_datetime), expected(value, utils.format_datetime))
+        self.assertRaises(TypeError, jsonwriter.fast_dumps, value)
+        self.assertRaises(TypeError, jsonwriter.fast_dumps, {(1, 2): 1})
+
+    def test_backends(self):
+        try:
+            data = {"b": [1, 2], "a": "x"}
+            jsonwriter.use_backend("json")
+            self.assertEqual(jsonwriter.dumps(data), expected(data))
+            jsonwriter.register_backend("compact", lambda obj, default: json.dumps(obj, sort_keys=True))
+            jsonwriter.use_backend("compact")
+            self.assertEqual(utils.json_dumps(data), '{"a": "x", "b": [1, 2]}')
+            self.assertRaises(ValueError, jsonwriter.use_backend, "missing")
+        finally:
+            jsonwriter.backends.pop("compact", None)
+            jsonwriter.use_backend("fast")
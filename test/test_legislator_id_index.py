@@ -0,0 +1,134 @@
+import unittest
+import datetime
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import utils
+import rerender
+
+# the reverse index from output files to the legislator IDs they were rendered with
+
+
+class LegislatorIdIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (utils._legislator_ids_db, utils._legislator_id_index)
+        self.tmp = tempfile.mkdtemp()
+        self.legislators = [
+            {"id": {"bioguide": "A000001", "lis": "S001", "govtrack": 400001, "fec": ["H0XX01001", "S2XX01001"]}},
+            {"id": {"bioguide": "B000002", "govtrack": 400002}},
+        ]
+        self.load_legislators()
+        utils.legislator_id_index(":memory:")
+
+    def tearDown(self):
+        utils._legislator_ids_db, utils._legislator_id_index = self.saved
+        utils.legislator_id_references = None
+        shutil.rmtree(self.tmp)
+
+    def load_legislators(self):
+        # as if the congress-legislators files changed
+        filename = os.path.join(self.tmp, "legislator-ids-%d.sqlite3" % id(self.legislators[-1]))
+        utils.build_legislator_ids_db(filename, self.legislators, "legislators")
+        utils._legislator_ids_db = sqlite3.connect(filename)
+
+    def render(self, output_path, kind, ids):
+        utils.record_legislator_ids()
+        for id_type, id_value in ids:
+            try:
+                utils.translate_legislator_id(id_type, id_value, "govtrack")
+            except utils.UnmatchedIdentifer:
+                pass
+        utils.index_legislator_ids(output_path, kind, {"govtrack": True})
+        utils.save_legislator_id_index()
+
+    def test_changed_ids(self):
+        self.render("data/113/bills/hr/hr1/data.xml", "bill", [("bioguide", "A000001"), ("bioguide", "B000002")])
+        self.render("data/113/votes/2013/s1/data.xml", "vote", [("lis", "S001"), ("lis", "S999")])
+        self.render("data/113/votes/2013/h1/data.xml", "vote", [("bioguide", "B000002")])
+        self.render("data/113/amendments/samdt1/data.xml", "amendment", [])
+        self.assertEqual(utils.outputs_with_changed_legislator_ids(), [])
+
+        # a new mapping for an ID that didn't have one
+        self.legislators.append({"id": {"lis": "S999", "govtrack": 400003}})
+        self.load_legislators()
+        self.assertEqual(utils.outputs_with_changed_legislator_ids(), [("data/113/votes/2013/s1/data.xml", "vote")])
+
+        # a changed mapping
+        self.legislators[1] = {"id": {"bioguide": "B000002", "govtrack": 400004}}
+        self.load_legislators()
+        self.assertEqual(utils.outputs_with_changed_legislator_ids(), [
+            ("data/113/bills/hr/hr1/data.xml", "bill"),
+            ("data/113/votes/2013/h1/data.xml", "vote"),
+            ("data/113/votes/2013/s1/data.xml", "vote"),
+        ])
+
+        # re-rendering a file replaces its entries
+        self.render("data/113/bills/hr/hr1/data.xml", "bill", [("bioguide", "A000001"), ("bioguide", "B000002")])
+        self.assertEqual(len(utils.outputs_with_changed_legislator_ids()), 2)
+
+        # and without --govtrack, removes them
+        utils.record_legislator_ids()
+        utils.index_legislator_ids("data/113/votes/2013/h1/data.xml", "vote", {})
+        utils.save_legislator_id_index()
+        self.assertEqual(utils.outputs_with_changed_legislator_ids(), [("data/113/votes/2013/s1/data.xml", "vote")])
+
+    def test_saved_once(self):
+        # entries wait for the end of process_set, and without --govtrack
+        # and an index there's nothing to open
+        saved = (utils.cache_dir, utils._legislator_id_index)
+        utils.cache_dir = lambda: self.tmp
+        utils._legislator_id_index = None
+        utils._pending_legislator_ids.clear()
+        try:
+            utils.record_legislator_ids()
+            utils.index_legislator_ids("data/113/bills/hr/hr1/data.xml", "bill", {})
+            utils.process_set([], None, {})
+            self.assertFalse(os.path.exists(utils.legislator_id_index_filename()))
+
+            utils.record_legislator_ids()
+            utils.translate_legislator_id("bioguide", "A000001", "govtrack")
+            utils.index_legislator_ids("data/113/bills/hr/hr1/data.xml", "bill", {"govtrack": True})
+            self.assertFalse(os.path.exists(utils.legislator_id_index_filename()))
+            utils.process_set([], None, {})
+            self.assertEqual(utils.legislator_id_index().execute("SELECT output_path, id FROM legislator_ids").fetchall(),
+                             [("data/113/bills/hr/hr1/data.xml", "A000001")])
+        finally:
+            utils.cache_dir, utils._legislator_id_index = saved
+
+    def test_legislator_ids(self):
+        self.assertEqual(utils.translate_legislator_id("lis", "S001", "bioguide"), "A000001")
+        self.assertEqual(utils.translate_legislator_id("fec", "S2XX01001", "govtrack"), 400001)
+        self.assertEqual(utils.translate_legislator_id("govtrack", 400002, "bioguide"), "B000002")
+        self.assertRaises(utils.UnmatchedIdentifer, utils.translate_legislator_id, "govtrack", "400002", "bioguide")
+        self.assertRaises(utils.UnmatchedIdentifer, utils.translate_legislator_id, "bioguide", "B000002", "lis")
+        self.assertEqual(utils.get_person_id("bioguide", "A000001", "fec"), ["H0XX01001", "S2XX01001"])
+        self.assertRaises(KeyError, utils.get_person_id, "bioguide", "C000003", "govtrack")
+
+    def test_legislator_ids_db(self):
+        saved = (utils.cache_dir, utils.legislators_fingerprint, utils.yaml_load)
+        loaded = []
+        utils.cache_dir = lambda: self.tmp
+        utils.legislators_fingerprint = lambda: "legislators"
+        utils.yaml_load = lambda filename: loaded.append(filename) or self.legislators[:1]
+        try:
+            utils._legislator_ids_db = None
+            self.assertEqual(utils.legislator_ids("lis", "S001")["bioguide"], "A000001")
+            self.assertEqual(len(loaded), 2)
+            self.assertFalse([name for name in os.listdir(self.tmp) if name.endswith(".new")])
+
+            # opened read-only
+            self.assertRaises(sqlite3.OperationalError, utils.legislator_ids_db().execute, "DELETE FROM legislator_ids")
+
+            # another process opens it without building it again
+            utils._legislator_ids_db = None
+            self.assertEqual(utils.legislator_ids("govtrack", 400001)["lis"], "S001")
+            self.assertEqual(len(loaded), 2)
+        finally:
+            utils.cache_dir, utils.legislators_fingerprint, utils.yaml_load = saved
+
+    def test_parse_datetime(self):
+        for value in (datetime.datetime(2013, 1, 3, 12, 5, 0), datetime.datetime(2013, 7, 3, 9, 0, 0), datetime.date(2013, 7, 3)):
+            self.assertEqual(rerender.parse_datetime(utils.format_datetime(value)), value)
@@ -0,0 +1,103 @@
+import unittest
+import datetime
+import os
+import shutil
+import tempfile
+
+import utils
+
+# matching names in roll call votes to legislators, against a small stand-in
+# for the congress-legislators files
+
+
+def term(type, state, party, start, end):
+    return {"type": type, "state": state, "party": party, "start": start, "end": end}
+
+LEGISLATORS = [
+    {"id": {"bioguide": "C000001", "lis": "S101"}, "name": {"first": "Helen", "last": "Chenoweth Hage"},
+     "other_names": [{"last": "Chenoweth", "end": "1999-06-30"}],
+     "terms": [term("rep", "ID", "Republican", "1995-01-04", "2001-01-03")]},
+    {"id": {"bioguide": "M000001"}, "name": {"first": "Juanita", "last": "Millender-McDonald"},
+     "terms": [term("rep", "CA", "Democrat", "1996-03-26", "2007-04-22")]},
+    {"id": {"bioguide": "S000001"}, "name": {"first": u"Jos\u00e9", "last": u"Serrano"},
+     "terms": [term("rep", "NY", "Democrat", "1990-03-28", "2021-01-03")]},
+    {"id": {"bioguide": "S000002"}, "name": {"first": "Edward", "nickname": "Eddie", "last": "Smith"},
+     "terms": [term("rep", "NY", "Republican", "1993-01-05", "1997-01-03")]},
+    {"id": {"bioguide": "S000003"}, "name": {"first": "Anne", "last": "Smith"},
+     "terms": [term("rep", "NY", "Republican", "1995-01-04", "1999-01-03")]},
+    {"id": {"bioguide": "L000001"}, "name": {"first": "Greg", "last": "Laughlin"},
+     "terms": [term("rep", "TX", "Democrat", "1989-01-03", "1995-06-25"), term("rep", "TX", "Republican", "1995-06-26", "1997-01-03")]},
+]
+
+
+class LookupLegislator(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (utils.lookup_legislator_cache, utils.yaml_load, utils.require_congress_legislators_repo, utils.legislators_fingerprint)
+        utils.lookup_legislator_cache = {}
+        utils.yaml_load = lambda path: LEGISLATORS if "historical" in path else []
+        utils.require_congress_legislators_repo = lambda: None
+        utils.legislators_fingerprint = lambda: "legislators"
+        self.memo_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        utils.lookup_legislator_cache, utils.yaml_load, utils.require_congress_legislators_repo, utils.legislators_fingerprint = self.saved
+        shutil.rmtree(self.memo_dir)
+
+    def lookup(self, name, state, party, when, role_type="rep", exclude=set(), memo=None):
+        when = datetime.date(*map(int, when.split("-")))
+        return utils.lookup_legislator(utils.congress_from_legislative_year(when.year), role_type, name, state, party, when, "bioguide", exclude, memo)
+
+    def test_last_name(self):
+        self.assertEqual(self.lookup("Chenoweth", "ID", "R", "1997-03-01"), "C000001")
+        self.assertEqual(self.lookup("Chenoweth Hage", "ID", "R", "2000-03-01"), "C000001")
+        self.assertEqual(self.lookup("Hage", "ID", "R", "2000-03-01"), "C000001")
+        self.assertEqual(self.lookup("Millender McDonald", "CA", "D", "2000-03-01"), "M000001")
+        self.assertEqual(self.lookup("Serrano, Jose", "NY", "D", "2000-03-01"), "S000001")
+
+        # wrong state, party, chamber, or date
+        self.assertEqual(self.lookup("Chenoweth", "CA", "R", "1997-03-01"), None)
+        self.assertEqual(self.lookup("Chenoweth", "ID", "D", "1997-03-01"), None)
+        self.assertEqual(self.lookup("Chenoweth", "ID", "R", "1997-03-01", role_type="sen"), None)
+        self.assertEqual(self.lookup("Chenoweth", "ID", "R", "1993-03-01"), None)
+
+    def test_first_name(self):
+        # ambiguous without the first name
+        self.assertEqual(self.lookup("Smith", "NY", "R", "1996-03-01"), None)
+        self.assertEqual(self.lookup("Smith", "NY", "R", "1994-03-01"), "S000002")
+        self.assertEqual(self.lookup("Smith, Anne", "NY", "R", "1996-03-01"), "S000003")
+        self.assertEqual(self.lookup("Smith, Eddie", "NY", "R", "1996-03-01"), "S000002")
+        self.assertEqual(self.lookup("Smith, E. B.", "NY", "R", "1996-03-01"), "S000002")
+        self.assertEqual(self.lookup("Smith", "NY", "R", "1996-03-01", exclude=set(["S000003"])), "S000002")
+
+    def test_party_switcher(self):
+        self.assertEqual(self.lookup("Laughlin", "TX", "D", "1996-03-01"), "L000001")
+        self.assertEqual(self.lookup("Laughlin", "TX", "R", "1994-03-01"), "L000001")
+
+    def test_memo(self):
+        memo = utils.LegislatorLookupMemo(os.path.join(self.memo_dir, "voters.json"))
+        for when in ("1995-03-01", "1996-03-01", "1997-03-01", "1999-03-01"):
+            for name in ("Chenoweth", "Smith", "Smith, Anne", "Smith, E. B.", "Laughlin"):
+                for state in ("ID", "NY", "TX"):
+                    for exclude in (set(), set(["S000003"])):
+                        self.assertEqual(self.lookup(name, state, "R", when, exclude=exclude, memo=memo),
+                                         self.lookup(name, state, "R", when, exclude=exclude))
+
+        # Chenoweth's other name ends mid-session, so lookups are remembered
+        # separately before and after but only once within a period
+        memo = utils.LegislatorLookupMemo(os.path.join(self.memo_dir, "voters.json"))
+        for when in ("1999-01-06", "1999-03-01", "1999-06-30", "1999-07-01", "1999-12-01"):
+            self.lookup("Chenoweth", "ID", "R", when, memo=memo)
+        self.assertEqual(memo.results.values(), [["C000001"], ["C000001"]])
+
+        # saved and reloaded in the next run
+        for key in memo.results:
+            memo.results[key] = ["X000001"]
+        memo.save()
+        memo = utils.LegislatorLookupMemo(os.path.join(self.memo_dir, "voters.json"))
+        self.assertEqual(self.lookup("Chenoweth", "ID", "R", "1999-03-01", memo=memo), "X000001")
+
+        # but not after the legislators change
+        utils.legislators_fingerprint = lambda: "other legislators"
+        memo = utils.LegislatorLookupMemo(os.path.join(self.memo_dir, "voters.json"))
+        self.assertEqual(self.lookup("Chenoweth", "ID", "R", "1999-03-01", memo=memo), "C000001")
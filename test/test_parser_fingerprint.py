@@ -0,0 +1,80 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+import utils
+import vote_info
+
+from congress import bill_info, datetimes, identifiers, records, recordstore, rules, text
+
+
+class ParserFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_fingerprint(self):
+        fingerprint = utils.parser_fingerprint((bill_info, rules), {})
+        self.assertEqual(fingerprint, utils.parser_fingerprint((bill_info, rules), {"force": True}))
+        self.assertNotEqual(fingerprint, utils.parser_fingerprint((bill_info, rules), {"govtrack": True}))
+        # the output formats are stamped separately
+        self.assertEqual(fingerprint, utils.parser_fingerprint((bill_info, rules), {"outputs": "json"}))
+        self.assertNotEqual(fingerprint, utils.parser_fingerprint((rules,), {}))
+        self.assertNotEqual(fingerprint, vote_info.parser_fingerprint({}))
+
+    def test_shared_modules(self):
+        # a fix to code every parser uses makes their outputs stale
+        for module in (utils, text, datetimes, identifiers, records):
+            self.assertIn(module, utils.shared_parser_modules())
+        self.assertNotEqual(utils.parser_fingerprint((), {}), utils.parser_fingerprint((rules,), {}))
+
+    def test_vote_records(self):
+        # stored vote records whose voters were looked up by name are parsed
+        # again when congress-legislators changes; others don't need it
+        saved = (utils._legislators_fingerprint, utils.legislators_fingerprint)
+        try:
+            utils._legislators_fingerprint = "a"
+            fingerprint = vote_info.record_fingerprint(True)
+            self.assertEqual(fingerprint, vote_info.record_fingerprint(True))
+            utils._legislators_fingerprint = "b"
+            self.assertNotEqual(fingerprint, vote_info.record_fingerprint(True))
+
+            def unavailable():
+                raise AssertionError("congress-legislators was used")
+            utils.legislators_fingerprint = unavailable
+            stored = recordstore.StoredRecord("h1-113.2013", {}, None, vote_info.record_fingerprint(), {"legislators": False})
+            self.assertTrue(vote_info.is_current(stored))
+            self.assertNotEqual(stored.fingerprint, fingerprint)
+        finally:
+            utils._legislators_fingerprint, utils.legislators_fingerprint = saved
+
+    def test_stale(self):
+        fingerprint = utils.parser_fingerprint((bill_info, rules), {})
+
+        # outputs without a fingerprint are stale
+        self.assertTrue(utils.is_stale(fingerprint, self.output_dir))
+
+        utils.write_parser_fingerprint(fingerprint, self.output_dir)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, utils.PARSER_FINGERPRINT_FILENAME)))
+        self.assertFalse(utils.is_stale(fingerprint, self.output_dir))
+        self.assertTrue(utils.is_stale(utils.parser_fingerprint((bill_info, rules), {"govtrack": True}), self.output_dir))
+
+    def test_output_formats(self):
+        fingerprint = utils.parser_fingerprint((bill_info, rules), {})
+        utils.write_parser_fingerprint(fingerprint, self.output_dir)
+
+        # an up-to-date tree isn't stale for a run that writes fewer formats,
+        # and that run doesn't make it stale for the default ones
+        self.assertFalse(utils.is_stale(fingerprint, self.output_dir, {"outputs": "json"}))
+        utils.write_parser_fingerprint(fingerprint, self.output_dir, {"outputs": "json"})
+        self.assertFalse(utils.is_stale(fingerprint, self.output_dir))
+
+        # formats written by other code, or never written, are stale
+        self.assertTrue(utils.is_stale(fingerprint, self.output_dir, {"outputs": "json,sqlite"}))
+        utils.write_parser_fingerprint("other", self.output_dir, {"outputs": "xml"})
+        self.assertFalse(utils.is_stale(fingerprint, self.output_dir, {"outputs": "json"}))
+        self.assertTrue(utils.is_stale(fingerprint, self.output_dir))
@@ -0,0 +1,81 @@
+import unittest
+import json
+import pickle
+
+import utils
+from congress import records
+
+# records serialize to the same JSON as the dicts they stand for
+
+
+BILL = {
+    "bill_id": "hr3590-111",
+    "bill_type": "hr",
+    "congress": "111",
+    "sponsor": {"title": "Rep", "name": "Rangel, Charles B.", "district": "15", "state": "NY", "bioguide_id": "R000053", "type": "person"},
+    "cosponsors": [],
+    "actions": [
+        {"acted_at": "2009-09-17", "committees": ["HSWM"], "references": [{"type": None, "reference": "CR H9664"}],
+         "type": "referral", "text": "Referred to the House Committee on Ways and Means.", "status": "REFERRED"},
+        {"acted_at": "2010-03-23", "references": [], "type": "enacted", "text": "Became Public Law No: 111-148.",
+         "law": "public", "congress": "111", "number": "148", "some_new_key": [1, 2]},
+    ],
+    "titles": [{"title": "Patient Protection and Affordable Care Act", "is_for_portion": False, "as": "enacted", "type": "short"}],
+    "summary": None,
+    "subjects": ["Health", "Medicare"],
+    "history": {"active": True, "enacted": True},
+}
+
+
+def to_json(data):
+    return json.dumps(data, sort_keys=True, indent=2, default=utils.json_default)
+
+
+class Records(unittest.TestCase):
+
+    def test_bill(self):
+        bill = records.Bill.from_dict(BILL)
+        self.assertEqual(to_json(bill), to_json(BILL))
+        self.assertEqual(bill, BILL)
+        self.assertTrue(isinstance(bill["actions"][0], records.Action))
+        self.assertTrue(isinstance(bill["actions"][0]["references"][0], records.Reference))
+        self.assertEqual(bill["titles"][0].as_, "enacted")
+
+        # fields that weren't set aren't there, and keys that aren't fields are kept
+        self.assertFalse("status" in bill["actions"][1])
+        self.assertEqual(bill["actions"][1].get("status", "none"), "none")
+        self.assertRaises(KeyError, lambda: bill["actions"][1]["status"])
+        self.assertEqual(bill["actions"][1]["some_new_key"], [1, 2])
+
+    def test_interned(self):
+        first = records.Action.from_dict(json.loads(json.dumps(BILL["actions"][0])))
+        second = records.Action.from_dict(json.loads(json.dumps(BILL["actions"][0])))
+        self.assertIs(first.type, second.type)
+        self.assertIs(first.committees[0], second.committees[0])
+
+        # strings are only interned with strings of the same type
+        self.assertTrue(isinstance(records.intern_string(u"NY"), unicode))
+        self.assertTrue(isinstance(records.intern_string("NY"), str))
+        self.assertEqual(records.intern_string(5), 5)
+
+    def test_interned_bounded(self):
+        saved = (records.strings, records.STRINGS_SIZE)
+        try:
+            records.strings = {str: {}, unicode: {}}
+            records.STRINGS_SIZE = 3
+            for value in (u"a", u"b", u"c", u"c"):
+                records.intern_string(value)
+            self.assertEqual(len(records.strings[unicode]), 3)
+            records.intern_string(u"d")
+            self.assertEqual(records.strings[unicode], {u"d": u"d"})
+        finally:
+            records.strings, records.STRINGS_SIZE = saved
+
+    def test_voter(self):
+        voter = records.Voter(id="R000053", display_name=u"Rangel", party="D", state="NY", vote=1)
+        voter["vote"], voter["voteview_votecode_extra"] = "Yea", None
+        del voter["vote"]
+        self.assertEqual(voter, {"id": "R000053", "display_name": u"Rangel", "party": "D", "state": "NY", "voteview_votecode_extra": None})
+        self.assertNotEqual(voter, "VP")
+        self.assertEqual(pickle.loads(pickle.dumps(voter)), voter)
+        self.assertRaises(AttributeError, setattr, voter, "district", "15")
@@ -0,0 +1,82 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+
+import utils
+import render
+import rerender
+import vote_info
+from congress import identifiers, records, recordstore
+
+
+class RecordStore(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = recordstore.RecordStore(self.root)
+        self.saved = (utils.record_store, utils.write, utils.record_legislator_ids, utils.index_legislator_ids)
+
+    def tearDown(self):
+        utils.record_store, utils.write, utils.record_legislator_ids, utils.index_legislator_ids = self.saved
+        shutil.rmtree(self.root)
+
+    def test_store(self):
+        bill_id = identifiers.BillId.parse("hr1-113")
+        self.assertIsNone(self.store.get(bill_id))
+
+        data = {"bill_id": "hr1-113", "actions": [{"text": "Introduced."}]}
+        source_hash = recordstore.source_hash("<billStatus/>")
+        self.store.put(bill_id, data, source_hash, "fingerprint", {"actions": 1})
+        self.assertEqual(self.store.path(bill_id), os.path.join(self.root, "113/bills/hr/hr1.pickle"))
+        self.assertEqual(os.listdir(os.path.dirname(self.store.path(bill_id))), ["hr1.pickle"])
+
+        stored = self.store.get(bill_id, source_hash, "fingerprint")
+        self.assertEqual(stored.id, "hr1-113")
+        self.assertEqual(stored.data, data)
+        self.assertEqual(stored.state, {"actions": 1})
+
+        # parsed from another source or by other code
+        self.assertIsNone(self.store.get(bill_id, recordstore.source_hash("<billStatus></billStatus>")))
+        self.assertIsNone(self.store.get(bill_id, fingerprint="other"))
+        self.assertEqual(self.store.get(bill_id).data, data)
+
+        self.store.put(identifiers.BillId.parse("s5-113"), data)
+        self.store.put(identifiers.VoteId.parse("h2-113.2013"), data)
+        self.assertEqual(self.store.paths(113, "bills"),
+                         [self.store.path(identifiers.BillId.parse(id)) for id in ("hr1-113", "s5-113")])
+        self.assertEqual(self.store.paths(114, "bills"), [])
+
+        self.store.delete(bill_id)
+        self.store.delete(bill_id)
+        self.assertIsNone(self.store.get(bill_id))
+
+    def test_render(self):
+        # a vote rendered from the store is what rendering it after parsing gives
+        with open("test/fixtures/govtrack/vote-h165-111.2010.json") as f:
+            vote = json.load(f)
+        for field in ("date", "updated_at"):
+            vote[field] = rerender.parse_datetime(vote[field])
+        for voters in vote["votes"].values():
+            voters[:] = [records.Voter.from_dict(voter) if isinstance(voter, dict) else voter for voter in voters]
+
+        written = {}
+        utils.write = lambda content, destination, options={}: written.__setitem__(destination, content)
+        utils.record_legislator_ids = lambda: None
+        utils.index_legislator_ids = lambda *args: None
+        options = {"diff": True}
+
+        vote_info.output_vote(vote, options)
+        expected = dict(written)
+        self.assertEqual(sorted(expected), [vote_info.output_for_vote(vote["vote_id"], format) for format in ("json", "xml")])
+
+        utils.record_store = lambda: self.store
+        self.store.put(identifiers.VoteId.parse(vote["vote_id"]), vote, None, vote_info.record_fingerprint())
+        written.clear()
+        self.assertEqual(render.render(self.store.paths(111, "votes")[0], options), {"ok": True, "saved": True})
+        self.assertEqual(written, expected)
+
+        written.clear()
+        render.render(self.store.paths(111, "votes")[0], dict(options, outputs="xml"))
+        self.assertEqual(sorted(written), [vote_info.output_for_vote(vote["vote_id"], "xml")])
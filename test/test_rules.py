@@ -0,0 +1,145 @@
+import unittest
+import fixtures
+import vote_info
+
+from congress import amendments, bill_info, rules
+
+# the prefiltered rule tables must match exactly what their plain regexes match
+
+
+VOTE_QUESTIONS = [
+    "",
+    "On Passage",
+    "On Passage of the Bill",
+    "On the Resolution of Ratification (Treaty Doc. 111-5)",
+    "On Agreeing to the Concurrent Resolution",
+    "On the Joint Resolution",
+    "On Agreeing to the Conference Report",
+    "On Agreeing to the En Bloc Amendments",
+    "On the Amendment S.Amdt. 2786",
+    "On the Cloture Motion H.R. 3590",
+    "On Cloture on the Motion to Proceed S. 3217",
+    "On the Nomination PN1143",
+    "Guilty or Not Guilty",
+    "On Motion to Recommit with Instructions",
+    "On the Motion (Motion to Concur in the House Amendment)",
+    "On Motion to Concur in the Senate Amendment",
+    "Concurring in the Senate Amdt",
+    "On Motion to Suspend the Rules and Pass, As Amended",
+    "Suspend the Rules and Agree",
+    "Call of the House",
+    "Call by States",
+    "Election of the Speaker",
+    "On Ordering the Previous Question",
+    "On Approving the Journal",
+    "Will the House Now Consider the Resolution",
+    "On Question of Consideration of the Resolution",
+    "On Motion to Adjourn",
+    "On the Motion to Adjourn",
+    "On Motion to Authorize Conferees",
+    "On the Point of Order",
+    "On Broun of Georgia Motion to Table",
+    "On the Decision of the Chair",
+    "Whether the Amendment is Germane",
+    "Table Appeal of the Ruling of the Chair",
+    "On the Motion to Proceed S. 1",
+    "On Overriding the Veto",
+    "Passage, Objections of the President Not Withstanding",
+    "QUORUM",
+]
+
+AMENDMENT_ACTIONS = [
+    "On agreeing to the Poe amendments (A009) Failed by recorded vote: 141 - 279 (Roll no. 164).",
+    "On agreeing to the Hastings amendment (A002) as modified Agreed to by voice vote.",
+    "Amendment SA 2786 agreed to in Senate by Voice Vote.",
+    "Motion to table Amendment SA 2786 not agreed to in Senate by Yea-Nay Vote. 40 - 58. Record Vote Number: 123.",
+    "Proposed amendment SA 2786 withdrawn in Senate.",
+    "Amendment SA 2786 proposed by Senator Reid.",
+]
+
+
+def plain_match(rule, text):
+    if rule.anchored:
+        return rule.regex.match(text)
+    return rule.regex.search(text)
+
+
+class Rules(unittest.TestCase):
+
+    def test_keywords_from_pattern(self):
+        rule = rules.Rule(r"^On (Agreeing to )?the (Joint |Concurrent )?Resolution")
+        self.assertEqual(rule.anchored, True)
+        self.assertEqual(rule.prefix, "on ")
+        self.assertEqual(rule.keywords, ("resolution",))
+
+        rule = rules.Rule(r"Cleared for White House|Presented to President")
+        self.assertEqual(rule.anchored, False)
+        self.assertEqual(rule.prefix, "")
+        self.assertEqual(rule.keywords, ("cleared for white house", "presented to president"))
+
+        # an optional branch gives no keyword
+        rule = rules.Rule(r"On Passage( of the Bill|$)", anchored=True)
+        self.assertEqual(rule.prefix, "on passage")
+        self.assertEqual(rule.keywords, ("on passage",))
+
+        # case-sensitive rules keep their case
+        rule = rules.Rule(r"Proposed amendment SA \d+ withdrawn", flags=0)
+        self.assertEqual(rule.keywords, ("Proposed amendment SA ",))
+        self.assertEqual(rule.search("proposed amendment SA 1 withdrawn"), None)
+
+    def test_first_match_in_order(self):
+        table = rules.RuleTable([
+            rules.Rule("^On Passage", "passage"),
+            rules.Rule("cloture", "cloture"),
+            rules.Rule("passage", "anything"),
+        ])
+        self.assertEqual(table.first("On Passage of the Cloture Motion")[0], "passage")
+        self.assertEqual(table.first("On the Cloture Motion, Passage")[0], "cloture")
+        self.assertEqual(table.first("Motion for passage")[0], "anything")
+        self.assertEqual(table.first("On the Nomination"), (None, None))
+        self.assertEqual(sorted(table.scan("On passage of the cloture motion")), ["anything", "cloture", "passage"])
+        self.assertEqual(table["cloture"].pattern, "cloture")
+
+    def assertSameAsRegex(self, rule_list, texts):
+        for rule in rule_list:
+            for text in texts:
+                expected = plain_match(rule, text)
+                m = rule.search(text)
+                self.assertEqual(m is None, expected is None, (rule.pattern, text))
+                if m:
+                    self.assertEqual(m.span(), expected.span())
+                    self.assertEqual(m.groups(), expected.groups())
+
+    def test_bill_action_rules(self):
+        lines = fixtures.action_lines()
+        self.assertTrue(len(lines) > 100)
+        lines = [line.replace(", the Passed", ", Passed") for line in lines]
+        self.assertSameAsRegex(bill_info.BILL_ACTION_RULES.rules, lines)
+        self.assertSameAsRegex([bill_info.BILL_ACTION_PATTERNS["senate-vote"]], [line.replace("  ", " ") for line in lines])
+        self.assertSameAsRegex(bill_info.BILL_ACTION_PATTERNS.values(), lines)
+
+    def test_vote_rules(self):
+        self.assertSameAsRegex(vote_info.VOTE_TYPE_RULES.rules, VOTE_QUESTIONS)
+        self.assertSameAsRegex(vote_info.VOTE_CATEGORY_RULES.rules, VOTE_QUESTIONS)
+
+        self.assertEqual(vote_info.normalize_vote_type("On Agreeing to the Concurrent Resolution"), "On the Concurrent Resolution")
+        self.assertEqual(vote_info.normalize_vote_type("On Motion to Suspend the Rules and Pass, As Amended"), "On Motion to Suspend the Rules and Pass, As Amended")
+        self.assertEqual(vote_info.normalize_vote_type("On the Resolution of Ratification (Treaty Doc. 111-5)"), "On the Resolution of Ratification")
+        self.assertEqual(vote_info.normalize_vote_type("QUORUM"), "QUORUM")
+
+        self.assertEqual(vote_info.get_vote_category(""), "unknown")
+        self.assertEqual(vote_info.get_vote_category("Passage, Objections of the President Not Withstanding"), "veto-override")
+        self.assertEqual(vote_info.get_vote_category("On Passage of the Bill"), "passage")
+        self.assertEqual(vote_info.get_vote_category("On the Cloture Motion H.R. 3590"), "cloture")
+        self.assertEqual(vote_info.get_vote_category("On Broun of Georgia Motion to Table"), "procedural")
+
+    def test_amendment_action_rules(self):
+        self.assertSameAsRegex(amendments.AMENDMENT_ACTION_RULES.rules, AMENDMENT_ACTIONS)
+
+        actions = [amendments.parse_amendment_action({"text": text, "actionDate": "2010-01-01", "committee": None}) for text in AMENDMENT_ACTIONS]
+        self.assertEqual((actions[0]["where"], actions[0]["result"], actions[0]["roll"]), ("h", "fail", 164))
+        self.assertEqual((actions[1]["where"], actions[1]["result"], actions[1]["how"]), ("h", "pass", "by voice vote"))
+        self.assertEqual((actions[2]["where"], actions[2]["result"], actions[2]["how"]), ("s", "pass", "Voice Vote"))
+        self.assertEqual(actions[3]["type"], "action")  # a failed motion to table is not a vote on the amendment
+        self.assertEqual(actions[4]["type"], "withdrawn")
+        self.assertEqual(actions[5]["type"], "action")
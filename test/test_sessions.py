@@ -0,0 +1,154 @@
+import unittest
+import datetime
+import os
+import shutil
+import tempfile
+import time
+
+import requests
+
+import utils
+from congress import sessions
+
+# the 1st Congress's sessions, the 76th's (with a special session that
+# overlaps the second) and the 113th's
+TSV = "\n".join([
+    "congress\tsession\tstart\tend",
+    "1\t1\t1789-03-04\t1789-09-29",
+    "1\t2\t1790-01-04\t1790-08-12",
+    "1\t3\t1790-12-06\t1791-03-03",
+    "76\t1\t1939-01-03\t1939-08-05",
+    "76\t2\t1939-09-21\t1939-11-03",
+    "76\t3\t1940-01-03\t1941-01-03",
+    "76\tS\t1940-06-01\t1940-06-02",
+    "113\t2013\t2013-01-03\t2014-01-03",
+    "113\t2014\t2014-01-03\t2015-01-02",
+]) + "\n"
+
+
+def linear_session_from_date(date, rows):
+    # the first session the date falls in, as sessions.tsv was once searched
+    for congress, session, start, end in rows:
+        if start <= date <= end:
+            return int(congress), session
+    return None, None
+
+
+class Sessions(unittest.TestCase):
+
+    def setUp(self):
+        self.sessions = sessions.parse(TSV)
+        self.rows = [line.split("\t") for line in TSV.splitlines()[1:]]
+
+    def test_session_from_date(self):
+        self.assertEqual(self.sessions.session_from_date("1790-01-04"), (1, "2"))
+        self.assertEqual(self.sessions.session_from_date(datetime.date(1940, 6, 1)), (76, "3"))
+        self.assertEqual(self.sessions.session_from_date(datetime.datetime(2014, 1, 3, 12)), (113, "2013"))
+        self.assertEqual(self.sessions.session_from_date("1789-12-25"), (None, None))
+        self.assertEqual(self.sessions.session_from_date("1700-01-01"), (None, None))
+        self.assertEqual(self.sessions.session_from_date("2020-01-01"), (None, None))
+
+        # every day agrees with a scan of the sessions in order
+        for year in (1789, 1790, 1791, 1939, 1940, 1941, 2013, 2014, 2015):
+            date = datetime.date(year, 1, 1)
+            while date.year == year:
+                self.assertEqual(self.sessions.session_from_date(date), linear_session_from_date(date.isoformat(), self.rows))
+                date += datetime.timedelta(days=1)
+
+    def test_congresses(self):
+        self.assertEqual(self.sessions.congress_sessions(76), ["1", "2", "3", "S"])
+        self.assertEqual(self.sessions.session_number(113, 2014), 2)
+        self.assertEqual(self.sessions.session_number("113", "2013"), 1)
+        self.assertRaises(KeyError, self.sessions.session_number, 113, 2015)
+        self.assertRaises(KeyError, self.sessions.session_number, 114, 2015)
+        self.assertEqual(self.sessions.congress_dates(1), (datetime.date(1789, 3, 4), datetime.date(1791, 3, 3)))
+        self.assertEqual(self.sessions.congress_dates(76), (datetime.date(1939, 1, 3), datetime.date(1941, 1, 3)))
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeResult(unicode):
+    # what scrapelib.Scraper.urlopen returns
+    pass
+
+
+class DownloadIfModified(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = tempfile.mkdtemp()
+        self.cache_dir = utils.cache_dir
+        self.scraper = utils.scraper
+        utils.cache_dir = lambda: self.cache
+        utils.scraper = self
+        self.congress_sessions = utils._congress_sessions
+        utils._congress_sessions = None
+        self.requests = []
+        self.status_code = 200
+
+    def tearDown(self):
+        utils.cache_dir = self.cache_dir
+        utils.scraper = self.scraper
+        utils._congress_sessions = self.congress_sessions
+        shutil.rmtree(self.cache)
+
+    def urlopen(self, url, headers, timeout):
+        self.requests.append(headers)
+        if self.status_code is None:
+            raise requests.exceptions.ConnectionError("offline")
+        result = FakeResult(TSV if self.status_code == 200 else u"")
+        result.response = FakeResponse(self.status_code)
+        return result
+
+    def download(self):
+        return utils.download_if_modified(utils.SESSIONS_URL, "sessions.tsv", 60)
+
+    def test_download(self):
+        self.assertEqual(self.download(), TSV)
+        self.assertEqual(self.requests, [{}])
+
+        # the cached copy, until it's older than max_age
+        self.assertEqual(self.download(), TSV)
+        self.assertEqual(len(self.requests), 1)
+
+        path = os.path.join(self.cache, "sessions.tsv")
+        modified = time.time() - 120
+        os.utime(path, (modified, modified))
+        self.status_code = 304
+        self.assertEqual(self.download(), TSV)
+        self.assertEqual(self.requests[1], {"If-Modified-Since": utils.email.utils.formatdate(modified, usegmt=True)})
+        self.assertGreater(os.path.getmtime(path), modified)
+
+        # not checked again until it's older than max_age
+        self.assertEqual(self.download(), TSV)
+        self.assertEqual(len(self.requests), 2)
+
+    def test_offline(self):
+        self.status_code = None
+        self.assertIsNone(self.download())
+
+        # the cached copy
+        self.status_code = 200
+        self.download()
+        path = os.path.join(self.cache, "sessions.tsv")
+        modified = time.time() - 120
+        os.utime(path, (modified, modified))
+        self.status_code = None
+        self.assertEqual(self.download(), TSV)
+
+    def test_session_number(self):
+        self.status_code = None
+        self.assertEqual(utils.get_session_number(113, "2014"), 2)
+        self.assertEqual(self.requests, [])
+
+        # the failed download isn't tried again
+        self.assertRaises(KeyError, utils.get_session_number, 76, "3")
+        self.assertRaises(KeyError, utils.get_session_number, 76, "3")
+        self.assertEqual(len(self.requests), 1)
+
+        utils._congress_sessions = None
+        self.status_code = 200
+        self.assertEqual(utils.get_session_number(76, "3"), 3)
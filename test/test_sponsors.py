@@ -0,0 +1,37 @@
+import unittest
+
+from congress import bill_info
+
+# parsing sponsor and cosponsor names from the BILLSTATUS bulk data
+
+
+def cosponsor(full_name, bioguide_id, original="False"):
+    return {"fullName": full_name, "bioguideId": bioguide_id, "sponsorshipDate": "2013-01-03",
+            "sponsorshipWithdrawnDate": None, "isOriginalCosponsor": original}
+
+
+class Sponsors(unittest.TestCase):
+
+    def test_sponsor(self):
+        self.assertEqual(bill_info.sponsor_for({"fullName": "Rep. Smith, Christopher H. [R-NJ-4]", "bioguideId": "S000522"}), {
+            "title": "Rep", "name": "Smith, Christopher H.", "district": "4", "state": "NJ", "bioguide_id": "S000522", "type": "person"})
+        self.assertEqual(bill_info.sponsor_for({"fullName": "Rep. Young, Don [R-AK-At Large]", "bioguideId": "Y000033"})["district"], None)
+        self.assertEqual(bill_info.sponsor_for({"fullName": "Sen. Reid, Harry [D-NV]", "bioguideId": "R000146"})["district"], None)
+        self.assertEqual(bill_info.sponsor_for(None), None)
+
+    def test_cosponsors(self):
+        cosponsors = bill_info.cosponsors_for({"item": [
+            cosponsor("Sen. Reid, Harry [D-NV]", "R000146", "True"),
+            cosponsor("Sen. Collins, Susan M. [R-ME]", "C001035"),
+        ]})
+        self.assertEqual(cosponsors, [
+            {"title": "Sen", "name": "Collins, Susan M.", "district": None, "state": "ME", "bioguide_id": "C001035",
+             "sponsored_at": "2013-01-03", "withdrawn_at": None, "original_cosponsor": False},
+            {"title": "Sen", "name": "Reid, Harry", "district": None, "state": "NV", "bioguide_id": "R000146",
+             "sponsored_at": "2013-01-03", "withdrawn_at": None, "original_cosponsor": True},
+        ])
+
+        # the parsed names are shared, but not the dicts built from them
+        cosponsors[0]["name"] = "Changed"
+        self.assertEqual(bill_info.sponsor_for(cosponsor("Sen. Collins, Susan M. [R-ME]", "C001035"))["name"], "Collins, Susan M.")
+        self.assertTrue(bill_info.parse_sponsor("Sen. Reid, Harry [D-NV]", "R000146") is bill_info.parse_sponsor("Sen. Reid, Harry [D-NV]", "R000146"))
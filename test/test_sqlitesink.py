@@ -0,0 +1,94 @@
+import unittest
+import json
+import os.path
+import shutil
+import tempfile
+
+import rerender
+from congress import records
+from congress.sqlitesink import SQLiteSink
+
+
+def fixture(name):
+    with open("test/fixtures/govtrack/%s.json" % name) as f:
+        return json.load(f)
+
+
+def vote_fixture(name):
+    # as vote_info has the vote when it writes it
+    vote = fixture(name)
+    for field in ("date", "updated_at"):
+        vote[field] = rerender.parse_datetime(vote[field])
+    for voters in vote["votes"].values():
+        voters[:] = [records.Voter.from_dict(voter) if isinstance(voter, dict) else voter for voter in voters]
+    return vote
+
+
+class SQLiteSinkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, "congress.sqlite3")
+        self.sink = SQLiteSink(self.filename)
+
+    def tearDown(self):
+        self.sink.close()
+        shutil.rmtree(self.dir)
+
+    def count(self, table, where="1"):
+        return self.sink.db.execute("SELECT COUNT(*) FROM %s WHERE %s" % (table, where)).fetchone()[0]
+
+    def test_records(self):
+        bill = fixture("bill-hr3590-111")
+        amendment = fixture("amendment-hamdt5-113")
+        vote = vote_fixture("vote-h165-111.2010")
+
+        self.sink.write_bill(bill)
+        self.sink.write_amendment(amendment)
+        self.sink.write_vote(vote)
+
+        self.assertEqual(self.sink.db.execute("SELECT bill_type, number, congress, status, sponsor_bioguide_id FROM bills").fetchall(),
+                         [("hr", 3590, 111, "ENACTED:SIGNED", bill["sponsor"]["bioguide_id"])])
+        self.assertEqual(self.count("actions", "id = 'hr3590-111'"), len(bill["actions"]))
+        self.assertEqual(self.count("actions", "id = 'hamdt5-113'"), len(amendment["actions"]))
+        self.assertEqual(self.count("cosponsors"), len(bill["cosponsors"]))
+        self.assertEqual(self.count("subjects"), len(set(bill["subjects"])))
+        self.assertEqual(self.sink.db.execute("SELECT amends_bill_id FROM amendments").fetchall(), [(amendment["amends_bill"]["bill_id"],)])
+
+        self.assertEqual(self.sink.db.execute("SELECT date, bill_id FROM votes").fetchall(),
+                         [("2010-03-21T22:46:00-04:00", "hr3590-111")])
+        for option, voters in vote["votes"].items():
+            self.assertEqual(self.count("vote_positions", "vote = '%s'" % option), len(voters))
+
+    def test_incremental(self):
+        bill = fixture("bill-hr3590-111")
+        self.sink.write_bill(bill)
+
+        # an unchanged record isn't written again
+        changes = self.sink.db.total_changes
+        self.sink.write_bill(fixture("bill-hr3590-111"))
+        self.assertEqual(self.sink.db.total_changes, changes)
+
+        # a changed one replaces its rows
+        bill["actions"] = bill["actions"][:3]
+        bill["subjects"] = [u"Caf\u00e9s", "Taxation"]
+        self.sink.write_bill(bill)
+        self.assertEqual(self.count("bills"), 1)
+        self.assertEqual(self.count("actions"), 3)
+        self.assertEqual(self.sink.db.execute("SELECT subject FROM subjects ORDER BY subject").fetchall(),
+                         [(u"Caf\u00e9s",), (u"Taxation",)])
+
+    def test_concurrent_writers(self):
+        # each record is committed as it's written, so another process
+        # writing to the database doesn't wait for this one's next record
+        other = SQLiteSink(self.filename)
+        other.db.execute("PRAGMA busy_timeout = 100")
+        try:
+            self.sink.write_bill(fixture("bill-hr3590-111"))
+            self.assertEqual(other.db.execute("SELECT COUNT(*) FROM bills").fetchone()[0], 1)
+            other.write_bill(fixture("bill-hr1954-112"))
+            self.sink.write_vote(vote_fixture("vote-h165-111.2010"))
+            self.assertEqual(self.count("bills"), 2)
+            self.assertEqual(other.db.execute("SELECT COUNT(*) FROM votes").fetchone()[0], 1)
+        finally:
+            other.close()
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from congress import text
+
+# cleaning up HTML from the bulk data and downloaded pages
+
+
+class Text(unittest.TestCase):
+
+    def test_strip_tags(self):
+        self.assertEqual(text.strip_tags("<p>Patient  Protection &amp; Affordable Care Act</p> <p>Title I:\tQuality</p>\n"),
+                         u"Patient Protection & Affordable Care Act\n\nTitle I:\tQuality")
+        self.assertEqual(text.strip_tags("  No   tags\x01 here  "), "No tags here")
+        self.assertEqual(text.strip_tags(u"<b>Caf\xe9</b>"), u"Caf\xe9")
+
+    def test_unescape(self):
+        self.assertEqual(text.unescape("Smith &amp; Jones &mdash; &#233;&#xe9; &#x;&nosuch; &amp"),
+                         u"Smith & Jones \u2014 \xe9\xe9 &#x;&nosuch; &amp")
+        self.assertEqual(text.unescape(u"\x07bell&#7;"), u"bell")
+        self.assertEqual(text.unescape(u"\u2014&#1114112;"), u"\u2014&#1114112;")
+
+        # byte strings without entities stay byte strings
+        self.assertEqual(text.unescape("caf\xc3\xa9\x00"), "caf\xc3\xa9")
+        self.assertTrue(isinstance(text.unescape("cafe"), str))
@@ -0,0 +1,104 @@
+import unittest
+import json
+
+import numpy
+
+from congress import voteanalytics, votematrix
+
+
+def random_votes(count, members=30, seed=1):
+    # votes in the vote_info schema by members of two parties and an
+    # independent, some of whom didn't serve for all of them
+    random = numpy.random.RandomState(seed)
+    votes = []
+    for number in range(1, count + 1):
+        vote = {"vote_id": "h%d-113.2013" % number, "votes": {}}
+        for i in range(members):
+            if i == members - 1 and number < count // 2:
+                continue
+            party = "I" if i == 0 else "DR"[i % 2]
+            option = random.choice(["Aye", "Yea", "No", "Nay", "Present", "Not Voting"], p=[.3, .1, .3, .1, .05, .15])
+            if party == "D" and number % 3 == 0:
+                option = "Aye"
+            vote["votes"].setdefault(option, []).append({"id": "M%03d" % i, "party": party})
+        votes.append(vote)
+    return votes
+
+
+class VoteAnalytics(unittest.TestCase):
+
+    def plain(self, votes):
+        # the statistics from the votes, one vote and member at a time
+        positions = {}
+        parties = {}
+        for vote in votes:
+            for option, voters in vote["votes"].items():
+                for voter in voters:
+                    positions.setdefault(voter["id"], {})[vote["vote_id"]] = {"Aye": "Yea", "No": "Nay"}.get(option, option)
+                    parties[voter["id"]] = voter["party"]
+        members = sorted(positions)
+
+        agreement = numpy.full((len(members), len(members)), numpy.nan)
+        for i, a in enumerate(members):
+            for j, b in enumerate(members):
+                both = [(positions[a][v], positions[b][v]) for v in positions[a]
+                        if positions[a][v] in ("Yea", "Nay") and positions[b].get(v) in ("Yea", "Nay")]
+                if both:
+                    agreement[i, j] = float(sum(1 for x, y in both if x == y)) / len(both)
+
+        unity = numpy.full(len(members), numpy.nan)
+        with_party = dict((m, 0) for m in members)
+        party_votes = dict((m, 0) for m in members)
+        for vote in votes:
+            majority = {}
+            for party in "DR":
+                yeas = sum(1 for m in members if parties[m] == party and positions[m].get(vote["vote_id"]) == "Yea")
+                nays = sum(1 for m in members if parties[m] == party and positions[m].get(vote["vote_id"]) == "Nay")
+                majority[party] = "Yea" if yeas > nays else "Nay" if nays > yeas else None
+            if None in majority.values() or majority["D"] == majority["R"]:
+                continue
+            for m in members:
+                if parties[m] in majority and positions[m].get(vote["vote_id"]) in ("Yea", "Nay"):
+                    party_votes[m] += 1
+                    with_party[m] += positions[m][vote["vote_id"]] == majority[parties[m]]
+        for i, m in enumerate(members):
+            if party_votes[m]:
+                unity[i] = float(with_party[m]) / party_votes[m]
+
+        participation = numpy.array([
+            float(sum(1 for p in positions[m].values() if p != "Not Voting")) / len(positions[m]) for m in members])
+        return agreement, unity, participation
+
+    def assertStatistics(self, statistics, votes):
+        for computed, expected in zip((statistics.agreement(), statistics.party_unity(), statistics.participation()), self.plain(votes)):
+            self.assertTrue(numpy.allclose(computed, expected, equal_nan=True))
+
+    def test_statistics(self):
+        votes = random_votes(40)
+        statistics = voteanalytics.VoteStatistics(block_size=16)
+        self.assertEqual(statistics.update(voteanalytics.matrix_from_votes(votes)), len(votes))
+        self.assertStatistics(statistics, votes)
+
+        # the independent, M000, has no party unity score
+        self.assertTrue(numpy.isnan(statistics.party_unity()[0]))
+        self.assertEqual(voteanalytics.major_parties(statistics.parties), ["R", "D"])
+
+    def test_update(self):
+        votes = random_votes(60)
+        statistics = voteanalytics.VoteStatistics(block_size=16)
+        statistics.update(voteanalytics.matrix_from_votes(votes[:50]))
+
+        # new votes and a changed one
+        changed = json.loads(json.dumps(votes[10]))
+        changed["votes"]["Present"] = changed["votes"].pop("Aye", []) + changed["votes"].get("Present", [])
+        votes[10] = changed
+        self.assertEqual(statistics.update(voteanalytics.matrix_from_votes(votes)), 11)
+        self.assertStatistics(statistics, votes)
+
+        # nothing changed
+        self.assertEqual(statistics.update(voteanalytics.matrix_from_votes(votes)), 0)
+
+        # a removed vote
+        matrix = votematrix.merge(voteanalytics.matrix_from_votes(votes), {votes[0]["vote_id"]: None})
+        self.assertEqual(statistics.update(matrix), 0)
+        self.assertStatistics(statistics, votes[1:])
@@ -0,0 +1,82 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from congress import votematrix
+
+
+def vote_fixture(name):
+    with open("test/fixtures/govtrack/%s.json" % name) as f:
+        return json.load(f)
+
+
+class VoteMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = votematrix.VoteMatrixStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_matrix(self):
+        vote = vote_fixture("vote-h165-111.2010")
+        self.store.update(vote)
+        self.store.update(vote_fixture("vote-s396-111.2009"))
+        self.store.save()
+
+        matrix = self.store.load(111, "h")
+        self.assertIsInstance(matrix.positions, numpy.memmap)
+        self.assertEqual(matrix.positions.dtype, numpy.int8)
+        self.assertEqual(list(matrix.votes), ["h165-111.2010"])
+        self.assertEqual(list(matrix.members), sorted(voter["id"] for voters in vote["votes"].values() for voter in voters))
+
+        column = matrix.vote("h165-111.2010")
+        self.assertEqual((column == votematrix.YEA).sum(), len(vote["votes"]["Aye"]))
+        self.assertEqual((column == votematrix.NAY).sum(), len(vote["votes"]["No"]))
+        voter = vote["votes"]["No"][0]
+        self.assertEqual(matrix.position(voter["id"], "h165-111.2010"), votematrix.NAY)
+        self.assertEqual(matrix.parties[matrix.member_index(voter["id"])], voter["party"])
+        self.assertRaises(KeyError, matrix.member_index, "X000000")
+
+        self.assertEqual(list(self.store.load(111, "s").votes), ["s396-111.2009"])
+        self.assertIsNone(self.store.load(112, "h"))
+
+    def test_update(self):
+        vote = vote_fixture("vote-h165-111.2010")
+        self.store.update(vote)
+        self.store.save()
+
+        # a later vote with another member, and the first vote changed
+        later = vote_fixture("vote-h165-111.2010")
+        later["vote_id"] = "h170-111.2010"
+        later["number"] = 170
+        later["votes"]["Not Voting"].append({"id": "A000001", "party": "D", "display_name": "New", "state": "CA"})
+        self.store.update(later)
+        switched = vote["votes"]["Aye"].pop()
+        vote["votes"]["No"].append(switched)
+        self.store.update(vote)
+        self.store.save()
+
+        matrix = self.store.load(111, "h")
+        self.assertEqual(list(matrix.votes), ["h165-111.2010", "h170-111.2010"])
+        self.assertEqual(matrix.position(switched["id"], "h165-111.2010"), votematrix.NAY)
+        self.assertEqual(matrix.position(switched["id"], "h170-111.2010"), votematrix.YEA)
+        self.assertEqual(list(matrix.member("A000001")), [votematrix.NO_POSITION, votematrix.NOT_VOTING])
+
+        # a vacated vote
+        self.store.remove("h165-111.2010")
+        self.store.save()
+        matrix = self.store.load(111, "h")
+        self.assertEqual(list(matrix.votes), ["h170-111.2010"])
+        self.assertEqual(matrix.position(switched["id"], "h170-111.2010"), votematrix.YEA)
+
+    def test_save_array_unwritable(self):
+        # the error opening the file is what's raised, not one removing it
+        missing = os.path.join(self.root, "missing")
+        self.assertRaises(IOError, votematrix.save_array, missing, "votes", numpy.zeros(1))
+        self.assertFalse(os.path.exists(missing))
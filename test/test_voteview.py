@@ -0,0 +1,54 @@
+import unittest
+
+import utils
+import voteview
+
+# three members and the President, on four roll calls; the last member's
+# line is cut short after the second
+ORD = "\r\n".join([
+    "1131000141 1ALABAMA 20001SMITH      1629",
+    "1131000241 2ALABAMA 10001JONES      6619",
+    "1131000341 3ALABAMA 10001ADAMS      10",
+    "1139991199 0USA     10001PRESIDENT  1161",
+]) + "\r\n"
+
+
+class Voteview(unittest.TestCase):
+
+    def setUp(self):
+        self.get_person_id = utils.get_person_id
+        utils.get_person_id = lambda source_id_type, source_id, dest_id_type: "B%05d" % source_id
+
+    def tearDown(self):
+        utils.get_person_id = self.get_person_id
+
+    def votes(self, descriptions):
+        vote_list, vote_matrix = voteview.parse_vote_list_file(ORD)
+        (voters, votes), presidents_positions = voteview.build_votes(vote_list, vote_matrix)
+        results = [voteview.build_votes_dict(voters, votes[i], {"description": description})
+                   for i, description in enumerate(descriptions)]
+        return results, presidents_positions
+
+    def voters(self, votes):
+        return dict((option, [(voter["id"], voter.to_dict().get("voteview_votecode_extra", "-")) for voter in voters])
+                    for option, voters in votes.items())
+
+    def test_matrix(self):
+        vote_list, vote_matrix = voteview.parse_vote_list_file(ORD)
+        self.assertEqual([voter["member_name"] for voter in vote_list], ["SMITH", "JONES", "ADAMS", "PRESIDENT"])
+        self.assertEqual(vote_matrix.tolist(), [[1, 6, 2, 9], [6, 6, 1, 9], [1, 0, -1, -1], [1, 1, 6, 1]])
+
+    def test_votes(self):
+        special = [description for description, (new_description, codes) in voteview.special_vote_options.items()
+                   if codes.get(1) and 2 not in codes][0]
+        results, presidents_positions = self.votes(["TO PASS H.R. 1.", "TO PASS H.R. 2.", special, "TO AMEND H.R. 4."])
+
+        # in the order of the members' names
+        self.assertEqual(self.voters(results[0]), {"Yea": [("B10003", None), ("B10001", None)], "Nay": [("B10002", None)]})
+        # ADAMS wasn't serving
+        self.assertEqual(self.voters(results[1]), {"Nay": [("B10002", None), ("B10001", None)]})
+        self.assertEqual(self.voters(results[2]), {
+            voteview.special_vote_options[special][1][1]: [("B10002", "-")], "Unknown": [("B10001", "-")]})
+        self.assertEqual(self.voters(results[3]), {"Not Voting": [("B10002", None), ("B10001", None)]})
+
+        self.assertEqual(presidents_positions, {0: 1, 1: 1, 2: 6, 3: 1})